@@ -0,0 +1,76 @@
+# bench_extraction.py
+"""Compare the PyMuPDF extraction engine with the previous PyPDF2 path
+
+Usage: python benchmarks/bench_extraction.py [pdf ...]
+
+Without arguments every PDF under folders/ is used. PyMuPDF is timed
+reading in this process and with the process pool, which extract_pages
+uses for documents of PARALLEL_PAGE_THRESHOLD pages or more when there is
+more than one CPU; smaller documents are read in process either way.
+"""
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.pdf_processing import extract_pages  # noqa: E402
+
+POOL_WORKERS = max(2, min(os.cpu_count() or 1, 8))
+
+
+def extract_pages_serial(file_path):
+    return extract_pages(file_path, max_workers=1)
+
+
+def extract_pages_pool(file_path):
+    return extract_pages(file_path, max_workers=POOL_WORKERS)
+
+
+def extract_pages_pypdf2(file_path):
+    """The extraction process_pdf used before switching to PyMuPDF"""
+    import PyPDF2
+    with open(file_path, 'rb') as file:
+        pdf = PyPDF2.PdfReader(file)
+        return [page.extract_text() or "" for page in pdf.pages]
+
+
+def best_of(function, file_path, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(file_path)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main(paths, repeat=3):
+    engines = [
+        ("pymupdf", extract_pages_serial),
+        (f"pool x{POOL_WORKERS}", extract_pages_pool),
+        ("pypdf2", extract_pages_pypdf2)
+    ]
+
+    print(f"{'file':50} {'pages':>6} " + " ".join(f"{name:>12}" for name, _ in engines))
+    for path in paths:
+        timings = []
+        pages = None
+        for name, function in engines:
+            try:
+                elapsed, result = best_of(function, path, repeat)
+                pages = len(result)
+                timings.append(f"{elapsed * 1000:10.1f}ms")
+            except ImportError:
+                timings.append(f"{'missing':>12}")
+        print(f"{os.path.basename(path)[:50]:50} {pages if pages is not None else '-':>6} " + " ".join(timings))
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:] or sorted(glob.glob(os.path.join("folders", "**", "*.pdf"), recursive=True))
+    if not paths:
+        print("No PDF files found")
+        sys.exit(1)
+    main(paths)
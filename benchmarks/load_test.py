@@ -0,0 +1,143 @@
+# load_test.py
+"""Load-test the HTTP API with concurrent consult requests
+
+Usage: python benchmarks/load_test.py [--url URL] [--concurrency N] [--duration SECONDS] [--term TERM ...]
+
+Start the API first (python -m src.api). Each of the N clients keeps
+sending a mix of teacher pages, filtered practice pages, follow-up pages,
+practice details, searches and ranged file reads until the time is up;
+throughput and latency percentiles are then printed per request kind.
+Needs httpx.
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+import httpx
+
+DEFAULT_TERMS = ("python", "programming", "algorithm", "data", "loops")
+RANGE_BYTES = 64 * 1024
+
+
+class Workload:
+    """Requests to choose from, built from what the server returns"""
+
+    def __init__(self, terms):
+        self.terms = terms
+        self.teachers = []
+        self.practice_ids = []
+        self.file_ids = []
+        self.next_page = None
+
+    async def discover(self, client):
+        teachers = (await client.get("/teachers", params={"limit": 200})).json()["items"]
+        self.teachers = [teacher["name"] for teacher in teachers]
+        first_page = (await client.get("/practices", params={"limit": 20})).json()
+        self.next_page = first_page["next"]
+        practices = (await client.get("/practices", params={"limit": 200})).json()["items"]
+        self.practice_ids = [practice["id"] for practice in practices]
+        for practice_id in self.practice_ids[:50]:
+            if (await client.head(f"/practices/{practice_id}/file")).status_code == 200:
+                self.file_ids.append(practice_id)
+
+    def kinds(self):
+        kinds = [("teachers", 2), ("practices", 3), ("search", 2), ("search_titles", 1)]
+        if self.teachers:
+            kinds.append(("practices_by_teacher", 2))
+        if self.next_page:
+            kinds.append(("practices_next", 1))
+        if self.practice_ids:
+            kinds.append(("detail", 2))
+        if self.file_ids:
+            kinds.append(("file_range", 1))
+        return kinds
+
+    def request(self, kind):
+        """Return (method, path, params, headers) for one request of kind"""
+        if kind == "teachers":
+            return "GET", "/teachers", {"limit": 20}, None
+        if kind == "practices":
+            return "GET", "/practices", {"limit": 20, "facets": "true"}, None
+        if kind == "practices_by_teacher":
+            return "GET", "/practices", {"limit": 20, "teacher": random.choice(self.teachers)}, None
+        if kind == "practices_next":
+            return "GET", "/practices", {"limit": 20, "after": self.next_page}, None
+        if kind == "search":
+            return "GET", "/search", {"q": random.choice(self.terms), "limit": 20}, None
+        if kind == "search_titles":
+            return "GET", "/search", {"q": random.choice(self.terms), "limit": 20, "snippets": "false"}, None
+        if kind == "detail":
+            return "GET", f"/practices/{random.choice(self.practice_ids)}", None, None
+        start = random.randrange(0, 1024 * 1024, 4096)
+        headers = {"Range": f"bytes={start}-{start + RANGE_BYTES - 1}"}
+        return "GET", f"/practices/{random.choice(self.file_ids)}/file", None, headers
+
+
+async def client_loop(client, workload, deadline, results):
+    names, weights = zip(*workload.kinds())
+    while time.monotonic() < deadline:
+        kind = random.choices(names, weights)[0]
+        method, path, params, headers = workload.request(kind)
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, params=params, headers=headers)
+            await response.aread()
+            ok = response.status_code < 400 or (kind == "file_range" and response.status_code == 416)
+        except httpx.HTTPError:
+            ok = False
+        results.append((kind, ok, time.perf_counter() - start))
+
+
+def percentile(sorted_values, fraction):
+    index = min(int(len(sorted_values) * fraction), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def report(results, elapsed, concurrency):
+    print(f"{len(results)} requests in {elapsed:.1f} s from {concurrency} clients: "
+          f"{len(results) / elapsed:.0f} requests/s")
+    print(f"{'kind':22} {'count':>7} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    kinds = sorted({kind for kind, _, _ in results})
+    for kind in kinds + ["all"]:
+        rows = [row for row in results if kind in ("all", row[0])]
+        latencies = sorted(latency * 1000 for _, _, latency in rows)
+        errors = sum(1 for _, ok, _ in rows if not ok)
+        print(f"{kind:22} {len(rows):>7} {errors:>7} "
+              + " ".join(f"{percentile(latencies, q):>8.1f}" for q in (0.5, 0.95, 0.99))
+              + f" {latencies[-1]:>8.1f}")
+
+
+async def run(url, concurrency, duration, terms):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        workload = Workload(terms)
+        await workload.discover(client)
+
+        results = []
+        started = time.monotonic()
+        deadline = started + duration
+        await asyncio.gather(*(client_loop(client, workload, deadline, results) for _ in range(concurrency)))
+        elapsed = time.monotonic() - started
+
+    if not results:
+        print("No requests were completed", file=sys.stderr)
+        return 1
+    report(results, elapsed, concurrency)
+    return 1 if any(not ok for _, ok, _ in results) else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the laboratory HTTP API")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=200, help="simultaneous clients")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds to run")
+    parser.add_argument("--term", action="append", dest="terms", help="search term (repeatable)")
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args.url.rstrip("/"), args.concurrency, args.duration,
+                           tuple(args.terms or DEFAULT_TERMS)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
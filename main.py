@@ -1,19 +1,38 @@
 # main_app.py
+import time
+STARTED = time.perf_counter()
+
+# Only what the home screen needs is imported here; the preview, the
+# teachers table and PDF handling are imported when first used.
+import argparse
 import customtkinter as ctk
-import tkinter as tk
 from tkinter import filedialog, messagebox
-import json
 import os
-import sqlite3
+import queue
 from datetime import datetime
-from PIL import Image
-import shutil
-import fitz  # PyMuPDF
-from PIL import Image, ImageTk
+from src.lab_repository import LabRepository, SNIPPET_START, SNIPPET_END
+from src.ingestion import IngestionPool, DONE, FAILED
+from src.blob_store import BlobStore
+from src.storage import open_storage
+from src.thumbnail_cache import ThumbnailCache
+from src.events import EventBus, TkEventBridge, TeacherAdded, PracticeAdded, PracticesImported, PracticesUpdated
+from src.practice_query import PracticeFilter
+from src.operations import FOLDERS_DIR, sanitize_filename, register_teacher, practice_destination
+from src.tk_async import TkScheduler, show_busy
+from src.startup_profile import StartupProfiler
+IMPORTED = time.perf_counter()
+
+# Consult tab
+ALL_TEACHERS = "All teachers"
+ALL_SUBJECTS = "All subjects"
+PRACTICE_PAGE_SIZE = 50
+
 
 class LabManagementSystem(ctk.CTk):
 
-    def __init__(self):
+    def __init__(self, profiler=None):
+        self.profiler = profiler or StartupProfiler()
+        window_started = time.perf_counter()
         super().__init__()
 
         # Set theme and appearance
@@ -42,10 +61,12 @@ class LabManagementSystem(ctk.CTk):
 
         # Initialize subjects list
         self.subjects_list = []
-        
+        self.profiler.record("window", window_started, time.perf_counter())
+
         # Initialize database and directories
-        self.setup_database()
-        self.setup_directories()
+        with self.profiler.phase("database"):
+            self.setup_database()
+            self.setup_directories()
 
         # Configure window
         self.title("Laboratory Practice Management System")
@@ -66,17 +87,27 @@ class LabManagementSystem(ctk.CTk):
         self.grid_columnconfigure(1, minsize=content_width, weight=1)  # Content area
 
         # Create and setup frames
-        self.setup_navigation_frame()
+        with self.profiler.phase("navigation"):
+            self.setup_navigation_frame()
         self.setup_main_frames()
         
         # Show default frame
         self.select_frame_by_name("home")
 
+        # Deliver upload progress from worker threads to the UI
+        self.after(100, self.poll_ingestion)
+
+        # Refresh only what changed, once per burst of inserts
+        self.event_bridge = TkEventBridge(self, self.events, self.apply_data_changes)
+
         self.home_container = None
         self.upload_container = None
         self.teachers_container = None
         self.consult_container = None
 
+        # The home screen is usable once Tk has drawn it and goes idle
+        self.after_idle(self.profiler.report)
+
     def setup_main_frames(self):
         """Setup all main content frames"""
         # Calculate content width (75% of screen width)
@@ -100,11 +131,23 @@ class LabManagementSystem(ctk.CTk):
         for frame in [self.home_frame, self.upload_frame, self.teachers_frame, self.consult_frame]:
             frame.grid_propagate(False)
 
-        # Initialize frame contents
-        self.setup_home_frame()
-        self.setup_upload_frame()
-        self.setup_teachers_frame()
-        self.setup_consult_frame()
+        # Only the home frame is filled in now; the others are built on
+        # their first visit, see build_frame()
+        self.frame_builders = {
+            "home": self.setup_home_frame,
+            "upload": self.setup_upload_frame,
+            "teachers": self.setup_teachers_frame,
+            "consult": self.setup_consult_frame
+        }
+        self.built_frames = set()
+        self.build_frame("home")
+
+    def build_frame(self, name):
+        """Create a frame's widgets the first time it is needed"""
+        if name not in self.built_frames:
+            with self.profiler.phase(f"{name} frame"):
+                self.frame_builders[name]()
+            self.built_frames.add(name)
 
     def toggle_fullscreen(self, event=None):
         self.fullscreen = not self.fullscreen
@@ -115,43 +158,34 @@ class LabManagementSystem(ctk.CTk):
         self.attributes("-fullscreen", False)
 
     def setup_database(self):
-        """Initialize SQLite database with the new practice structure"""
-        self.conn = sqlite3.connect('lab_management.db')
-        self.cursor = self.conn.cursor()
-
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS teachers (
-                id INTEGER PRIMARY KEY,
-                name TEXT NOT NULL,
-                subjects TEXT, 
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Create practices table with new structure
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS practices (
-                id INTEGER PRIMARY KEY,
-                teacher_id INTEGER,
-                subject TEXT,
-                title TEXT,
-                objective TEXT,
-                introduction TEXT,
-                summary TEXT,
-                development TEXT,
-                goals TEXT,
-                upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                num_pages INTEGER,
-                file_path TEXT,
-                FOREIGN KEY (teacher_id) REFERENCES teachers (id)
-            )
-        ''')
-
-        self.conn.commit()
+        """Initialize the data layer used by every frame"""
+        self.events = EventBus()
+        self.repository = LabRepository('lab_management.db', events=self.events)
+        self.repository.setup_schema()
+
+        # Practice files live in folders/ or, with $LAB_STORAGE, in a bucket
+        self.storage = open_storage(root=FOLDERS_DIR)
+
+        # Rendered previews, keyed by file content
+        self.thumbnail_cache = ThumbnailCache()
+
+        # Queries and reports run off the Tk thread; results come back via after()
+        self.scheduler = TkScheduler(self)
+        self.report_task = None
+
+        # Uploads are copied and parsed off the Tk thread
+        self.ingestion_events = queue.Queue()
+        self.ingestion = IngestionPool(
+            self.repository,
+            BlobStore(storage=self.storage),
+            max_workers=2,
+            # The status is queued with the job, which workers keep updating
+            on_progress=lambda job: self.ingestion_events.put((job, job.status))
+        )
 
     def setup_directories(self):
         """Create necessary directories for file storage"""
-        self.base_dir = "folders"  # Changed from 'uploads' to 'folders'
+        self.base_dir = FOLDERS_DIR
         if not os.path.exists(self.base_dir):
             os.makedirs(self.base_dir)
 
@@ -286,59 +320,28 @@ class LabManagementSystem(ctk.CTk):
             height=300,
             font=ctk.CTkFont(size=16)
         )
-        self.activities_list.grid(row=1, column=0, padx=20, pady=(0,20), sticky="ew")
+        self.activities_list.grid(row=1, column=0, padx=20, pady=(0,10), sticky="ew")
+
+        self.older_activities_button = ctk.CTkButton(
+            activities_frame,
+            text="Load older activities",
+            command=self.load_older_activities,
+            state="disabled"
+        )
+        self.older_activities_button.grid(row=2, column=0, padx=20, pady=(0,20))
+
+        # Cursors into the activity log: the newest id shown and the last row
+        self.activity_page_size = 10
+        self.newest_activity_id = None
+        self.oldest_activity = None
 
         # Initial update of statistics and activities
         self.update_home_data()
 
     def update_home_data(self):
         """Update all home screen data"""
-        try:
-            # Update practice count
-            self.cursor.execute("SELECT COUNT(*) FROM practices")
-            practice_count = self.cursor.fetchone()[0]
-            self.total_practices_label.configure(text=f"Total Practices: {practice_count}")
-
-            # Update teacher count
-            self.cursor.execute("SELECT COUNT(*) FROM teachers")
-            teacher_count = self.cursor.fetchone()[0]
-            self.total_teachers_label.configure(text=f"Total Teachers: {teacher_count}")
-
-            # Update recent activities with corrected SQL query
-            self.cursor.execute("""
-                SELECT activity, activity_date FROM (
-                    SELECT 
-                        'Practice uploaded: ' || p.title || ' by ' || t.name as activity,
-                        p.upload_date as activity_date
-                    FROM practices p
-                    JOIN teachers t ON p.teacher_id = t.id
-                    
-                    UNION ALL
-                    
-                    SELECT 
-                        'Teacher added: ' || name as activity,
-                        created_at as activity_date
-                    FROM teachers
-                )
-                ORDER BY activity_date DESC
-                LIMIT 10
-            """)
-            
-            activities = self.cursor.fetchall()
-            self.activities_list.delete("1.0", "end")
-            
-            if activities:
-                for activity, date in activities:
-                    formatted_date = datetime.strptime(date, '%Y-%m-%d %H:%M:%S').strftime('%Y-%m-%d %H:%M:%S')
-                    self.activities_list.insert("end", f"[{formatted_date}] {activity}\n\n")
-            else:
-                self.activities_list.insert("1.0", "No recent activities\n")
-
-        except Exception as e:
-            print(f"Error updating home data: {e}")
-            # Add more detailed error information
-            import traceback
-            print(traceback.format_exc())
+        self.update_statistics()
+        self.refresh_activities()
 
     def setup_search_frame(self):
         """Setup search functionality"""
@@ -382,6 +385,70 @@ class LabManagementSystem(ctk.CTk):
         )
         self.total_teachers_label.grid(row=0, column=1, padx=30, pady=20)
 
+    def format_activity(self, activity):
+        return f"[{activity.activity_date}] {activity.description}\n\n"
+
+    def load_activities(self):
+        """Show the first page of the activity log"""
+        self.scheduler.submit(
+            self.repository.get_recent_activities, self.activity_page_size,
+            key="activities",
+            on_done=self.show_activities,
+            on_error=lambda e: print(f"Error loading activities: {e}")
+        )
+
+    def show_activities(self, activities):
+        self.activities_list.delete("1.0", "end")
+        self.newest_activity_id = max((activity.id for activity in activities), default=0)
+        self.oldest_activity = None
+        if activities:
+            self.append_activities(activities)
+        else:
+            self.activities_list.insert("1.0", "No recent activities\n")
+
+    def load_older_activities(self):
+        """Append the next page of older activities"""
+        if self.oldest_activity is not None:
+            self.scheduler.submit(
+                self.repository.get_recent_activities, self.activity_page_size, self.oldest_activity,
+                key="older_activities",
+                on_done=self.append_activities,
+                on_error=lambda e: print(f"Error loading activities: {e}"),
+                loading=show_busy(self.older_activities_button, "Loading...", disable=True)
+            )
+
+    def append_activities(self, activities):
+        for activity in activities:
+            self.activities_list.insert("end", self.format_activity(activity))
+        if activities:
+            self.oldest_activity = activities[-1]
+        more = len(activities) == self.activity_page_size
+        self.older_activities_button.configure(state="normal" if more else "disabled")
+
+    def refresh_activities(self):
+        """Prepend activities logged since the newest one shown"""
+        if self.newest_activity_id is None:
+            # The first page has not been shown yet
+            self.load_activities()
+            return
+        self.scheduler.submit(
+            self.repository.get_activities_since, self.newest_activity_id,
+            key="activities",
+            on_done=self.prepend_activities,
+            on_error=lambda e: print(f"Error refreshing activities: {e}")
+        )
+
+    def prepend_activities(self, activities):
+        if not activities:
+            return
+        if self.oldest_activity is None:
+            # Replace the "No recent activities" placeholder
+            self.activities_list.delete("1.0", "end")
+            self.oldest_activity = activities[0]
+        for activity in activities:
+            self.activities_list.insert("1.0", self.format_activity(activity))
+        self.newest_activity_id = activities[-1].id
+
     def setup_activities_frame(self):
         """Setup recent activities display"""
         self.activities_frame = ctk.CTkFrame(self.home_container, fg_color="gray20")
@@ -512,18 +579,10 @@ class LabManagementSystem(ctk.CTk):
         )
         self.preview_label.grid(row=1, column=0, pady=(10,5))
 
-        # Preview Frame
-        self.preview_frame = ctk.CTkFrame(file_frame, fg_color="gray25")
-        self.preview_frame.grid(row=2, column=0, padx=20, pady=(5,20), sticky="ew")
-        self.preview_frame.grid_columnconfigure(0, weight=1)
-
-        # Preview Image Label
-        self.preview_image_label = ctk.CTkLabel(
-            self.preview_frame,
-            text="No file selected",
-            font=ctk.CTkFont(size=14)
-        )
-        self.preview_image_label.grid(row=0, column=0, padx=10, pady=10)
+        # Paged preview, rendered page by page in the background
+        from src.preview_viewer import PagedPreview
+        self.pdf_preview = PagedPreview(file_frame, self.thumbnail_cache, self.repository, fg_color="gray25")
+        self.pdf_preview.grid(row=2, column=0, padx=20, pady=(5,20), sticky="ew")
 
         # Submit Button
         self.submit_practice_button = ctk.CTkButton(
@@ -535,35 +594,40 @@ class LabManagementSystem(ctk.CTk):
         )
         self.submit_practice_button.grid(row=3, column=0, padx=30, pady=20)
 
+        # Upload progress
+        self.upload_status_label = ctk.CTkLabel(
+            self.upload_container,
+            text="",
+            **self.label_style
+        )
+        self.upload_status_label.grid(row=4, column=0, padx=30, pady=(0,20))
+
     def on_teacher_select(self, choice):
         """Handle teacher selection and update subject combo box"""
         if choice:
-            try:
-                # Get subjects for selected teacher
-                self.cursor.execute("""
-                    SELECT subjects 
-                    FROM teachers 
-                    WHERE name = ?
-                """, (choice,))
-                result = self.cursor.fetchone()
-                
-                if result and result[0]:
-                    # Enable subject combo box and update values
-                    subjects = result[0].split(',')
-                    self.upload_subject_combo.configure(  # Changed here
-                        state="normal",
-                        values=subjects
-                    )
-                    # Set first subject as default
-                    if subjects:
-                        self.upload_subject_combo.set(subjects[0])  # Changed here
-                else:
-                    self.upload_subject_combo.configure(  # Changed here
-                        state="disabled",
-                        values=[]
-                    )
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to load subjects: {str(e)}")
+            self.scheduler.submit(
+                self.repository.get_teacher_subjects, choice,
+                key="teacher_subjects",
+                on_done=self.show_teacher_subjects,
+                on_error=lambda e: messagebox.showerror("Error", f"Failed to load subjects: {str(e)}"),
+                loading=show_busy(self.upload_subject_combo, disable=True)
+            )
+
+    def show_teacher_subjects(self, subjects):
+        """Offer the subjects of the selected teacher in the upload form"""
+        if subjects:
+            # Enable subject combo box and update values
+            self.upload_subject_combo.configure(
+                state="normal",
+                values=subjects
+            )
+            # Set first subject as default
+            self.upload_subject_combo.set(subjects[0])
+        else:
+            self.upload_subject_combo.configure(
+                state="disabled",
+                values=[]
+            )
 
     def setup_teachers_frame(self):
         self.teachers_frame.grid_columnconfigure(0, weight=1)
@@ -587,33 +651,24 @@ class LabManagementSystem(ctk.CTk):
             font=ctk.CTkFont(size=24, weight="bold")
         ).grid(row=0, column=0)
 
-        # Table section
-        table_frame = ctk.CTkFrame(self.teachers_container, fg_color="gray20")
-        table_frame.grid(row=1, column=0, sticky="ew", pady=(0,20))
-        table_frame.grid_columnconfigure(0, weight=1)
-
-        # Table headers
-        headers_frame = ctk.CTkFrame(table_frame, fg_color="gray25")
-        headers_frame.grid(row=0, column=0, sticky="ew", padx=20, pady=10)
-        headers_frame.grid_columnconfigure((0,1,2,3,4), weight=1)
-
-        headers = ["ID", "Name", "Subjects", "Number of Subjects", "Practices Uploaded"]
-        for i, header in enumerate(headers):
-            ctk.CTkLabel(
-                headers_frame,
-                text=header,
-                font=ctk.CTkFont(size=16, weight="bold"),
-                text_color="white"
-            ).grid(row=0, column=i, padx=20, pady=10)
-
-        # Teachers table
-        self.teachers_table = ctk.CTkScrollableFrame(
-            table_frame,
-            height=300,
-            fg_color="transparent"
+        # Table section: only the visible rows have widgets, pages come from SQL
+        from src.virtual_table import VirtualTable, Column
+        self.teachers_table = VirtualTable(
+            self.teachers_container,
+            columns=[
+                Column("id", "ID", 50, anchor="center"),
+                Column("name", "Name", 150),
+                Column("subjects", "Subjects", 300, sortable=False, format=", ".join),
+                Column("subject_count", "Number of Subjects", 150, anchor="center"),
+                Column("practice_count", "Practices Uploaded", 150, anchor="center")
+            ],
+            fetch_page=self.repository.get_teacher_page,
+            scheduler=self.scheduler,
+            visible_rows=8,
+            label_style=self.label_style,
+            fg_color="gray20"
         )
-        self.teachers_table.grid(row=1, column=0, sticky="nsew", padx=20, pady=(0,20))
-        self.teachers_table.grid_columnconfigure((0,1,2,3,4), weight=1)
+        self.teachers_table.grid(row=1, column=0, sticky="ew", pady=(0,20))
 
         # Update table content
         self.update_teachers_table()
@@ -716,118 +771,10 @@ class LabManagementSystem(ctk.CTk):
         )
         self.add_teacher_button.grid(row=5, column=0, columnspan=2, pady=30)
 
-    def setup_teachers_table(self):
-        """Setup table to display teachers information"""
-        # Table frame
-        table_frame = ctk.CTkFrame(self.teachers_container)
-        table_frame.grid(row=1, column=0, padx=20, pady=10, sticky="nsew")
-
-        # Table headers
-        headers = ["ID", "Name", "Subjects", "Number of Subjects", "Practices Uploaded"]
-        for i, header in enumerate(headers):
-            label = ctk.CTkLabel(
-                table_frame, 
-                text=header,
-                font=ctk.CTkFont(weight="bold")
-            )
-            label.grid(row=0, column=i, padx=10, pady=5, sticky="w")
-
-        # Create scrollable frame for table content
-        self.teachers_table = ctk.CTkScrollableFrame(table_frame, height=300)
-        self.teachers_table.grid(row=1, column=0, columnspan=len(headers), sticky="nsew", padx=10, pady=5)
-
-        # Update table content
-        self.update_teachers_table()
-
     def update_teachers_table(self):
-        """Update teachers table with improved styling and alignment"""
-        # Clear existing content
-        for widget in self.teachers_table.winfo_children():
-            widget.destroy()
-
-        # Configure columns with weights
-        for i in range(5):
-            self.teachers_table.grid_columnconfigure(i, weight=1)
-
-        # Column widths (adjust these values as needed)
-        column_widths = {
-            0: 50,   # ID
-            1: 150,  # Name
-            2: 300,  # Subjects
-            3: 150,  # Number of Subjects
-            4: 150   # Practices Uploaded
-        }
-
-        # Get teachers data
-        self.cursor.execute("""
-            SELECT 
-                t.id,
-                t.name,
-                t.subjects,
-                (SELECT COUNT(*) FROM practices WHERE teacher_id = t.id) as practice_count
-            FROM teachers t
-        """)
-        teachers = self.cursor.fetchall()
-
-        # Display teachers with improved styling and alignment
-        for row, teacher in enumerate(teachers):
-            # Create a frame for each row
-            row_frame = ctk.CTkFrame(
-                self.teachers_table,
-                fg_color="gray20" if row % 2 == 0 else "gray25",
-                height=50
-            )
-            row_frame.grid(row=row, column=0, columnspan=5, sticky="ew", pady=1)
-            
-            # Configure columns in row frame
-            for i in range(5):
-                row_frame.grid_columnconfigure(i, weight=1, minsize=column_widths[i])
-
-            # ID
-            ctk.CTkLabel(
-                row_frame,
-                text=str(teacher[0]),
-                width=column_widths[0],
-                anchor="center",
-                **self.label_style
-            ).grid(row=0, column=0, padx=5, pady=10, sticky="ew")
-            
-            # Name
-            ctk.CTkLabel(
-                row_frame,
-                text=teacher[1],
-                width=column_widths[1],
-                anchor="w",
-                **self.label_style
-            ).grid(row=0, column=1, padx=5, pady=10, sticky="ew")
-            
-            # Subjects
-            subjects = teacher[2].split(',') if teacher[2] else []
-            ctk.CTkLabel(
-                row_frame,
-                text=', '.join(subjects),
-                width=column_widths[2],
-                anchor="w",
-                **self.label_style
-            ).grid(row=0, column=2, padx=5, pady=10, sticky="ew")
-            
-            # Number of subjects
-            ctk.CTkLabel(
-                row_frame,
-                text=str(len(subjects)),
-                width=column_widths[3],
-                anchor="center",
-                **self.label_style
-            ).grid(row=0, column=3, padx=5, pady=10, sticky="ew")
-            
-            # Practices count
-            ctk.CTkLabel(
-                row_frame,
-                text=str(teacher[3]),
-                width=column_widths[4],
-                anchor="center",
-                **self.label_style
-            ).grid(row=0, column=4, padx=5, pady=10, sticky="ew")
+        """Reload the visible page of the teachers table"""
+        if "teachers" in self.built_frames:
+            self.teachers_table.refresh()
         
     def setup_add_teacher_section(self):
         """Setup section for adding new teachers"""
@@ -956,117 +903,111 @@ class LabManagementSystem(ctk.CTk):
         name = self.teacher_name_entry.get()
         password = self.password_entry.get()
 
-        if not name:
-            messagebox.showerror("Error", "Teacher name is required")
-            return
-
-        if not self.subjects_list:
-            messagebox.showerror("Error", "At least one subject is required")
-            return
-
         if password != ADMIN_PASSWORD:
             messagebox.showerror("Error", "Invalid admin password")
             return
 
         try:
-            # Create directory structure first
-            if not self.create_teacher_directories(name, self.subjects_list):
-                return
-
-            # Insert teacher into database
-            self.cursor.execute("""
-                INSERT INTO teachers (name, subjects)
-                VALUES (?, ?)
-            """, (name, ','.join(self.subjects_list)))
-            self.conn.commit()
+            # Creates the folders first, then the database row
+            register_teacher(self.repository, self.storage, name, self.subjects_list)
 
-            # Update UI
-            self.add_activity_log(f"New teacher added: {name}")
-            self.update_statistics()
-            self.update_teachers_table()
-            
-            # Clear form
+            # Clear form; the rest of the UI follows the TeacherAdded event
             self.teacher_name_entry.delete(0, "end")
             self.password_entry.delete(0, "end")
             self.subjects_list.clear()
-            
-            # Update all relevant UI elements
-            self.update_all_subject_lists()
+            self.update_subjects_display()
             
             # Show success message
             messagebox.showinfo("Success", "Teacher added successfully!")
             
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to create directories: {str(e)}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to add teacher: {str(e)}")
 
     # Database and File Operations
     def get_teacher_names(self):
         """Get list of teacher names for combo box"""
-        self.cursor.execute("SELECT name FROM teachers")
-        return [row[0] for row in self.cursor.fetchall()]
+        return self.repository.get_teacher_names()
 
     def update_statistics(self):
         """Update statistics display"""
-        # Get practice count
-        self.cursor.execute("SELECT COUNT(*) FROM practices")
-        practice_count = self.cursor.fetchone()[0]
-        self.total_practices_label.configure(text=f"Total Practices: {practice_count}")
-
-        # Get teacher count
-        self.cursor.execute("SELECT COUNT(*) FROM teachers")
-        teacher_count = self.cursor.fetchone()[0]
-        self.total_teachers_label.configure(text=f"Total Teachers: {teacher_count}")
-
-    def add_activity_log(self, activity):
-        """Add new activity to the log and update home screen if visible"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        activity_text = f"[{timestamp}] {activity}\n"
-        
-        if hasattr(self, 'activities_list'):
-            current_text = self.activities_list.get("1.0", "end-1c")
-            self.activities_list.delete("1.0", "end")
-            self.activities_list.insert("1.0", activity_text + current_text)
-        
-        # Update statistics if home frame is visible
-        if self.home_frame.winfo_viewable():
-            self.update_home_data()
+        def count():
+            return self.repository.count_practices(), self.repository.count_teachers()
+
+        def show(counts):
+            practice_count, teacher_count = counts
+            self.total_practices_label.configure(text=f"Total Practices: {practice_count}")
+            self.total_teachers_label.configure(text=f"Total Teachers: {teacher_count}")
+
+        self.scheduler.submit(
+            count,
+            key="statistics",
+            on_done=show,
+            on_error=lambda e: print(f"Error updating statistics: {e}")
+        )
+
+    def apply_data_changes(self, events):
+        """Patch the UI for a batch of data change events"""
+        # The activity log rows were written by triggers with the data
+        self.refresh_activities()
+        self.update_statistics()
+
+        if any(isinstance(event, (TeacherAdded, PracticesImported)) for event in events):
+            # New rows can land anywhere in the sort order, so reload the window
+            self.update_teachers_table()
+            self.update_all_subject_lists()
+        else:
+            teacher_ids = set()
+            for event in events:
+                if isinstance(event, PracticeAdded):
+                    teacher_ids.add(event.teacher_id)
+                elif isinstance(event, PracticesUpdated):
+                    teacher_ids.update(event.teacher_ids)
+            if "teachers" in self.built_frames:
+                # Not keyed: every batch patches its own teachers
+                self.scheduler.submit(
+                    self.repository.get_teachers_by_id,
+                    teacher_ids,
+                    on_done=self.teachers_table.update_rows,
+                    on_error=lambda e: print(f"Error updating teachers: {e}")
+                )
 
     def select_file(self):
         """Handle file selection with preview"""
         try:
+            # Ingestion only parses PDFs, so nothing else can be uploaded
             filename = filedialog.askopenfilename(
-                filetypes=[
-                    ("PDF files", "*.pdf"),
-                    ("Word files", "*.doc;*.docx"),
-                    ("All files", "*.*")
-                ]
+                filetypes=[("PDF files", "*.pdf *.PDF")]
             )
             
             if filename:
+                if not filename.lower().endswith('.pdf'):
+                    messagebox.showerror("Error", "Only PDF files can be uploaded")
+                    self.selected_file_path = None
+                    self.upload_file_button.configure(text="Select File")
+                    self.pdf_preview.clear()
                 # Verify file exists and is readable
-                if os.path.exists(filename) and os.access(filename, os.R_OK):
+                elif os.path.exists(filename) and os.access(filename, os.R_OK):
                     self.selected_file_path = filename
                     display_name = os.path.basename(filename)
                     self.upload_file_button.configure(text=f"Selected: {display_name}")
-                    
-                    # Show preview if it's a PDF
-                    if filename.lower().endswith('.pdf'):
-                        self.show_pdf_preview(filename)
-                    else:
-                        self.preview_image_label.configure(text="Preview only available for PDF files")
+                    self.show_pdf_preview(filename)
                 else:
                     messagebox.showerror("Error", "Selected file is not accessible")
                     self.selected_file_path = None
                     self.upload_file_button.configure(text="Select File")
-                    self.preview_image_label.configure(text="")
+                    self.pdf_preview.clear()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to select file: {str(e)}")
             self.selected_file_path = None
             self.upload_file_button.configure(text="Select File")
-            self.preview_image_label.configure(text="")
+            self.pdf_preview.clear()
 
     def submit_practice(self):
-        """Handle practice submission with organized file storage"""
+        """Queue the practice for copying, parsing and storage in the background"""
         if not self.validate_practice_form():
             return
 
@@ -1077,74 +1018,25 @@ class LabManagementSystem(ctk.CTk):
             practice_title = self.sanitize_filename(self.title_entry.get())  # Use sanitize_filename here
 
             # Get teacher ID
-            self.cursor.execute("SELECT id FROM teachers WHERE name = ?", (teacher_name,))
-            teacher_id = self.cursor.fetchone()[0]
-
-            if hasattr(self, 'selected_file_path'):
-                try:
-                    # Generate filename with pattern: practiceName_subject_teacherID_date.pdf
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    filename = self.sanitize_filename(f"{practice_title}_{subject}_teacher{teacher_id}_{timestamp}.pdf")  # Use sanitize_filename here
-                    
-                    # Create path to subject directory
-                    destination_dir = os.path.join(self.base_dir, teacher_name, subject)
-                    
-                    # Ensure directory exists
-                    os.makedirs(destination_dir, exist_ok=True)
-                    
-                    destination = os.path.join(destination_dir, filename)
-                    
-                    # Copy file using plain file operations
-                    with open(self.selected_file_path, 'rb') as src_file:
-                        with open(destination, 'wb') as dst_file:
-                            dst_file.write(src_file.read())
-
-                    # Process the PDF
-                    practice_info = self.process_pdf(self.selected_file_path)
-                    if not practice_info:
-                        practice_info = {
-                            'num_pages': 0,
-                            'objective': "File processing failed",
-                            'introduction': "File processing failed",
-                            'summary': "File processing failed",
-                            'development': "File processing failed",
-                            'goals': "File processing failed"
-                        }
-
-                    # Insert practice into database
-                    self.cursor.execute("""
-                        INSERT INTO practices (
-                            teacher_id, subject, title, objective,
-                            introduction, summary, development, goals,
-                            num_pages, file_path
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        teacher_id,
-                        subject,
-                        practice_title,
-                        self.objective_text.get("1.0", "end-1c") or practice_info['objective'],
-                        practice_info['introduction'],
-                        practice_info['summary'],
-                        practice_info['development'],
-                        practice_info['goals'],
-                        practice_info['num_pages'],
-                        destination  # Store the full path
-                    ))
-                    self.conn.commit()
-
-                    # Update UI
-                    self.add_activity_log(f"New practice added: {practice_title}")
-                    self.update_statistics()
-                    self.clear_practice_form()
-                    
-                    messagebox.showinfo("Success", "Practice submitted successfully!")
-                    
-                except IOError as e:
-                    messagebox.showerror("File Error", f"Failed to copy file: {str(e)}")
-                except Exception as e:
-                    messagebox.showerror("Error", f"Failed to process practice: {str(e)}")
-            else:
-                messagebox.showerror("Error", "No file selected")
+            teacher_id = self.repository.get_teacher_id(teacher_name)
+            if teacher_id is None:
+                # The combobox is editable, so the name may not be a registered teacher
+                messagebox.showerror("Error", f"Teacher '{teacher_name}' does not exist")
+                return
+
+            # Destination follows practiceName_subject_teacherID_date.pdf
+            destination = practice_destination(self.storage, teacher_name, teacher_id, subject, practice_title)
+
+            self.ingestion.submit(
+                teacher_id,
+                teacher_name,
+                subject,
+                practice_title,
+                self.objective_text.get("1.0", "end-1c"),
+                self.selected_file_path,
+                destination
+            )
+            self.clear_practice_form()
         
         except Exception as e:
             messagebox.showerror("Error", f"Failed to submit practice: {str(e)}")
@@ -1153,6 +1045,29 @@ class LabManagementSystem(ctk.CTk):
             print("Error details:")
             print(traceback.format_exc())
 
+    def poll_ingestion(self):
+        """Apply progress reported by upload workers, then check again later"""
+        try:
+            while True:
+                job, status = self.ingestion_events.get_nowait()
+                if status == DONE:
+                    messagebox.showinfo("Success", f"Practice {job.title} submitted successfully!")
+                elif status == FAILED:
+                    messagebox.showerror("Error", f"Failed to upload {job.title}: {job.error}")
+        except queue.Empty:
+            pass
+
+        # Uploads can only be started once the upload frame exists
+        if "upload" in self.built_frames:
+            active = self.ingestion.active_jobs()
+            if active:
+                progress = ", ".join(f"{job.title} ({job.status} {int(job.progress * 100)}%)" for job in active)
+                self.upload_status_label.configure(text=f"Uploading: {progress}")
+            else:
+                self.upload_status_label.configure(text="")
+
+        self.after(100, self.poll_ingestion)
+
     def validate_practice_form(self):
         """Validate practice form inputs"""
         if not self.title_entry.get().strip():
@@ -1164,7 +1079,7 @@ class LabManagementSystem(ctk.CTk):
         if not self.upload_subject_combo.get():  # Changed here
             messagebox.showerror("Error", "Please select a subject")
             return False
-        if not hasattr(self, 'selected_file_path'):
+        if not getattr(self, 'selected_file_path', None):
             messagebox.showerror("Error", "Please select a practice file")
             return False
         return True
@@ -1176,7 +1091,7 @@ class LabManagementSystem(ctk.CTk):
         self.upload_subject_combo.configure(state="disabled", values=[])  # Changed here
         self.objective_text.delete("1.0", "end")
         self.upload_file_button.configure(text="Select File")
-        self.preview_image_label.configure(image="", text="")
+        self.pdf_preview.clear()
         if hasattr(self, 'selected_file_path'):
             del self.selected_file_path
 
@@ -1187,21 +1102,14 @@ class LabManagementSystem(ctk.CTk):
             messagebox.showinfo("Info", "Please enter a search term")
             return
 
-        try:
-            self.cursor.execute("""
-                SELECT p.title, p.subject, t.name 
-                FROM practices p
-                JOIN teachers t ON p.teacher_id = t.id
-                WHERE p.title LIKE ? OR p.subject LIKE ? OR t.name LIKE ?
-            """, (f"%{search_term}%", f"%{search_term}%", f"%{search_term}%"))
-            
-            results = self.cursor.fetchall()
-            
-            # Show results in a new window
-            self.show_search_results(results)
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Search failed: {str(e)}")
+        # A new search supersedes one that is still running
+        self.scheduler.submit(
+            self.repository.search_practices, search_term,
+            key="search",
+            on_done=self.show_search_results,
+            on_error=lambda e: messagebox.showerror("Error", f"Search failed: {str(e)}"),
+            loading=show_busy(self.search_button, "Searching...")
+        )
 
     def show_search_results(self, results):
         """Display search results in a new window"""
@@ -1212,16 +1120,28 @@ class LabManagementSystem(ctk.CTk):
         # Create results display
         results_text = ctk.CTkTextbox(results_window, width=460, height=360)
         results_text.pack(padx=20, pady=20)
+        results_text.tag_config("match", foreground="#4da6ff")
 
         if not results:
             results_text.insert("1.0", "No results found.")
         else:
-            for title, subject, teacher in results:
-                results_text.insert("end", f"Title: {title}\n")
-                results_text.insert("end", f"Subject: {subject}\n")
-                results_text.insert("end", f"Teacher: {teacher}\n")
+            for result in results:
+                results_text.insert("end", f"Title: {result.title}\n")
+                results_text.insert("end", f"Subject: {result.subject}\n")
+                results_text.insert("end", f"Teacher: {result.teacher_name}\n")
+                if result.snippet:
+                    self.insert_highlighted_snippet(results_text, result.snippet)
                 results_text.insert("end", "-" * 40 + "\n")
 
+    def insert_highlighted_snippet(self, textbox, snippet):
+        """Insert a search snippet, tagging the matched terms"""
+        for i, part in enumerate(snippet.split(SNIPPET_START)):
+            matched, _, rest = part.partition(SNIPPET_END) if i else ("", "", part)
+            if matched:
+                textbox.insert("end", matched, "match")
+            textbox.insert("end", rest)
+        textbox.insert("end", "\n")
+
     def select_frame_by_name(self, name):
         """Switch between different frames"""
         frames = {
@@ -1230,60 +1150,14 @@ class LabManagementSystem(ctk.CTk):
             "teachers": self.teachers_frame,
             "consult": self.consult_frame
         }
-        
+        self.build_frame(name)
+
         for frame_name, frame in frames.items():
             if frame_name == name:
                 frame.grid(row=0, column=1, sticky="nsew", padx=5, pady=10)
             else:
                 frame.grid_remove()
 
-    def process_pdf(self, file_path):
-        """Extract information from PDF file with better error handling"""
-        try:
-            import PyPDF2
-            with open(file_path, 'rb') as file:
-                try:
-                    pdf = PyPDF2.PdfReader(file)
-                    num_pages = len(pdf.pages)
-                    
-                    # Extract text from first few pages for analysis
-                    text = ""
-                    try:
-                        for i in range(min(3, num_pages)):
-                            text += pdf.pages[i].extract_text()
-                    except:
-                        # If text extraction fails, continue with basic info
-                        pass
-
-                    return {
-                        'num_pages': num_pages,
-                        'objective': "To be extracted by LLM",
-                        'introduction': "To be extracted by LLM",
-                        'summary': "To be generated by LLM",
-                        'development': "To be extracted by LLM",
-                        'goals': "To be extracted by LLM"
-                    }
-                except Exception as e:
-                    # If PDF processing fails, return basic info
-                    return {
-                        'num_pages': 0,  # Unable to determine page count
-                        'objective': "Unable to extract",
-                        'introduction': "Unable to extract",
-                        'summary': "Unable to extract",
-                        'development': "Unable to extract",
-                        'goals': "Unable to extract"
-                    }
-        except Exception as e:
-            # Return default values if file processing completely fails
-            return {
-                'num_pages': 0,
-                'objective': "File processing failed",
-                'introduction': "File processing failed",
-                'summary': "File processing failed",
-                'development': "File processing failed",
-                'goals': "File processing failed"
-            }
-        
     def setup_consult_frame(self):
         self.consult_frame.grid_columnconfigure(0, weight=1)
         
@@ -1344,19 +1218,52 @@ class LabManagementSystem(ctk.CTk):
         
         self.teacher_search_combo = ctk.CTkComboBox(
             search_frame,
-            values=self.get_teacher_names(),
+            values=[ALL_TEACHERS] + self.get_teacher_names(),
             width=200,
             **self.entry_style
         )
+        self.teacher_search_combo.set(ALL_TEACHERS)
         self.teacher_search_combo.grid(row=1, column=1, padx=(0,20), pady=15, sticky="w")
         
-        self.search_by_teacher_button = ctk.CTkButton(
+        self.apply_filters_button = ctk.CTkButton(
             search_frame,
-            text="Search by Teacher",
-            command=self.search_by_teacher,
+            text="Apply Filters",
+            command=self.apply_practice_filters,
             **self.button_style
         )
-        self.search_by_teacher_button.grid(row=1, column=2, padx=20, pady=15)
+        self.apply_filters_button.grid(row=1, column=2, padx=20, pady=15)
+
+        # Subject filter
+        ctk.CTkLabel(
+            search_frame,
+            text="Subject:",
+            **self.label_style
+        ).grid(row=2, column=0, padx=20, pady=15, sticky="e")
+
+        self.subject_filter_combo = ctk.CTkComboBox(
+            search_frame,
+            values=[ALL_SUBJECTS] + self.get_existing_subjects(),
+            width=200,
+            **self.entry_style
+        )
+        self.subject_filter_combo.set(ALL_SUBJECTS)
+        self.subject_filter_combo.grid(row=2, column=1, padx=(0,20), pady=15, sticky="w")
+
+        self.clear_filters_button = ctk.CTkButton(
+            search_frame,
+            text="Clear Filters",
+            command=self.clear_practice_filters,
+            **self.button_style
+        )
+        self.clear_filters_button.grid(row=2, column=2, padx=20, pady=15)
+
+        # Date range and page count filters, as from/to pairs
+        self.date_from_entry, self.date_to_entry = self.add_range_filter(
+            search_frame, 3, "Uploaded:", "YYYY-MM-DD"
+        )
+        self.min_pages_entry, self.max_pages_entry = self.add_range_filter(
+            search_frame, 4, "Pages:", "number"
+        )
 
         # Results section with improved styling
         results_frame = ctk.CTkFrame(self.consult_container, fg_color="gray20")
@@ -1368,7 +1275,16 @@ class LabManagementSystem(ctk.CTk):
             results_frame,
             text="Practice List",
             font=ctk.CTkFont(size=20, weight="bold")
-        ).grid(row=0, column=0, padx=20, pady=15)
+        ).grid(row=0, column=0, padx=20, pady=(15,0))
+
+        # Facet counts for the current filters
+        self.facets_label = ctk.CTkLabel(
+            results_frame,
+            text="",
+            wraplength=800,
+            **self.label_style
+        )
+        self.facets_label.grid(row=1, column=0, padx=20, pady=(0,10))
 
         # Results textbox with improved styling
         self.practice_listbox = ctk.CTkTextbox(
@@ -1376,7 +1292,19 @@ class LabManagementSystem(ctk.CTk):
             height=300,
             font=ctk.CTkFont(size=16)
         )
-        self.practice_listbox.grid(row=1, column=0, padx=20, pady=(0,20), sticky="nsew")
+        self.practice_listbox.grid(row=2, column=0, padx=20, pady=(0,10), sticky="nsew")
+
+        self.more_practices_button = ctk.CTkButton(
+            results_frame,
+            text="Load more",
+            command=self.load_more_practices,
+            state="disabled"
+        )
+        self.more_practices_button.grid(row=3, column=0, padx=20, pady=(0,20))
+
+        # Keyset cursor into the current result list
+        self.practice_filters = None
+        self.last_practice_row = None
 
         # Generate PDF button with consistent styling
         self.generate_pdf_button = ctk.CTkButton(
@@ -1387,220 +1315,215 @@ class LabManagementSystem(ctk.CTk):
         )
         self.generate_pdf_button.grid(row=3, column=0, padx=30, pady=20)
 
+    def add_range_filter(self, parent, row, label, placeholder):
+        """Add a labelled from/to pair of entries and return them"""
+        ctk.CTkLabel(
+            parent,
+            text=label,
+            **self.label_style
+        ).grid(row=row, column=0, padx=20, pady=15, sticky="e")
+
+        range_frame = ctk.CTkFrame(parent, fg_color="transparent")
+        range_frame.grid(row=row, column=1, columnspan=2, padx=(0,20), pady=15, sticky="w")
+        entries = []
+        for column, prefix in enumerate(("from", "to")):
+            entry = ctk.CTkEntry(
+                range_frame,
+                width=150,
+                placeholder_text=f"{prefix} {placeholder}",
+                **self.entry_style
+            )
+            entry.grid(row=0, column=column, padx=(0,10))
+            entries.append(entry)
+        return entries
+
+    def read_practice_filters(self):
+        """Build a PracticeFilter from the consult form; raises ValueError"""
+        def text(entry):
+            return entry.get().strip() or None
+
+        def number(entry, name):
+            value = text(entry)
+            if value is None:
+                return None
+            if not value.isdigit():
+                raise ValueError(f"{name} must be a whole number")
+            return int(value)
+
+        teacher_name = self.teacher_search_combo.get()
+        subject = self.subject_filter_combo.get()
+        return PracticeFilter(
+            teacher_name=None if teacher_name in ("", ALL_TEACHERS) else teacher_name,
+            subject=None if subject in ("", ALL_SUBJECTS) else subject,
+            date_from=text(self.date_from_entry),
+            date_to=text(self.date_to_entry),
+            min_pages=number(self.min_pages_entry, "Minimum pages"),
+            max_pages=number(self.max_pages_entry, "Maximum pages")
+        )
+
     def search_by_practice_id(self):
         """Search practice by ID"""
-        practice_id = self.practice_id_entry.get()
+        practice_id = self.practice_id_entry.get().strip()
         if not practice_id:
             messagebox.showwarning("Warning", "Please enter a practice ID")
             return
-
-        try:
-            self.cursor.execute("""
-                SELECT p.*, t.name as teacher_name 
-                FROM practices p
-                JOIN teachers t ON p.teacher_id = t.id
-                WHERE p.id = ?
-            """, (practice_id,))
-            
-            practice = self.cursor.fetchone()
-            if practice:
-                self.display_practice_results([practice])
-            else:
-                messagebox.showinfo("Info", "No practice found with this ID")
-        except Exception as e:
-            messagebox.showerror("Error", f"Search failed: {str(e)}")
-
-    def search_by_teacher(self):
-        """Search practices by teacher"""
-        teacher_name = self.teacher_search_combo.get()
-        if not teacher_name:
-            messagebox.showwarning("Warning", "Please select a teacher")
+        if not practice_id.isdigit():
+            messagebox.showwarning("Warning", "Practice ID must be a number")
             return
 
+        self.show_practices(PracticeFilter(practice_id=int(practice_id)))
+
+    def apply_practice_filters(self):
+        """List the practices matching the consult filters"""
         try:
-            self.cursor.execute("""
-                SELECT p.*, t.name as teacher_name 
-                FROM practices p
-                JOIN teachers t ON p.teacher_id = t.id
-                WHERE t.name = ?
-            """, (teacher_name,))
-            
-            practices = self.cursor.fetchall()
-            if practices:
-                self.display_practice_results(practices)
-            else:
-                messagebox.showinfo("Info", "No practices found for this teacher")
-        except Exception as e:
-            messagebox.showerror("Error", f"Search failed: {str(e)}")
+            filters = self.read_practice_filters()
+        except ValueError as e:
+            messagebox.showwarning("Warning", str(e))
+            return
+        self.show_practices(filters)
+
+    def clear_practice_filters(self):
+        self.scheduler.cancel("practices")
+        self.scheduler.cancel("more_practices")
+        self.teacher_search_combo.set(ALL_TEACHERS)
+        self.subject_filter_combo.set(ALL_SUBJECTS)
+        for entry in (self.date_from_entry, self.date_to_entry, self.min_pages_entry, self.max_pages_entry):
+            entry.delete(0, "end")
+        self.practice_id_entry.delete(0, "end")
+        self.practice_listbox.delete("1.0", "end")
+        self.facets_label.configure(text="")
+        self.more_practices_button.configure(state="disabled")
+
+    def show_practices(self, filters):
+        """Show the facet counts and the first page of results for filters"""
+        def query():
+            return (self.repository.get_practice_facets(filters),
+                    self.repository.find_practices(filters, limit=PRACTICE_PAGE_SIZE))
+
+        # Paging through the previous results stops with a new search
+        self.scheduler.cancel("more_practices")
+        self.scheduler.submit(
+            query,
+            key="practices",
+            on_done=lambda result: self.show_practice_page(filters, *result),
+            on_error=lambda e: messagebox.showerror("Error", f"Search failed: {str(e)}"),
+            loading=show_busy(self.facets_label, "Searching...")
+        )
 
-    def display_practice_results(self, practices):
-        """Display practice results in the listbox"""
+    def show_practice_page(self, filters, facets, rows):
         self.practice_listbox.delete("1.0", "end")
-        self.current_practices = practices  # Store for PDF generation
+        self.practice_filters = filters
+        self.report_scope = {"filters": filters}
+        self.show_facets(facets)
+        if rows:
+            self.display_practice_results(rows)
+        else:
+            self.last_practice_row = None
+            self.more_practices_button.configure(state="disabled")
+            self.practice_listbox.insert("end", "No practices match these filters\n")
+
+    def show_facets(self, facets):
+        def counts(values):
+            return ", ".join(f"{name} ({count})" for name, count in
+                             sorted(values.items(), key=lambda item: (-item[1], item[0])))
+
+        lines = [f"{facets.total} practices"]
+        if len(facets.teachers) > 1:
+            lines.append(f"Teachers: {counts(facets.teachers)}")
+        if len(facets.subjects) > 1:
+            lines.append(f"Subjects: {counts(facets.subjects)}")
+        self.facets_label.configure(text="\n".join(lines))
+
+    def load_more_practices(self):
+        """Append the next page of results"""
+        if self.practice_filters is None or self.last_practice_row is None:
+            return
+        self.scheduler.submit(
+            self.repository.find_practices, self.practice_filters, self.last_practice_row, PRACTICE_PAGE_SIZE,
+            key="more_practices",
+            on_done=self.display_practice_results,
+            on_error=lambda e: messagebox.showerror("Error", f"Search failed: {str(e)}"),
+            loading=show_busy(self.more_practices_button, "Loading...", disable=True)
+        )
 
+    def display_practice_results(self, practices):
+        """Append a page of practice rows to the listbox"""
         for practice in practices:
-            self.practice_listbox.insert("end", f"ID: {practice[0]}\n")
-            self.practice_listbox.insert("end", f"Title: {practice[3]}\n")
-            self.practice_listbox.insert("end", f"Subject: {practice[2]}\n")
-            self.practice_listbox.insert("end", f"Teacher: {practice[-1]}\n")
-            self.practice_listbox.insert("end", f"Date: {practice[9]}\n")
+            self.practice_listbox.insert("end", f"ID: {practice.id}\n")
+            self.practice_listbox.insert("end", f"Title: {practice.title}\n")
+            self.practice_listbox.insert("end", f"Subject: {practice.subject}\n")
+            self.practice_listbox.insert("end", f"Teacher: {practice.teacher_name}\n")
+            self.practice_listbox.insert("end", f"Date: {practice.upload_date}\n")
+            self.practice_listbox.insert("end", f"Pages: {practice.num_pages}\n")
             self.practice_listbox.insert("end", "-" * 40 + "\n")
 
+        if practices:
+            self.last_practice_row = practices[-1]
+        more = len(practices) == PRACTICE_PAGE_SIZE
+        self.more_practices_button.configure(state="normal" if more else "disabled")
+
     def generate_practice_pdf(self):
-        """Generate PDF report for selected practice"""
-        if not hasattr(self, 'current_practices'):
+        """Generate a PDF report of the listed practices in the background"""
+        if not hasattr(self, 'report_scope'):
             messagebox.showwarning("Warning", "Please search for a practice first")
             return
+        if self.report_task is not None:
+            messagebox.showinfo("Info", "A report is already being generated")
+            return
 
-        try:
-            from fpdf import FPDF
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        pdf_path = f"practice_report_{timestamp}.pdf"
+        scope = dict(self.report_scope)
 
-            # Create PDF
-            pdf = FPDF()
-            
-            for practice in self.current_practices:
-                pdf.add_page()
-                
-                # Header
-                pdf.set_font('Arial', 'B', 16)
-                pdf.cell(0, 10, 'Practice Report', 0, 1, 'C')
-                pdf.ln(10)
-
-                # Practice details
-                pdf.set_font('Arial', 'B', 12)
-                details = [
-                    f"Practice ID: {practice[0]}",
-                    f"Teacher: {practice[-1]}",
-                    f"Subject: {practice[2]}",
-                    f"Title: {practice[3]}",
-                    f"Date: {practice[9]}",
-                    f"Number of Pages: {practice[10]}",
-                    "",
-                    "Objective:",
-                    practice[4],
-                    "",
-                    "Introduction:",
-                    practice[5],
-                    "",
-                    "Summary:",
-                    practice[6],
-                    "",
-                    "Development:",
-                    practice[7],
-                    "",
-                    "Goals:",
-                    practice[8]
-                ]
-
-                pdf.set_font('Arial', '', 12)
-                for detail in details:
-                    pdf.multi_cell(0, 10, detail)
-
-            # Save PDF
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            pdf_path = f"practice_report_{timestamp}.pdf"
-            pdf.output(pdf_path)
-            
-            messagebox.showinfo("Success", f"PDF report generated: {pdf_path}")
-            
-            # Open PDF
-            import os
-            os.startfile(pdf_path) if os.name == 'nt' else os.system(f'open {pdf_path}')
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to generate PDF: {str(e)}")
+        def show_progress(done, total):
+            self.generate_pdf_button.configure(text=f"Generating report... {done}/{total}")
+
+        def run():
+            # Rows are streamed from this thread's own database connection
+            from src.pdf_generator import generate_report
+            generate_report(
+                self.repository, pdf_path,
+                on_progress=lambda done, total: self.scheduler.post(show_progress, done, total),
+                **scope
+            )
+            return pdf_path
+
+        self.report_task = self.scheduler.submit(
+            run,
+            on_done=self.report_generated,
+            on_error=self.report_failed,
+            loading=show_busy(self.generate_pdf_button, "Generating report...", disable=True)
+        )
+
+    def report_generated(self, pdf_path):
+        self.report_task = None
+        self.repository.log_activity("report_generated", f"Report generated: {pdf_path}")
+        self.refresh_activities()
+        messagebox.showinfo("Success", f"PDF report generated: {pdf_path}")
+
+        # Open PDF
+        os.startfile(pdf_path) if os.name == 'nt' else os.system(f'open {pdf_path}')
+
+    def report_failed(self, error):
+        self.report_task = None
+        messagebox.showerror("Error", f"Failed to generate PDF: {str(error)}")
 
-    def create_teacher_directories(self, teacher_name, subjects):
-        """Create directory structure for a new teacher"""
-        try:
-            # Create teacher's main directory
-            teacher_dir = os.path.join(self.base_dir, teacher_name)
-            if not os.path.exists(teacher_dir):
-                os.makedirs(teacher_dir)
-
-            # Create subdirectories for each subject
-            for subject in subjects:
-                subject_dir = os.path.join(teacher_dir, subject.strip())
-                if not os.path.exists(subject_dir):
-                    os.makedirs(subject_dir)
-
-            return True
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to create directories: {str(e)}")
-            return False
-        
     def sanitize_filename(self, filename):
         """Sanitize filename to prevent issues"""
-        # Remove or replace problematic characters
-        invalid_chars = '<>:"/\\|?*'
-        for char in invalid_chars:
-            filename = filename.replace(char, '_')
-        
-        # Replace spaces with underscores
-        filename = filename.replace(' ', '_')
-        
-        # Limit length
-        if len(filename) > 200:
-            name, ext = os.path.splitext(filename)
-            filename = name[:196] + ext
-        
-        return filename
+        return sanitize_filename(filename)
     
     def show_pdf_preview(self, pdf_path):
-        """Show preview of the first page of the PDF"""
-        try:
-            # Open PDF
-            doc = fitz.open(pdf_path)
-            
-            # Get first page
-            page = doc[0]
-            
-            # Convert to image
-            pix = page.get_pixmap(matrix=fitz.Matrix(1, 1))  # 1:1 scale
-            
-            # Convert to PIL Image
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            
-            # Resize to fit preview frame (maintain aspect ratio)
-            preview_width = 380  # Slightly smaller than frame width
-            aspect_ratio = img.height / img.width
-            preview_height = int(preview_width * aspect_ratio)
-            
-            if preview_height > 480:  # Max height
-                preview_height = 480
-                preview_width = int(preview_height / aspect_ratio)
-            
-            img = img.resize((preview_width, preview_height), Image.Resampling.LANCZOS)
-            
-            # Convert to PhotoImage
-            photo = ImageTk.PhotoImage(img)
-            
-            # Update preview label
-            self.preview_image_label.configure(image=photo)
-            self.preview_image_label.image = photo  # Keep reference
-            
-            doc.close()
-        except Exception as e:
-            self.preview_image_label.configure(text="Preview not available")
-            print(f"Preview error: {str(e)}")
+        """Show a paged preview of the PDF, starting at the first page"""
+        self.pdf_preview.load(pdf_path)
         
     def get_practice_path(self, teacher_name, subject, filename):
-        """Helper function to get the full path for a practice file"""
-        return os.path.join(self.base_dir, teacher_name, subject, filename)
+        """Helper function to get a local file for a stored practice, fetching it if needed"""
+        return self.storage.local_path(os.path.join(self.base_dir, teacher_name, subject, filename))
     
     def get_existing_subjects(self):
         """Get all unique subjects from the database"""
         try:
-            self.cursor.execute("SELECT subjects FROM teachers")
-            all_subjects = self.cursor.fetchall()
-            unique_subjects = set()
-            
-            for subjects_str in all_subjects:
-                if subjects_str[0]:  # Check if not None
-                    subjects = [s.strip() for s in subjects_str[0].split(',')]
-                    unique_subjects.update(s for s in subjects if s)  # Only add non-empty subjects
-                    
-            return sorted(list(unique_subjects))
+            return self.repository.get_existing_subjects()
         except Exception as e:
             print(f"Error getting subjects: {e}")
             return []
@@ -1619,14 +1542,29 @@ class LabManagementSystem(ctk.CTk):
     def update_consult_teacher_list(self):
         """Update the teacher list in the Consult frame"""
         if hasattr(self, 'teacher_search_combo'):
-            self.teacher_search_combo.configure(values=self.get_teacher_names())
+            self.scheduler.submit(
+                self.repository.get_teacher_names,
+                key="consult_teachers",
+                on_done=lambda names: self.teacher_search_combo.configure(values=[ALL_TEACHERS] + names),
+                on_error=lambda e: print(f"Error updating teacher list: {e}")
+            )
 
     def update_all_subject_lists(self):
         """Update all UI elements that contain subject lists"""
+        def load():
+            return self.repository.get_existing_subjects(), self.repository.get_teacher_names()
+
+        self.scheduler.submit(
+            load,
+            key="subject_lists",
+            on_done=self.show_subject_lists,
+            on_error=lambda e: print(f"Error updating subject lists: {e}")
+        )
+
+    def show_subject_lists(self, lists):
+        """Fill the subject and teacher combo boxes with freshly loaded lists"""
+        subjects, teacher_names = lists
         try:
-            # Get updated list of subjects
-            subjects = self.get_existing_subjects()
-            
             # Update the add subject combo box in teachers frame
             if hasattr(self, 'add_subject_combo'):
                 self.add_subject_combo.configure(values=subjects)
@@ -1636,14 +1574,16 @@ class LabManagementSystem(ctk.CTk):
                 current_state = self.upload_subject_combo.cget("state")
                 if current_state == "normal":
                     self.upload_subject_combo.configure(values=subjects)
-            
-            # Clear and update subjects display
-            self.subjects_list.clear()
-            self.update_subjects_display()
+
+            # Update the subject filter in the consult frame
+            if hasattr(self, 'subject_filter_combo'):
+                self.subject_filter_combo.configure(values=[ALL_SUBJECTS] + subjects)
             
             # Update teacher-related combo boxes
-            self.teacher_combo.configure(values=self.get_teacher_names())
-            self.update_consult_teacher_list()
+            if hasattr(self, 'teacher_combo'):
+                self.teacher_combo.configure(values=teacher_names)
+            if hasattr(self, 'teacher_search_combo'):
+                self.teacher_search_combo.configure(values=[ALL_TEACHERS] + teacher_names)
             
         except Exception as e:
             print(f"Error updating subject lists: {e}")
@@ -1670,7 +1610,12 @@ class LabManagementSystem(ctk.CTk):
     def teachers_button_event(self):
         self.select_frame_by_name("teachers")
         # Update the subjects combo box with current subjects
-        self.add_subject_combo.configure(values=self.get_existing_subjects())
+        self.scheduler.submit(
+            self.repository.get_existing_subjects,
+            key="add_subjects",
+            on_done=lambda subjects: self.add_subject_combo.configure(values=subjects),
+            on_error=lambda e: print(f"Error getting subjects: {e}")
+        )
         # Clear the current subjects list
         self.subjects_list = []
         self.update_subjects_display()
@@ -1678,7 +1623,9 @@ class LabManagementSystem(ctk.CTk):
     def on_closing(self):
         """Handle application closing"""
         if messagebox.askokcancel("Quit", "Do you want to quit?"):
-            self.conn.close()
+            self.scheduler.shutdown()
+            self.ingestion.shutdown(wait=True)
+            self.repository.close()
             self.quit()
 
     def consult_button_event(self):
@@ -1686,7 +1633,14 @@ class LabManagementSystem(ctk.CTk):
         self.update_consult_teacher_list()  # Add this line
 
 if __name__ == "__main__":
-    app = LabManagementSystem()
+    parser = argparse.ArgumentParser(description="Laboratory Practice Management System")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print how long each startup phase takes")
+    args = parser.parse_args()
+
+    profiler = StartupProfiler(enabled=args.profile_startup, started=STARTED)
+    profiler.record("imports", STARTED, IMPORTED)
+    app = LabManagementSystem(profiler)
     app.protocol("WM_DELETE_WINDOW", app.on_closing)
     app.mainloop()
     
\ No newline at end of file
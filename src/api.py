@@ -0,0 +1,386 @@
+# api.py
+"""HTTP API over the laboratory database
+
+    GET  /teachers?after=&limit=
+    GET  /practices?teacher=&subject=&date_from=&date_to=&min_pages=&max_pages=&facets=&after=&limit=
+    GET  /practices/{id}
+    GET  /practices/{id}/file      with ETag / If-None-Match and single-range Range requests
+    POST /practices                multipart form: teacher, subject, title, objective, file
+    GET  /jobs/{id}                progress of an upload
+    GET  /search?q=&offset=&limit=&snippets=
+
+Lists come back as {"items": [...], "next": ...}; pass next as after (or
+offset, for search) to get the following page. Uploads are answered with
+202 and a job that is copied, parsed and stored in the background.
+
+Run with python -m src.api [--host HOST] [--port PORT] [--db PATH] ..., or
+with any ASGI server as src.api:app, configured through $LAB_DB, the
+folders/ directory and $LAB_STORAGE. Handlers are async; database and file
+work runs in the server's thread pool, where every thread keeps its own
+connection from the repository.
+
+Needs starlette, plus python-multipart for uploads and uvicorn to serve.
+"""
+import argparse
+import base64
+import html
+import json
+import os
+import shutil
+import tempfile
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+from urllib.parse import quote
+
+import anyio
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from src.blob_store import BlobStore
+from src.ingestion import IngestionPool
+from src.lab_repository import DATABASE_PATH, LabRepository, SNIPPET_START, SNIPPET_END
+from src.operations import FOLDERS_DIR, practice_destination, sanitize_filename
+from src.practice_query import PracticeFilter, PracticeRow
+from src.storage import open_storage
+from src.utils import COPY_BUFFER_SIZE, remove_quietly
+
+DATABASE_ENV = "LAB_DB"
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# Database and file calls running at once; further requests wait for a thread
+WORKER_THREADS = 64
+UPLOAD_WORKERS = 2
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, length):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != length:
+        raise ApiError(400, "Invalid cursor")
+    return values
+
+
+def int_param(params, name, default=None, minimum=None, maximum=None):
+    value = params.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ApiError(400, f"{name} must be a whole number") from None
+    if (minimum is not None and number < minimum) or (maximum is not None and number > maximum):
+        raise ApiError(400, f"{name} must be between {minimum} and {maximum}")
+    return number
+
+
+def page_size(params):
+    return int_param(params, "limit", DEFAULT_PAGE_SIZE, 1, MAX_PAGE_SIZE)
+
+
+def read_filters(params):
+    """Build a PracticeFilter from query parameters"""
+    try:
+        return PracticeFilter(
+            teacher_name=params.get("teacher") or None,
+            subject=params.get("subject") or None,
+            date_from=params.get("date_from") or None,
+            date_to=params.get("date_to") or None,
+            min_pages=int_param(params, "min_pages", minimum=0),
+            max_pages=int_param(params, "max_pages", minimum=0)
+        )
+    except ValueError as e:
+        raise ApiError(400, str(e)) from None
+
+
+def parse_range(header, size):
+    """Return (start, end) for a Range header, or None to send the whole file
+
+    Raises ApiError 416 for a range outside the file. Multiple ranges are
+    answered with the whole file, which RFC 9110 allows.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first == "":
+            start, end = max(size - int(last), 0), size - 1
+        else:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+    except ValueError:
+        return None
+    if start < 0 or start > end:
+        raise ApiError(416, f"Range not satisfiable, the file has {size} bytes")
+    return start, end
+
+
+def iter_file(storage, path, start, end, chunk_size=COPY_BUFFER_SIZE):
+    """Yield bytes start..end (inclusive) of a stored file"""
+    offset = start
+    while offset <= end:
+        chunk = storage.read_range(path, offset, min(chunk_size, end + 1 - offset))
+        if not chunk:
+            break
+        offset += len(chunk)
+        yield chunk
+
+
+def job_json(job):
+    return {
+        "id": job.id,
+        "status": job.status,
+        "progress": job.progress,
+        "error": job.error,
+        "practice_id": job.practice_id,
+        "duplicate": job.duplicate
+    }
+
+
+class LabApi:
+    """The ASGI application and the services its requests share"""
+
+    def __init__(self, db_path=DATABASE_PATH, folders=FOLDERS_DIR, storage_url=None, threads=WORKER_THREADS):
+        self.db_path = db_path
+        self.folders = folders
+        self.storage_url = storage_url
+        self.threads = threads
+        self.app = Starlette(
+            routes=[
+                Route("/teachers", self.list_teachers),
+                Route("/practices", self.list_practices),
+                Route("/practices", self.upload_practice, methods=["POST"]),
+                Route("/practices/{practice_id:int}", self.get_practice),
+                Route("/practices/{practice_id:int}/file", self.download_practice, methods=["GET", "HEAD"]),
+                Route("/jobs/{job_id:int}", self.get_job),
+                Route("/search", self.search),
+            ],
+            exception_handlers={ApiError: self.api_error},
+            lifespan=self.lifespan
+        )
+
+    @asynccontextmanager
+    async def lifespan(self, app):
+        anyio.to_thread.current_default_thread_limiter().total_tokens = self.threads
+        self.storage = open_storage(self.storage_url, root=self.folders)
+        self.repository = LabRepository(self.db_path)
+        await run_in_threadpool(self.repository.setup_schema)
+        self.blob_store = BlobStore(storage=self.storage)
+        # Uploads are spooled here until ingested; hidden, so scans skip it
+        self.upload_dir = os.path.abspath(os.path.join(self.folders, ".uploads"))
+        os.makedirs(self.upload_dir, exist_ok=True)
+        self.ingestion = IngestionPool(self.repository, self.blob_store, max_workers=UPLOAD_WORKERS,
+                                       on_progress=self.upload_progress)
+        try:
+            yield
+        finally:
+            self.ingestion.shutdown(wait=True)
+            self.repository.close()
+
+    async def api_error(self, request, error):
+        headers = None
+        if error.status == 416:
+            headers = {"Content-Range": f"bytes */{request.state.file_size}"}
+        return JSONResponse({"error": error.message}, status_code=error.status, headers=headers)
+
+    async def list_teachers(self, request):
+        params = request.query_params
+        limit = page_size(params)
+        after = decode_cursor(params["after"], 2) if params.get("after") else None
+        teachers = await run_in_threadpool(self.repository.get_teacher_page, 'name', False, after, None, limit)
+        return JSONResponse({
+            "items": [asdict(teacher) for teacher in teachers],
+            "next": encode_cursor([teachers[-1].name, teachers[-1].id]) if len(teachers) == limit else None
+        })
+
+    async def list_practices(self, request):
+        params = request.query_params
+        limit = page_size(params)
+        filters = read_filters(params)
+        after = None
+        if params.get("after"):
+            upload_date, practice_id = decode_cursor(params["after"], 2)
+            after = PracticeRow(practice_id, "", "", "", upload_date, 0)
+
+        rows = await run_in_threadpool(self.repository.find_practices, filters, after, limit)
+        body = {
+            "items": [asdict(row) for row in rows],
+            "next": encode_cursor([rows[-1].upload_date, rows[-1].id]) if len(rows) == limit else None
+        }
+        if params.get("facets") in ("1", "true") and after is None:
+            body["facets"] = asdict(await run_in_threadpool(self.repository.get_practice_facets, filters))
+        return JSONResponse(body)
+
+    async def get_practice(self, request):
+        practice_id = request.path_params["practice_id"]
+        practice = await run_in_threadpool(self.repository.get_practice, practice_id)
+        if practice is None:
+            raise ApiError(404, f"No practice with id {practice_id}")
+        body = asdict(practice)
+        del body["file_path"]
+        body["file"] = str(request.url_for("download_practice", practice_id=practice_id))
+        return JSONResponse(body)
+
+    async def download_practice(self, request):
+        """Stream a practice's PDF, honouring If-None-Match and Range"""
+        practice_id = request.path_params["practice_id"]
+        location = await run_in_threadpool(self.repository.get_practice_location, practice_id)
+        if location is None:
+            raise ApiError(404, f"No practice with id {practice_id}")
+
+        stored_path = os.path.normpath(location.file_path.replace('\\', '/'))
+        # Blobs are addressed by content, so their hash is a strong ETag
+        path = self.blob_store.blob_path(location.blob_sha256) if location.blob_sha256 else stored_path
+        try:
+            size = await run_in_threadpool(self.storage.size, path)
+        except FileNotFoundError:
+            raise ApiError(404, f"The file of practice {practice_id} is missing") from None
+        request.state.file_size = size
+        etag = f'"{location.blob_sha256}"' if location.blob_sha256 else f'W/"{practice_id}-{size}"'
+
+        headers = {
+            "ETag": etag,
+            "Accept-Ranges": "bytes",
+            "Content-Disposition": f"inline; filename*=UTF-8''{quote(os.path.basename(stored_path))}"
+        }
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or etag in
+                              [tag.strip() for tag in if_none_match.split(",")]):
+            return Response(status_code=304, headers=headers)
+
+        start, end, status = 0, size - 1, 200
+        range_header = request.headers.get("range")
+        if_range = request.headers.get("if-range")
+        # If-Range needs a strong match; otherwise the whole file is sent
+        if range_header and (if_range is None or (if_range == etag and not etag.startswith("W/"))):
+            byte_range = parse_range(range_header, size)
+            if byte_range is not None:
+                start, end = byte_range
+                status = 206
+                headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end + 1 - start)
+
+        if request.method == "HEAD" or size == 0:
+            return Response(status_code=status, headers=headers, media_type="application/pdf")
+        return StreamingResponse(iter_file(self.storage, path, start, end), status_code=status,
+                                 headers=headers, media_type="application/pdf")
+
+    async def upload_practice(self, request):
+        """Accept a PDF and ingest it in the background; answers 202 with the job"""
+        async with request.form() as form:
+            upload = form.get("file")
+            if not isinstance(upload, UploadFile):
+                raise ApiError(400, "file is required")
+            teacher = (form.get("teacher") or "").strip()
+            subject = (form.get("subject") or "").strip()
+            title = (form.get("title") or "").strip() or os.path.splitext(upload.filename or "")[0]
+            objective = form.get("objective") or ""
+            if not teacher or not subject or not title:
+                raise ApiError(400, "teacher, subject and title are required")
+            title = sanitize_filename(title)
+
+            teacher_id = await run_in_threadpool(self.repository.get_teacher_id, teacher)
+            if teacher_id is None:
+                raise ApiError(400, f"Unknown teacher {teacher}")
+            subjects = await run_in_threadpool(self.repository.get_teacher_subjects, teacher)
+            if subject not in subjects:
+                raise ApiError(400, f"{teacher} does not teach {subject}")
+
+            source_path = await run_in_threadpool(self.spool_upload, upload.file)
+
+        try:
+            destination = practice_destination(self.storage, teacher, teacher_id, subject, title)
+            job = self.ingestion.submit(teacher_id, teacher, subject, title, objective, source_path, destination)
+        except BaseException:
+            remove_quietly(source_path)
+            raise
+        return JSONResponse(job_json(job), status_code=202,
+                            headers={"Location": str(request.url_for("get_job", job_id=job.id))})
+
+    def spool_upload(self, file):
+        fd, path = tempfile.mkstemp(dir=self.upload_dir, suffix=".pdf")
+        try:
+            with os.fdopen(fd, 'wb') as spooled:
+                shutil.copyfileobj(file, spooled, COPY_BUFFER_SIZE)
+        except BaseException:
+            remove_quietly(path)
+            raise
+        return path
+
+    def upload_progress(self, job):
+        # Called on an ingestion thread; the spooled copy is no longer needed
+        if job.finished and os.path.dirname(job.source_path) == self.upload_dir:
+            remove_quietly(job.source_path)
+
+    async def get_job(self, request):
+        job = self.ingestion.jobs.get(request.path_params["job_id"])
+        if job is None:
+            raise ApiError(404, "No such job")
+        return JSONResponse(job_json(job))
+
+    async def search(self, request):
+        params = request.query_params
+        term = (params.get("q") or "").strip()
+        if not term:
+            raise ApiError(400, "q is required")
+        limit = page_size(params)
+        offset = int_param(params, "offset", 0, minimum=0)
+        snippets = params.get("snippets", "true") not in ("0", "false")
+
+        matches = await run_in_threadpool(self.repository.search_practices, term, limit, offset, snippets)
+        items = []
+        for match in matches:
+            item = asdict(match)
+            # The text comes from uploaded PDFs, so only the <mark> tags are markup
+            snippet = html.escape(match.snippet)
+            item["snippet"] = snippet.replace(SNIPPET_START, "<mark>").replace(SNIPPET_END, "</mark>")
+            items.append(item)
+        return JSONResponse({"items": items, "next": offset + limit if len(matches) == limit else None})
+
+
+def create_app(db_path=None, folders=FOLDERS_DIR, storage_url=None, threads=WORKER_THREADS):
+    return LabApi(db_path or os.environ.get(DATABASE_ENV, DATABASE_PATH), folders, storage_url, threads).app
+
+
+# For ASGI servers: uvicorn src.api:app
+app = create_app()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.api", description="Laboratory practice HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--db", default=os.environ.get(DATABASE_ENV, DATABASE_PATH), help="database file")
+    parser.add_argument("--folders", default=FOLDERS_DIR, help="practice storage directory")
+    parser.add_argument("--storage", metavar="URL", help="keep files in s3://bucket/prefix")
+    parser.add_argument("--threads", type=int, default=WORKER_THREADS,
+                        help="database and file calls running at once")
+    args = parser.parse_args(argv)
+
+    try:
+        import uvicorn
+    except ImportError:
+        parser.error("serving the API needs uvicorn (pip install uvicorn)")
+    uvicorn.run(create_app(args.db, args.folders, args.storage, args.threads),
+                host=args.host, port=args.port, log_level="info")
+
+
+if __name__ == "__main__":
+    main()
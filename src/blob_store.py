@@ -0,0 +1,83 @@
+# blob_store.py
+import os
+
+from src.storage import LocalStorage
+
+
+class BlobStore:
+    """Content-addressed storage for practice files under folders/.objects
+
+    The blobs live in a storage backend, the local folders/ tree unless
+    another one is given.
+    """
+
+    def __init__(self, base_dir="folders", storage=None):
+        self.storage = storage or LocalStorage(base_dir)
+        self.base_dir = self.storage.root
+        self.objects_dir = os.path.join(self.base_dir, ".objects")
+
+    def blob_path(self, sha256):
+        """Return the path of a blob, e.g. folders/.objects/ab/cdef..."""
+        return os.path.join(self.objects_dir, sha256[:2], sha256[2:])
+
+    def local_path(self, sha256):
+        """Return a local file with the blob's content, fetched if it is remote"""
+        return self.storage.local_path(self.blob_path(sha256))
+
+    def has_blob(self, sha256):
+        return self.storage.exists(self.blob_path(sha256))
+
+    def put_file(self, source):
+        """Store a file by content, returning (sha256, size, is_new)
+
+        If a blob with that hash already exists nothing is stored, so a
+        duplicate upload takes no extra space.
+        """
+        return self.storage.put_content(source, self.blob_path)
+
+    def link(self, sha256, destination):
+        """Expose a blob at destination, hard-linking it when possible
+
+        In a bucket nothing is written; the practice is read through its blob.
+        """
+        self.storage.link(self.blob_path(sha256), destination)
+        return destination
+
+    def link_unique(self, sha256, destination):
+        """Expose a blob at destination or, if that is taken, at name_2.pdf, name_3.pdf, ...
+
+        The name is claimed by creating the link, so jobs racing for the
+        same name each get their own. Returns the path used.
+        """
+        stem, ext = os.path.splitext(destination)
+        path = destination
+        suffix = 2
+        while True:
+            try:
+                return self.link(sha256, path)
+            except FileExistsError:
+                path = f"{stem}_{suffix}{ext}"
+                suffix += 1
+
+    def discard(self, sha256):
+        """Delete a blob nothing refers to, ignoring one that is already gone"""
+        try:
+            self.storage.delete(self.blob_path(sha256))
+        except FileNotFoundError:
+            pass
+
+    def adopt(self, path, sha256):
+        """Add a file already on disk as the blob for sha256
+
+        Locally the file is hard-linked into the store (copied where links
+        are not available) and stays where it is. Returns False if the blob
+        existed.
+        """
+        blob = self.blob_path(sha256)
+        if self.storage.exists(blob):
+            return False
+        try:
+            self.storage.add_file(path, blob)
+        except FileExistsError:
+            return False
+        return True
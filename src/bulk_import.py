@@ -0,0 +1,212 @@
+# bulk_import.py
+"""Register PDFs already laid out as <root>/<teacher>/<subject>/*.pdf
+
+Files are hashed and parsed in a process pool and written in batched
+transactions. Every handled file is recorded in import_progress with its
+size and mtime, so an interrupted import picks up where it stopped and
+unchanged files are skipped without being read again.
+"""
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+
+from src.lab_repository import Extraction
+from src.pdf_processing import EXTRACTOR_VERSION, _failed_info, describe_extraction, read_pages, worker_context
+from src.utils import file_sha256, normalize_path
+
+BATCH_SIZE = 200
+
+
+@dataclass(frozen=True)
+class FoundFile:
+    teacher: str
+    subject: str
+    path: str
+    size: int
+    mtime_ns: int
+
+
+@dataclass
+class ImportSummary:
+    found: int = 0
+    skipped: int = 0
+    imported: int = 0
+    duplicates: int = 0
+    failed: int = 0
+
+
+def scan_tree(root):
+    """Yield a FoundFile for every PDF two levels below root
+
+    Hidden directories such as .objects and .thumbnails are ignored. The
+    stat results come from the directory entries, so no extra stat call is
+    made per file.
+    """
+    with os.scandir(root) as teachers:
+        teacher_dirs = sorted(
+            (entry for entry in teachers if entry.is_dir() and not entry.name.startswith('.')),
+            key=lambda entry: entry.name
+        )
+    for teacher_entry in teacher_dirs:
+        with os.scandir(teacher_entry.path) as subjects:
+            subject_dirs = sorted(
+                (entry for entry in subjects if entry.is_dir() and not entry.name.startswith('.')),
+                key=lambda entry: entry.name
+            )
+        for subject_entry in subject_dirs:
+            with os.scandir(subject_entry.path) as files:
+                for entry in files:
+                    if not entry.is_file() or not entry.name.lower().endswith('.pdf'):
+                        continue
+                    stat = entry.stat()
+                    yield FoundFile(teacher_entry.name, subject_entry.name, entry.path,
+                                    stat.st_size, stat.st_mtime_ns)
+
+
+def analyze_file(path):
+    """Worker: return (sha256, pages, error) for one file"""
+    sha256 = file_sha256(path)
+    try:
+        return sha256, read_pages(path), None
+    except Exception as e:
+        return sha256, None, str(e)
+
+
+class BulkImporter:
+    """Import a directory tree of practices into the repository"""
+
+    def __init__(self, repository, blob_store, jobs=None, batch_size=BATCH_SIZE, on_progress=None):
+        self.repository = repository
+        self.blob_store = blob_store
+        self.jobs = jobs or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.on_progress = on_progress
+
+    def run(self, root):
+        """Import every new or changed PDF under root and return a summary"""
+        summary = ImportSummary()
+        teacher_ids = self._ensure_teachers(root)
+
+        # Loaded once up front so the scan itself never queries the database
+        imported = self.repository.get_imported_files()
+        known_paths = {normalize_path(path) for path in self.repository.get_practice_files()}
+        contents = set(self.repository.get_practice_contents())
+
+        pending = []
+        for found in scan_tree(root):
+            summary.found += 1
+            if (imported.get(found.path) == (found.size, found.mtime_ns)
+                    or normalize_path(found.path) in known_paths):
+                summary.skipped += 1
+            else:
+                pending.append(found)
+        self._report(summary, len(pending))
+        if not pending:
+            return summary
+
+        batch = _Batch()
+        # Only a bounded number of files is in flight, so parsed text for the
+        # whole archive is never held in memory at once.
+        max_in_flight = self.jobs * 4
+        with ProcessPoolExecutor(max_workers=self.jobs, mp_context=worker_context()) as executor:
+            queued = iter(pending)
+            running = {}
+            while True:
+                while len(running) < max_in_flight:
+                    found = next(queued, None)
+                    if found is None:
+                        break
+                    running[executor.submit(analyze_file, found.path)] = found
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    found = running.pop(future)
+                    self._add_result(batch, summary, found, teacher_ids[found.teacher],
+                                     contents, future)
+                    if len(batch) >= self.batch_size:
+                        self._flush(batch)
+                        self._report(summary, len(pending))
+        self._flush(batch)
+        self._report(summary, len(pending))
+        return summary
+
+    def _ensure_teachers(self, root):
+        """Return {folder name: teacher id}, adding teachers that are missing"""
+        teacher_ids = {}
+        with os.scandir(root) as entries:
+            for entry in sorted(entries, key=lambda entry: entry.name):
+                if not entry.is_dir() or entry.name.startswith('.'):
+                    continue
+                teacher_id = self.repository.get_teacher_id(entry.name)
+                if teacher_id is None:
+                    with os.scandir(entry.path) as subjects:
+                        names = sorted(sub.name for sub in subjects
+                                       if sub.is_dir() and not sub.name.startswith('.'))
+                    teacher_id = self.repository.add_teacher(entry.name, names)
+                teacher_ids[entry.name] = teacher_id
+        return teacher_ids
+
+    def _add_result(self, batch, summary, found, teacher_id, contents, future):
+        progress = [found.path, found.size, found.mtime_ns, None, 'done', None]
+        try:
+            sha256, pages, error = future.result()
+        except Exception as e:
+            # The file could not even be read
+            progress[4:] = ['failed', str(e)]
+            batch.progress.append(tuple(progress))
+            summary.failed += 1
+            return
+        progress[3] = sha256
+
+        if (teacher_id, found.subject, sha256) in contents:
+            progress[4] = 'duplicate'
+            batch.progress.append(tuple(progress))
+            summary.duplicates += 1
+            return
+        contents.add((teacher_id, found.subject, sha256))
+
+        if pages is None:
+            info = _failed_info("Unable to extract")
+            progress[5] = error
+        else:
+            extraction = Extraction(sha256, EXTRACTOR_VERSION, len(pages), pages)
+            info = describe_extraction(extraction)
+            batch.extractions.append(extraction)
+
+        self.blob_store.adopt(found.path, sha256)
+        batch.blobs.append((sha256, found.size))
+        batch.practices.append((
+            teacher_id, found.subject,
+            os.path.splitext(os.path.basename(found.path))[0],
+            info['objective'], info['introduction'], info['summary'],
+            info['development'], info['goals'], info['num_pages'],
+            found.path, info['content_text'], sha256
+        ))
+        batch.progress.append(tuple(progress))
+        summary.imported += 1
+
+    def _flush(self, batch):
+        if len(batch):
+            self.repository.save_import_batch(batch.blobs, batch.practices,
+                                              batch.extractions, batch.progress)
+            batch.clear()
+
+    def _report(self, summary, total):
+        if self.on_progress:
+            self.on_progress(summary, total)
+
+
+class _Batch:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.blobs = []
+        self.practices = []
+        self.extractions = []
+        self.progress = []
+
+    def __len__(self):
+        return len(self.progress)
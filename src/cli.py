@@ -0,0 +1,318 @@
+# cli.py
+"""Headless command-line interface to the laboratory database
+
+Usage: python labmgmt.py [--db PATH] [--folders DIR] [--storage URL] <command> ...
+
+    teacher add NAME SUBJECT [SUBJECT ...]
+    teacher import FILE.csv
+    practice ingest DIR [--teacher NAME --subject SUBJECT] [--jobs N]
+    practice import [ROOT] [--jobs N]
+    reconcile [--prune] [--no-import] [--watch [--interval SECONDS]] [--jobs N]
+    search TERM [--limit N]
+    report --output FILE [--teacher NAME | PRACTICE_ID ...] [--shard-size N] [--no-merge]
+    stats [--check] [--rebuild]
+
+Nothing here imports Tk, so it runs on servers without a display. With
+--storage s3://bucket/prefix files are kept in a bucket (see src/storage.py);
+practice import and reconcile work on a local folders/ tree only.
+"""
+import argparse
+import csv
+import os
+import sys
+import threading
+
+from src.blob_store import BlobStore
+from src.ingestion import IngestionPool, DONE, FAILED
+from src.lab_repository import DATABASE_PATH, LabRepository, SNIPPET_START, SNIPPET_END
+from src.operations import FOLDERS_DIR, register_teacher, practice_destination
+from src.storage import LocalStorage, open_storage
+
+
+def teacher_add(repository, args):
+    teacher_id = register_teacher(repository, args.storage, args.name, args.subjects)
+    print(f"Added teacher {args.name} (id {teacher_id})")
+    return 0
+
+
+def teacher_import(repository, args):
+    """Add every teacher of a CSV file with name and subjects columns
+
+    Subjects are separated by semicolons, e.g. "Math;Physics".
+    """
+    failures = 0
+    with open(args.file, newline='', encoding='utf-8') as csv_file:
+        for line_no, row in enumerate(csv.DictReader(csv_file), start=2):
+            name = (row.get('name') or '').strip()
+            subjects = (row.get('subjects') or '').replace(',', ';').split(';')
+            try:
+                register_teacher(repository, args.storage, name, subjects)
+                print(f"Added teacher {name}")
+            except (ValueError, OSError) as e:
+                failures += 1
+                print(f"Line {line_no} ({name or 'no name'}): {e}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+def find_practice_files(directory, teacher=None, subject=None):
+    """Yield (teacher, subject, path) for the PDFs to ingest
+
+    With a teacher and subject every PDF directly in directory is used;
+    otherwise directory is laid out as <teacher>/<subject>/*.pdf.
+    """
+    if teacher is not None:
+        for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+            if entry.is_file() and entry.name.lower().endswith('.pdf'):
+                yield teacher, subject, entry.path
+        return
+
+    for teacher_entry in sorted(os.scandir(directory), key=lambda e: e.name):
+        if not teacher_entry.is_dir() or teacher_entry.name.startswith('.'):
+            continue
+        for subject_entry in sorted(os.scandir(teacher_entry.path), key=lambda e: e.name):
+            if not subject_entry.is_dir():
+                continue
+            for entry in sorted(os.scandir(subject_entry.path), key=lambda e: e.name):
+                if entry.is_file() and entry.name.lower().endswith('.pdf'):
+                    yield teacher_entry.name, subject_entry.name, entry.path
+
+
+def practice_ingest(repository, args):
+    if (args.teacher is None) != (args.subject is None):
+        raise ValueError("--teacher and --subject must be given together")
+
+    print_lock = threading.Lock()
+    results = {DONE: 0, FAILED: 0}
+
+    def on_progress(job):
+        if job.status not in results:
+            return
+        with print_lock:
+            results[job.status] += 1
+            if job.status == DONE:
+                print(f"Ingested {job.source_path} as practice {job.practice_id}")
+            else:
+                print(f"Failed {job.source_path}: {job.error}", file=sys.stderr)
+
+    pool = IngestionPool(repository, BlobStore(storage=args.storage), max_workers=args.jobs,
+                         on_progress=on_progress)
+    skipped = 0
+    try:
+        teacher_ids = {}
+        for teacher, subject, path in find_practice_files(args.directory, args.teacher, args.subject):
+            if teacher not in teacher_ids:
+                teacher_ids[teacher] = repository.get_teacher_id(teacher)
+            teacher_id = teacher_ids[teacher]
+            if teacher_id is None:
+                skipped += 1
+                print(f"Skipped {path}: unknown teacher {teacher}", file=sys.stderr)
+                continue
+
+            title = os.path.splitext(os.path.basename(path))[0]
+            destination = practice_destination(args.storage, teacher, teacher_id, subject, title)
+            pool.submit(teacher_id, teacher, subject, title, '', path, destination)
+    finally:
+        pool.shutdown(wait=True)
+
+    print(f"{results[DONE]} ingested, {results[FAILED]} failed, {skipped} skipped")
+    return 1 if results[FAILED] or skipped else 0
+
+
+def require_local_storage(args, command):
+    if not isinstance(args.storage, LocalStorage):
+        raise ValueError(f"{command} works on a local folders/ tree, not on a bucket")
+
+
+def practice_import(repository, args):
+    """Register the PDFs already stored under ROOT/<teacher>/<subject>/"""
+    from src.bulk_import import BulkImporter
+
+    require_local_storage(args, "practice import")
+    def on_progress(summary, total):
+        handled = summary.imported + summary.duplicates + summary.failed
+        print(f"{handled}/{total} files processed", file=sys.stderr)
+
+    importer = BulkImporter(repository, BlobStore(storage=args.storage), jobs=args.jobs,
+                            on_progress=on_progress)
+    summary = importer.run(args.root or args.folders)
+    print(f"{summary.found} found, {summary.imported} imported, {summary.skipped} already known, "
+          f"{summary.duplicates} duplicates, {summary.failed} failed")
+    return 1 if summary.failed else 0
+
+
+def print_reconcile_report(report):
+    for practice_id, old_path, new_path in report.moved:
+        print(f"Practice {practice_id} moved: {old_path} -> {new_path}")
+    for practice_id, path in report.restored:
+        print(f"Practice {practice_id} restored from the blob store: {path}")
+    for practice_id, path in report.changed:
+        print(f"Practice {practice_id} content changed: {path}")
+    for practice_id, path in report.missing:
+        print(f"Practice {practice_id} file missing: {path}", file=sys.stderr)
+    if report.pruned:
+        print(f"Removed {report.pruned} practices with missing files")
+    if report.imported and report.imported.imported:
+        print(f"Imported {report.imported.imported} new files")
+    if report.clean:
+        print("Database and files are in sync")
+
+
+def reconcile(repository, args):
+    """Repair drift between the storage directory and the practices table"""
+    from src.reconcile import Reconciler
+
+    require_local_storage(args, "reconcile")
+    reconciler = Reconciler(repository, BlobStore(storage=args.storage), args.folders, jobs=args.jobs,
+                            prune=args.prune, import_new=not args.no_import)
+    if args.watch:
+        reported_missing = set()
+
+        def on_report(report):
+            # Only print what changed since the previous pass
+            missing = set(report.missing)
+            report.missing = sorted(missing - reported_missing)
+            reported_missing.clear()
+            reported_missing.update(missing)
+            if not report.clean:
+                print_reconcile_report(report)
+
+        try:
+            reconciler.watch(args.interval, on_report=on_report)
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    report = reconciler.run()
+    print_reconcile_report(report)
+    return 1 if report.missing else 0
+
+
+def search(repository, args):
+    matches = repository.search_practices(args.term, limit=args.limit)
+    for match in matches:
+        print(f"{match.id}\t{match.title}\t{match.subject}\t{match.teacher_name}")
+        if match.snippet:
+            snippet = match.snippet.replace(SNIPPET_START, '[').replace(SNIPPET_END, ']')
+            print(f"\t{' '.join(snippet.split())}")
+    if not matches:
+        print("No practices found", file=sys.stderr)
+    return 0
+
+
+def report(repository, args):
+    """Write a report of a teacher, some practices, or the whole archive"""
+    from src.pdf_generator import generate_report
+
+    if args.teacher is not None and args.practice_ids:
+        raise ValueError("Give either --teacher or practice ids, not both")
+
+    def on_progress(done, total):
+        print(f"{done}/{total} practices rendered", file=sys.stderr)
+
+    files = generate_report(
+        repository, args.output,
+        teacher_name=args.teacher,
+        practice_ids=args.practice_ids or None,
+        shard_size=args.shard_size,
+        merge=not args.no_merge,
+        on_progress=on_progress
+    )
+    for path in files:
+        repository.log_activity("report_generated", f"Report generated: {path}")
+        print(f"Wrote {path}")
+    return 0
+
+
+def stats(repository, args):
+    from src.maintenance import check_counters
+
+    print(f"Teachers: {repository.count_teachers()}")
+    print(f"Practices: {repository.count_practices()}")
+    if args.check or args.rebuild:
+        return 0 if check_counters(repository, rebuild=args.rebuild) else 1
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="labmgmt", description="Laboratory practice management")
+    parser.add_argument("--db", default=DATABASE_PATH, help="database file")
+    parser.add_argument("--folders", default=FOLDERS_DIR, help="practice storage directory")
+    parser.add_argument("--storage", dest="storage_url", metavar="URL",
+                        help="keep files in s3://bucket/prefix (default: $LAB_STORAGE, else --folders)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    teacher = commands.add_parser("teacher", help="manage teachers")
+    teacher_commands = teacher.add_subparsers(dest="teacher_command", required=True)
+    add = teacher_commands.add_parser("add", help="add one teacher")
+    add.add_argument("name")
+    add.add_argument("subjects", nargs="+", metavar="subject")
+    add.set_defaults(handler=teacher_add)
+    teacher_import_parser = teacher_commands.add_parser("import", help="add teachers from a CSV file")
+    teacher_import_parser.add_argument("file")
+    teacher_import_parser.set_defaults(handler=teacher_import)
+
+    practice = commands.add_parser("practice", help="manage practices")
+    practice_commands = practice.add_subparsers(dest="practice_command", required=True)
+    ingest = practice_commands.add_parser("ingest", help="ingest a directory of PDFs")
+    ingest.add_argument("directory")
+    ingest.add_argument("--teacher", help="teacher of every PDF in directory")
+    ingest.add_argument("--subject", help="subject of every PDF in directory")
+    ingest.add_argument("--jobs", type=int, default=2, help="files processed in parallel")
+    ingest.set_defaults(handler=practice_ingest)
+    bulk = practice_commands.add_parser("import", help="register PDFs already stored in a folder tree")
+    bulk.add_argument("root", nargs="?", help="tree to import (default: the storage directory)")
+    bulk.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="worker processes")
+    bulk.set_defaults(handler=practice_import)
+
+    reconcile_parser = commands.add_parser("reconcile", help="sync the database with the storage directory")
+    reconcile_parser.add_argument("--prune", action="store_true", help="delete practices whose file is gone")
+    reconcile_parser.add_argument("--no-import", action="store_true", help="do not register untracked files")
+    reconcile_parser.add_argument("--watch", action="store_true", help="keep running and follow changes")
+    reconcile_parser.add_argument("--interval", type=float, default=5.0, help="seconds between checks")
+    reconcile_parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="worker processes")
+    reconcile_parser.set_defaults(handler=reconcile)
+
+    search_parser = commands.add_parser("search", help="full-text search")
+    search_parser.add_argument("term")
+    search_parser.add_argument("--limit", type=int, default=20)
+    search_parser.set_defaults(handler=search)
+
+    report_parser = commands.add_parser("report", help="write a PDF report")
+    report_parser.add_argument("practice_ids", nargs="*", type=int, metavar="practice_id")
+    report_parser.add_argument("--teacher", help="report every practice of a teacher")
+    report_parser.add_argument("-o", "--output", required=True)
+    report_parser.add_argument("--shard-size", type=int, default=250, help="practices per rendered chunk")
+    report_parser.add_argument("--no-merge", action="store_true", help="keep one file per chunk; merging holds the whole report in memory")
+    report_parser.set_defaults(handler=report)
+
+    stats_parser = commands.add_parser("stats", help="show totals")
+    stats_parser.add_argument("--check", action="store_true", help="verify the materialized counters")
+    stats_parser.add_argument("--rebuild", action="store_true", help="recompute drifted counters")
+    stats_parser.set_defaults(handler=stats)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, "jobs", 1) < 1:
+        parser.error("--jobs must be at least 1")
+    if getattr(args, "shard_size", 1) < 1:
+        parser.error("--shard-size must be at least 1")
+
+    try:
+        args.storage = open_storage(args.storage_url, root=args.folders)
+    except (ValueError, ImportError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    repository = LabRepository(args.db)
+    try:
+        repository.setup_schema()
+        return args.handler(repository, args)
+    except (ValueError, OSError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        repository.close()
@@ -0,0 +1,112 @@
+# events.py
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Tuple
+
+
+@dataclass(frozen=True)
+class TeacherAdded:
+    teacher_id: int
+    name: str
+    subjects: List[str]
+
+
+@dataclass(frozen=True)
+class PracticeAdded:
+    practice_id: int
+    teacher_id: int
+    subject: str
+    title: str
+
+
+@dataclass(frozen=True)
+class PracticesImported:
+    teacher_ids: Tuple[int, ...]
+    count: int
+
+
+@dataclass(frozen=True)
+class PracticesUpdated:
+    teacher_ids: Tuple[int, ...]
+
+
+class EventBus:
+    """In-process publish/subscribe for data changes
+
+    Handlers run synchronously on the publishing thread, which may be a
+    worker thread; GUI code should subscribe through a TkEventBridge.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._handlers = []
+
+    def subscribe(self, handler, *event_types):
+        """Call handler for events of the given types (all events if none)
+
+        Returns a function that removes the subscription.
+        """
+        entry = (handler, event_types)
+        with self._lock:
+            self._handlers.append(entry)
+
+        def unsubscribe():
+            with self._lock:
+                if entry in self._handlers:
+                    self._handlers.remove(entry)
+        return unsubscribe
+
+    def publish(self, event):
+        with self._lock:
+            handlers = list(self._handlers)
+        for handler, event_types in handlers:
+            if not event_types or isinstance(event, event_types):
+                handler(event)
+
+
+class TkEventBridge:
+    """Deliver bus events to the Tk thread in debounced batches
+
+    Events are queued from any thread. The Tk loop polls the queue with
+    after() and hands everything collected to handler(events) once no new
+    event has arrived for quiet_ms, or at least every max_wait_ms while a
+    burst keeps going, so 500 inserts cost one redraw instead of 500.
+    """
+
+    POLL_MS = 50
+
+    def __init__(self, widget, bus, handler, quiet_ms=150, max_wait_ms=1000):
+        self.widget = widget
+        self.handler = handler
+        self.quiet = quiet_ms / 1000
+        self.max_wait = max_wait_ms / 1000
+        self.events = queue.Queue()
+        self.batch = []
+        self.first_arrival = None
+        self.last_arrival = None
+        self.unsubscribe = bus.subscribe(self.events.put)
+        self.widget.after(self.POLL_MS, self._poll)
+
+    def _poll(self):
+        now = time.monotonic()
+        try:
+            while True:
+                self.batch.append(self.events.get_nowait())
+                self.last_arrival = now
+                if self.first_arrival is None:
+                    self.first_arrival = now
+        except queue.Empty:
+            pass
+
+        if self.batch and (now - self.last_arrival >= self.quiet
+                           or now - self.first_arrival >= self.max_wait):
+            batch, self.batch = self.batch, []
+            self.first_arrival = self.last_arrival = None
+            try:
+                self.handler(batch)
+            except Exception as e:
+                print(f"Error applying data changes: {e}")
+
+        self.widget.after(self.POLL_MS, self._poll)
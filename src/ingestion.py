@@ -0,0 +1,149 @@
+# ingestion.py
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+from src.pdf_processing import describe_extraction, get_extraction
+
+# Job states, in the order a successful job goes through them
+QUEUED = "queued"
+COPYING = "copying"
+PARSING = "parsing"
+SAVING = "saving"
+DONE = "done"
+FAILED = "failed"
+
+# Finished jobs kept for status queries; older ones are forgotten
+MAX_FINISHED_JOBS = 1000
+
+
+@dataclass
+class IngestJob:
+    id: int
+    teacher_id: int
+    teacher_name: str
+    subject: str
+    title: str
+    objective: str
+    source_path: str
+    destination: str
+    status: str = QUEUED
+    progress: float = 0.0
+    error: Optional[str] = None
+    practice_id: Optional[int] = None
+    sha256: Optional[str] = None
+    size: int = 0
+    duplicate: bool = False
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+
+class IngestionPool:
+    """Copy, parse and store uploaded practices on worker threads
+
+    Jobs stay in jobs while they run; only the last max_finished finished
+    ones are kept, so a long-running service does not grow without bound.
+    """
+
+    def __init__(self, repository, blob_store, max_workers=2, on_progress=None,
+                 max_finished=MAX_FINISHED_JOBS):
+        self.repository = repository
+        self.blob_store = blob_store
+        self.on_progress = on_progress
+        self.max_finished = max_finished
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ingest")
+        self.jobs = {}
+        self._finished = deque()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, teacher_id, teacher_name, subject, title, objective, source_path, destination):
+        """Queue an upload and return its job"""
+        job = IngestJob(
+            next(self._ids), teacher_id, teacher_name, subject,
+            title, objective, source_path, destination
+        )
+        with self._lock:
+            self.jobs[job.id] = job
+        self._report(job)
+        self.executor.submit(self._run, job)
+        return job
+
+    def active_jobs(self):
+        """Return the jobs that have not finished yet"""
+        with self._lock:
+            return [job for job in self.jobs.values() if not job.finished]
+
+    def shutdown(self, wait=True):
+        """Stop accepting jobs, optionally waiting for running ones"""
+        self.executor.shutdown(wait=wait)
+
+    def _report(self, job, status=None, progress=None):
+        if status is not None:
+            job.status = status
+        if progress is not None:
+            job.progress = progress
+        if job.finished:
+            with self._lock:
+                self._finished.append(job.id)
+                while len(self._finished) > self.max_finished:
+                    self.jobs.pop(self._finished.popleft(), None)
+        if self.on_progress:
+            # Called on the worker thread; the UI hands it to Tk with after()
+            self.on_progress(job)
+
+    def _run(self, job):
+        try:
+            self._report(job, COPYING, 0.1)
+            try:
+                job.sha256, job.size, is_new = self.blob_store.put_file(job.source_path)
+                job.duplicate = not is_new
+            except OSError as e:
+                raise RuntimeError(f"Failed to copy file: {e}") from e
+
+            # Content that was parsed before is served from the extraction cache
+            self._report(job, PARSING, 0.4)
+            try:
+                extraction = get_extraction(
+                    self.blob_store.local_path(job.sha256),
+                    self.repository,
+                    job.sha256
+                )
+            except Exception as e:
+                if is_new:
+                    # Content that cannot be parsed is not kept, and the same
+                    # content fails the same way for any other job holding it
+                    self.blob_store.discard(job.sha256)
+                raise RuntimeError(f"Failed to parse PDF: {e}") from e
+            practice_info = describe_extraction(extraction)
+
+            # The blob is recorded and exposed once the file is known to parse
+            self._report(job, SAVING, 0.8)
+            self.repository.add_blob(job.sha256, job.size)
+            try:
+                job.destination = self.blob_store.link_unique(job.sha256, job.destination)
+            except OSError as e:
+                raise RuntimeError(f"Failed to copy file: {e}") from e
+            job.practice_id = self.repository.add_practice(
+                job.teacher_id,
+                job.subject,
+                job.title,
+                job.objective or practice_info['objective'],
+                practice_info['introduction'],
+                practice_info['summary'],
+                practice_info['development'],
+                practice_info['goals'],
+                practice_info['num_pages'],
+                job.destination,
+                practice_info['content_text'],
+                job.sha256
+            )
+            self._report(job, DONE, 1.0)
+        except Exception as e:
+            job.error = str(e)
+            self._report(job, FAILED)
@@ -0,0 +1,812 @@
+# lab_repository.py
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+from typing import List, Optional
+
+from src.events import PracticeAdded, PracticesImported, PracticesUpdated, TeacherAdded
+from src.migrations import migrate
+from src.practice_query import PracticeFacets, PracticeFilter, PracticeRow
+
+DATABASE_PATH = 'lab_management.db'
+
+# sqlite3 keeps a per-connection cache of compiled statements keyed by the SQL
+# text, so every query below is a module constant that is reused verbatim.
+STATEMENT_CACHE_SIZE = 256
+
+# Applied to every new connection. WAL lets consult queries keep reading while
+# an upload is being written, and NORMAL sync is durable under WAL except for
+# the last transactions before a power loss.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA cache_size = -32000",       # 32 MB page cache
+    "PRAGMA mmap_size = 268435456",     # 256 MB memory-mapped reads
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+)
+
+# Markers wrapped around matched terms in search snippets
+SNIPPET_START = '\x02'
+SNIPPET_END = '\x03'
+
+
+@dataclass(frozen=True)
+class Teacher:
+    id: int
+    name: str
+    subjects: List[str]
+    created_at: str
+
+
+@dataclass(frozen=True)
+class TeacherSummary:
+    id: int
+    name: str
+    subjects: List[str]
+    practice_count: int
+
+    @property
+    def subject_count(self):
+        return len(self.subjects)
+
+
+@dataclass(frozen=True)
+class Practice:
+    id: int
+    teacher_id: int
+    subject: str
+    title: str
+    objective: str
+    introduction: str
+    summary: str
+    development: str
+    goals: str
+    upload_date: str
+    num_pages: int
+    file_path: str
+    teacher_name: str
+
+
+@dataclass(frozen=True)
+class PracticeMatch:
+    id: int
+    title: str
+    subject: str
+    teacher_name: str
+    snippet: str = ''
+
+
+@dataclass(frozen=True)
+class Extraction:
+    sha256: str
+    extractor_version: str
+    num_pages: int
+    pages: List[str]
+
+    @property
+    def text(self):
+        return "\n".join(self.pages)
+
+
+@dataclass(frozen=True)
+class Activity:
+    id: int
+    kind: str
+    description: str
+    activity_date: str
+
+
+@dataclass(frozen=True)
+class PracticeLocation:
+    id: int
+    teacher_id: int
+    subject: str
+    file_path: str
+    blob_sha256: Optional[str]
+
+
+@dataclass(frozen=True)
+class CounterDrift:
+    counter: str
+    stored: Optional[int]
+    actual: int
+
+
+class ConnectionManager:
+    """Hand out one SQLite connection per thread"""
+
+    def __init__(self, db_path=DATABASE_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def connection(self):
+        """Return the calling thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # check_same_thread is off only so close_all() can run from the
+            # owning thread at shutdown; each connection is used by one thread.
+            conn = sqlite3.connect(
+                self.db_path,
+                cached_statements=STATEMENT_CACHE_SIZE,
+                check_same_thread=False
+            )
+            conn.row_factory = sqlite3.Row
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Run a block in a transaction on the calling thread's connection"""
+        conn = self.connection()
+        with conn:
+            yield conn
+
+    def close_all(self):
+        """Close every connection opened by any thread"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+class LabRepository:
+    """All database access for the laboratory management system"""
+
+    # Maintained by triggers; see rebuild_counters() if they ever drift
+    COUNT_PRACTICES = "SELECT value FROM stats WHERE name = 'practices'"
+    COUNT_TEACHERS = "SELECT value FROM stats WHERE name = 'teachers'"
+
+    STATS_DRIFT = """
+        SELECT c.name, s.value AS stored, c.actual
+        FROM (
+            SELECT 'practices' AS name, COUNT(*) AS actual FROM practices
+            UNION ALL
+            SELECT 'teachers', COUNT(*) FROM teachers
+        ) c
+        LEFT JOIN stats s ON s.name = c.name
+        WHERE s.value IS NOT c.actual
+    """
+    TEACHER_COUNT_DRIFT = """
+        SELECT t.name, t.practice_count AS stored, COUNT(p.id) AS actual
+        FROM teachers t
+        LEFT JOIN practices p ON p.teacher_id = t.id
+        GROUP BY t.id
+        HAVING stored != actual
+    """
+    REBUILD_STATS = """
+        INSERT OR REPLACE INTO stats (name, value)
+        SELECT 'practices', COUNT(*) FROM practices
+        UNION ALL
+        SELECT 'teachers', COUNT(*) FROM teachers
+    """
+    REBUILD_TEACHER_COUNTS = """
+        UPDATE teachers SET practice_count =
+            (SELECT COUNT(*) FROM practices WHERE teacher_id = teachers.id)
+    """
+
+    # Newest first; pages continue before the (created_at, id) of the last row
+    RECENT_ACTIVITIES = """
+        SELECT id, kind, description, created_at AS activity_date
+        FROM activity_log
+        {where}
+        ORDER BY created_at DESC, id DESC
+        LIMIT ?
+    """
+    ACTIVITIES_SINCE = """
+        SELECT id, kind, description, created_at AS activity_date
+        FROM activity_log
+        WHERE id > ?
+        ORDER BY id
+    """
+    INSERT_ACTIVITY = "INSERT INTO activity_log (kind, description) VALUES (?, ?)"
+
+    TEACHER_NAMES = "SELECT name FROM teachers"
+    TEACHER_ID = "SELECT id FROM teachers WHERE name = ?"
+
+    TEACHER_SUBJECTS = """
+        SELECT s.name
+        FROM teachers t
+        JOIN teacher_subjects ts ON ts.teacher_id = t.id
+        JOIN subjects s ON s.id = ts.subject_id
+        WHERE t.name = ?
+        ORDER BY ts.position
+    """
+
+    ALL_SUBJECTS = """
+        SELECT DISTINCT s.name
+        FROM subjects s
+        JOIN teacher_subjects ts ON ts.subject_id = s.id
+        ORDER BY s.name
+    """
+
+    SUBJECTS_FOR_TEACHERS = """
+        SELECT ts.teacher_id, s.name
+        FROM teacher_subjects ts
+        JOIN subjects s ON s.id = ts.subject_id
+        WHERE ts.teacher_id IN ({placeholders})
+        ORDER BY ts.teacher_id, ts.position
+    """
+
+    # Columns the teachers table can be sorted by, mapped to SQL expressions
+    TEACHER_SORT_COLUMNS = {
+        'id': 't.id',
+        'name': 't.name',
+        'subject_count': 'subject_count',
+        'practice_count': 'practice_count',
+    }
+
+    # Keyset pagination: rows strictly after (or before) the (sort value, id)
+    # of the last row shown, so deep pages cost the same as the first one.
+    TEACHER_PAGE = """
+        SELECT * FROM (
+            SELECT
+                t.id,
+                t.name,
+                (SELECT COUNT(*) FROM teacher_subjects WHERE teacher_id = t.id) AS subject_count,
+                t.practice_count
+            FROM teachers t
+        ) t
+        {where}
+        ORDER BY {column} {direction}, t.id {direction}
+        LIMIT ?
+    """
+
+    INSERT_TEACHER = "INSERT INTO teachers (name, subjects) VALUES (?, ?)"
+    INSERT_SUBJECT = "INSERT OR IGNORE INTO subjects (name) VALUES (?)"
+    INSERT_TEACHER_SUBJECT = """
+        INSERT OR IGNORE INTO teacher_subjects (teacher_id, subject_id, position)
+        SELECT ?, id, ? FROM subjects WHERE name = ?
+    """
+
+    INSERT_PRACTICE = """
+        INSERT INTO practices (
+            teacher_id, subject, title, objective,
+            introduction, summary, development, goals,
+            num_pages, file_path, content_text, blob_sha256
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    INSERT_BLOB = "INSERT OR IGNORE INTO blobs (sha256, size) VALUES (?, ?)"
+
+    PRACTICE_FILES = "SELECT file_path FROM practices"
+    PRACTICE_CONTENTS = """
+        SELECT teacher_id, subject, blob_sha256 FROM practices
+        WHERE blob_sha256 IS NOT NULL
+    """
+    PRACTICE_LOCATIONS = "SELECT id, teacher_id, subject, file_path, blob_sha256 FROM practices"
+    PRACTICE_LOCATION = PRACTICE_LOCATIONS + " WHERE id = ?"
+    FILE_STATES = """
+        SELECT path, size, mtime_ns, sha256, status FROM import_progress WHERE sha256 IS NOT NULL
+    """
+    UPDATE_PRACTICE_LOCATION = """
+        UPDATE practices SET teacher_id = ?, subject = ?, file_path = ? WHERE id = ?
+    """
+    UPDATE_PRACTICE_BLOB = "UPDATE practices SET blob_sha256 = ? WHERE id = ?"
+    UPDATE_PRACTICE_CONTENT = """
+        UPDATE practices SET blob_sha256 = ?, num_pages = ?, content_text = ? WHERE id = ?
+    """
+    DELETE_PRACTICE = "DELETE FROM practices WHERE id = ?"
+    PRACTICE_TEACHER = "SELECT teacher_id FROM practices WHERE id = ?"
+    IMPORTED_FILES = """
+        SELECT path, size, mtime_ns FROM import_progress
+        WHERE status IN ('done', 'duplicate')
+    """
+    INSERT_IMPORT_PROGRESS = """
+        INSERT OR REPLACE INTO import_progress (path, size, mtime_ns, sha256, status, error, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    """
+
+    EXTRACTION = """
+        SELECT num_pages FROM pdf_extractions
+        WHERE sha256 = ? AND extractor_version = ?
+    """
+    EXTRACTION_PAGES = """
+        SELECT text FROM pdf_pages
+        WHERE sha256 = ? AND extractor_version = ?
+        ORDER BY page_no
+    """
+    INSERT_EXTRACTION = """
+        INSERT OR REPLACE INTO pdf_extractions (sha256, extractor_version, num_pages)
+        VALUES (?, ?, ?)
+    """
+    INSERT_EXTRACTION_PAGE = """
+        INSERT OR REPLACE INTO pdf_pages (sha256, extractor_version, page_no, text)
+        VALUES (?, ?, ?, ?)
+    """
+
+    # bm25 weights follow the column order: title, subject, teacher_name,
+    # objective, introduction, content_text
+    SEARCH_PRACTICES = """
+        SELECT
+            f.rowid AS id, f.title, f.subject, f.teacher_name,
+            {snippet} AS snippet
+        FROM practices_fts f
+        WHERE practices_fts MATCH ?
+        ORDER BY bm25(practices_fts, 10.0, 5.0, 5.0, 2.0, 1.0, 1.0)
+        LIMIT ? OFFSET ?
+    """
+    # Snippets re-tokenize the matched text, which dominates the query for
+    # long documents, so callers that only list matches can skip them
+    SEARCH_SNIPPET = f"snippet(practices_fts, -1, '{SNIPPET_START}', '{SNIPPET_END}', '...', 12)"
+
+    SEARCH_PRACTICES_LIKE = """
+        SELECT p.id, p.title, p.subject, t.name AS teacher_name, '' AS snippet
+        FROM practices p
+        JOIN teachers t ON p.teacher_id = t.id
+        WHERE p.title LIKE ? OR p.subject LIKE ? OR t.name LIKE ?
+        ORDER BY p.id
+        LIMIT ? OFFSET ?
+    """
+
+    HAS_FTS = "SELECT 1 FROM sqlite_master WHERE name = 'practices_fts'"
+
+    PRACTICE_BY_ID = """
+        SELECT p.*, t.name AS teacher_name
+        FROM practices p
+        JOIN teachers t ON p.teacher_id = t.id
+        WHERE p.id = ?
+    """
+
+    # Rows for reports, read through one cursor in display order
+    REPORT_PRACTICES = """
+        SELECT p.*, t.name AS teacher_name
+        FROM practices p
+        JOIN teachers t ON p.teacher_id = t.id
+        {where}
+        ORDER BY {order}
+    """
+    TEACHER_PRACTICE_COUNT = "SELECT practice_count FROM teachers WHERE name = ?"
+
+    # Consult tab: narrow rows, newest first, continuing before the
+    # (upload_date, id) of the last row shown
+    FIND_PRACTICES = """
+        SELECT p.id, p.title, p.subject, t.name AS teacher_name, p.upload_date, p.num_pages
+        FROM practices p
+        JOIN teachers t ON p.teacher_id = t.id
+        {where}
+        ORDER BY p.upload_date DESC, p.id DESC
+        LIMIT ?
+    """
+    PRACTICE_FACETS = """
+        SELECT t.name AS teacher_name, p.subject, COUNT(*) AS practices
+        FROM practices p
+        JOIN teachers t ON p.teacher_id = t.id
+        {where}
+        GROUP BY p.teacher_id, p.subject
+    """
+
+    # Lookups that must be answered from an index. Each entry is the query,
+    # sample parameters and the table aliases it may legitimately scan (the
+    # teachers listing reads every teacher, but never every practice).
+    INDEXED_LOOKUPS = {
+        'teacher_subjects': (TEACHER_SUBJECTS, ('',), ()),
+        'all_subjects': (ALL_SUBJECTS, (), ('s',)),
+        'teacher_id': (TEACHER_ID, ('',), ()),
+        'recent_activities': (RECENT_ACTIVITIES.format(where="WHERE (created_at, id) < (?, ?)"),
+                              ('', 0, 10), ()),
+        'activities_since': (ACTIVITIES_SINCE, (0,), ()),
+        'teacher_page': (TEACHER_PAGE.format(where="WHERE (t.name, t.id) > (?, ?)",
+                                             column='t.name', direction='ASC'), ('', 0, 50), ()),
+        'find_practices_by_teacher': (FIND_PRACTICES.format(
+            where="WHERE t.name = ? AND (p.upload_date, p.id) < (?, ?)"), ('', '', 0, 50), ()),
+        'practice_by_id': (PRACTICE_BY_ID, (0,), ()),
+        'practice_location': (PRACTICE_LOCATION, (0,), ()),
+        'extraction': (EXTRACTION, ('', ''), ()),
+        'extraction_pages': (EXTRACTION_PAGES, ('', ''), ()),
+    }
+
+    def __init__(self, db_path=DATABASE_PATH, events=None):
+        self.db_path = db_path
+        self.connections = ConnectionManager(db_path)
+        self.events = events
+        self._has_fts = None
+
+    def setup_schema(self):
+        """Bring the database schema up to the latest migration"""
+        return migrate(self.connections.connection())
+
+    def close(self):
+        """Close all pooled connections"""
+        self.connections.close_all()
+
+    def find_full_scans(self):
+        """Return (lookup, plan detail) for every indexed lookup that scans a table"""
+        conn = self.connections.connection()
+        full_scans = []
+        for name, (sql, params, allowed_scans) in self.INDEXED_LOOKUPS.items():
+            for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params):
+                detail = row['detail']
+                # "SCAN x USING COVERING INDEX" walks an index, not the table
+                if not detail.startswith('SCAN ') or ' USING ' in detail:
+                    continue
+                if detail.split()[1] in allowed_scans:
+                    continue
+                full_scans.append((name, detail))
+        return full_scans
+
+    def _publish(self, event):
+        # Only called after the change is committed
+        if self.events is not None:
+            self.events.publish(event)
+
+    # Queries
+    def _fetchone(self, sql, params=()):
+        return self.connections.connection().execute(sql, params).fetchone()
+
+    def _fetchall(self, sql, params=()):
+        return self.connections.connection().execute(sql, params).fetchall()
+
+    @staticmethod
+    def _practice_from_row(row):
+        return Practice(**{field.name: row[field.name] for field in fields(Practice)})
+
+    @staticmethod
+    def _fts_query(term):
+        """Turn free text into an FTS5 query matching every word as a prefix"""
+        words = [word.replace('"', '""') for word in term.split()]
+        return ' '.join(f'"{word}"*' for word in words)
+
+    def count_practices(self):
+        """Return the total number of practices"""
+        return self._fetchone(self.COUNT_PRACTICES)[0]
+
+    def count_teachers(self):
+        """Return the total number of teachers"""
+        return self._fetchone(self.COUNT_TEACHERS)[0]
+
+    def check_counters(self):
+        """Compare the materialized counters with fresh counts
+
+        Returns a CounterDrift for every counter that does not match.
+        """
+        drift = [
+            CounterDrift(row['name'], row['stored'], row['actual'])
+            for row in self._fetchall(self.STATS_DRIFT)
+        ]
+        drift.extend(
+            CounterDrift(f"practices of {row['name']}", row['stored'], row['actual'])
+            for row in self._fetchall(self.TEACHER_COUNT_DRIFT)
+        )
+        return drift
+
+    def get_recent_activities(self, limit=10, before=None):
+        """Return logged activities, newest first
+
+        Pass the last Activity of a page as before to get the next one.
+        """
+        where, params = "", []
+        if before is not None:
+            where = "WHERE (created_at, id) < (?, ?)"
+            params.extend((before.activity_date, before.id))
+        sql = self.RECENT_ACTIVITIES.format(where=where)
+        return [Activity(**row) for row in self._fetchall(sql, params + [limit])]
+
+    def get_activities_since(self, activity_id):
+        """Return activities logged after the given id, oldest first"""
+        return [Activity(**row) for row in self._fetchall(self.ACTIVITIES_SINCE, (activity_id,))]
+
+    def get_teacher_names(self):
+        """Return the names of all teachers"""
+        return [row['name'] for row in self._fetchall(self.TEACHER_NAMES)]
+
+    def get_teacher_subjects(self, teacher_name):
+        """Return the subjects taught by a teacher"""
+        return [row['name'] for row in self._fetchall(self.TEACHER_SUBJECTS, (teacher_name,))]
+
+    def get_teacher_id(self, teacher_name) -> Optional[int]:
+        """Return the id of a teacher by name"""
+        row = self._fetchone(self.TEACHER_ID, (teacher_name,))
+        return row['id'] if row else None
+
+    def get_existing_subjects(self):
+        """Return every distinct subject, sorted"""
+        return [row['name'] for row in self._fetchall(self.ALL_SUBJECTS)]
+
+    def get_teacher_page(self, sort='id', descending=False, after=None, before=None, limit=50):
+        """Return one page of teachers with their subjects and practice count
+
+        after/before are the (sort value, id) key of the row the page starts
+        after or ends before; rows come back in display order either way.
+        """
+        column = self.TEACHER_SORT_COLUMNS[sort]
+        backwards = before is not None
+        # Paging backwards walks the order in reverse, then flips the result
+        direction = 'DESC' if descending != backwards else 'ASC'
+
+        where, params = "", []
+        key = before if backwards else after
+        if key is not None:
+            operator = '<' if direction == 'DESC' else '>'
+            where = f"WHERE ({column}, t.id) {operator} (?, ?)"
+            params.extend(key)
+
+        sql = self.TEACHER_PAGE.format(where=where, column=column, direction=direction)
+        rows = self._fetchall(sql, params + [limit])
+        if backwards:
+            rows.reverse()
+        return self._teacher_summaries(rows)
+
+    def get_teachers_by_id(self, teacher_ids):
+        """Return the summaries of specific teachers"""
+        teacher_ids = list(teacher_ids)
+        if not teacher_ids:
+            return []
+        where = f"WHERE t.id IN ({', '.join('?' * len(teacher_ids))})"
+        sql = self.TEACHER_PAGE.format(where=where, column='t.id', direction='ASC')
+        return self._teacher_summaries(self._fetchall(sql, teacher_ids + [len(teacher_ids)]))
+
+    def _teacher_summaries(self, rows):
+        subjects = {}
+        if rows:
+            placeholders = ', '.join('?' * len(rows))
+            for row in self._fetchall(
+                    self.SUBJECTS_FOR_TEACHERS.format(placeholders=placeholders),
+                    [row['id'] for row in rows]):
+                subjects.setdefault(row['teacher_id'], []).append(row['name'])
+        return [
+            TeacherSummary(row['id'], row['name'], subjects.get(row['id'], []), row['practice_count'])
+            for row in rows
+        ]
+
+    def search_practices(self, term, limit=100, offset=0, snippets=True):
+        """Return practices matching term, best matches first
+
+        offset skips that many matches, for paging through the results.
+        Without snippets every match has an empty snippet.
+        """
+        if self._has_fts is None:
+            self._has_fts = self._fetchone(self.HAS_FTS) is not None
+
+        if self._has_fts:
+            query = self._fts_query(term)
+            if not query:
+                return []
+            sql = self.SEARCH_PRACTICES.format(snippet=self.SEARCH_SNIPPET if snippets else "''")
+            rows = self._fetchall(sql, (query, limit, offset))
+        else:
+            pattern = f"%{term}%"
+            rows = self._fetchall(self.SEARCH_PRACTICES_LIKE, (pattern, pattern, pattern, limit, offset))
+
+        return [
+            PracticeMatch(row['id'], row['title'], row['subject'], row['teacher_name'], row['snippet'])
+            for row in rows
+        ]
+
+    def get_practice(self, practice_id) -> Optional[Practice]:
+        """Return a single practice with its teacher name"""
+        row = self._fetchone(self.PRACTICE_BY_ID, (practice_id,))
+        return self._practice_from_row(row) if row else None
+
+    def get_extraction_page_count(self, sha256, extractor_version) -> Optional[int]:
+        """Return the page count of cached parse results, without their text"""
+        row = self._fetchone(self.EXTRACTION, (sha256, extractor_version))
+        return row['num_pages'] if row else None
+
+    def get_extraction(self, sha256, extractor_version) -> Optional[Extraction]:
+        """Return cached parse results for a file's content, if any"""
+        row = self._fetchone(self.EXTRACTION, (sha256, extractor_version))
+        if row is None:
+            return None
+        pages = [
+            page['text'] or ''
+            for page in self._fetchall(self.EXTRACTION_PAGES, (sha256, extractor_version))
+        ]
+        return Extraction(sha256, extractor_version, row['num_pages'], pages)
+
+    def iter_practices(self, teacher_name=None, practice_ids=None, filters=None, batch_size=200):
+        """Yield the practices of a teacher, a list of ids, a PracticeFilter, or all of them
+
+        Rows are fetched batch_size at a time from a single cursor, so any
+        number of practices can be walked in constant memory.
+        """
+        if filters is not None:
+            conditions, params = filters.where()
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            sql = self.REPORT_PRACTICES.format(where=where, order="p.upload_date DESC, p.id DESC")
+        elif teacher_name is not None:
+            sql = self.REPORT_PRACTICES.format(where="WHERE t.name = ?", order="p.upload_date, p.id")
+            params = (teacher_name,)
+        elif practice_ids is not None:
+            practice_ids = list(practice_ids)
+            if not practice_ids:
+                return
+            placeholders = ', '.join('?' * len(practice_ids))
+            sql = self.REPORT_PRACTICES.format(where=f"WHERE p.id IN ({placeholders})", order="p.id")
+            params = practice_ids
+        else:
+            sql = self.REPORT_PRACTICES.format(where="", order="t.name, p.upload_date, p.id")
+            params = ()
+
+        cursor = self.connections.connection().execute(sql, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield self._practice_from_row(row)
+        finally:
+            cursor.close()
+
+    def count_report_practices(self, teacher_name=None, practice_ids=None, filters=None):
+        """Return how many practices iter_practices will yield"""
+        if filters is not None:
+            return self.get_practice_facets(filters).total
+        if teacher_name is not None:
+            row = self._fetchone(self.TEACHER_PRACTICE_COUNT, (teacher_name,))
+            return row['practice_count'] if row else 0
+        if practice_ids is not None:
+            return len(set(practice_ids))
+        return self.count_practices()
+
+    def find_practices(self, filters=PracticeFilter(), after=None, limit=50):
+        """Return one page of PracticeRows matching filters, newest first
+
+        Pass the last row of a page as after to get the next one.
+        """
+        conditions, params = filters.where()
+        if after is not None:
+            conditions.append("(p.upload_date, p.id) < (?, ?)")
+            params.extend((after.upload_date, after.id))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return [
+            PracticeRow(**row)
+            for row in self._fetchall(self.FIND_PRACTICES.format(where=where), params + [limit])
+        ]
+
+    def get_practice_facets(self, filters=PracticeFilter()):
+        """Count the practices matching filters, in total and per teacher and subject"""
+        conditions, params = filters.where()
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        total, teachers, subjects = 0, {}, {}
+        for row in self._fetchall(self.PRACTICE_FACETS.format(where=where), params):
+            total += row['practices']
+            teachers[row['teacher_name']] = teachers.get(row['teacher_name'], 0) + row['practices']
+            subjects[row['subject']] = subjects.get(row['subject'], 0) + row['practices']
+        return PracticeFacets(total, teachers, subjects)
+
+    def get_practice_files(self):
+        """Return the stored file path of every practice"""
+        return [row['file_path'] for row in self._fetchall(self.PRACTICE_FILES)]
+
+    def get_practice_contents(self):
+        """Return (teacher_id, subject, sha256) for practices stored as blobs"""
+        return [tuple(row) for row in self._fetchall(self.PRACTICE_CONTENTS)]
+
+    def get_practice_locations(self):
+        """Return where every practice's file is expected to be"""
+        return [PracticeLocation(**row) for row in self._fetchall(self.PRACTICE_LOCATIONS)]
+
+    def get_practice_location(self, practice_id) -> Optional[PracticeLocation]:
+        """Return where one practice's file is stored"""
+        row = self._fetchone(self.PRACTICE_LOCATION, (practice_id,))
+        return PracticeLocation(**row) if row else None
+
+    def get_file_states(self):
+        """Return {path: (size, mtime_ns, sha256, status)} recorded for known files"""
+        return {
+            row['path']: (row['size'], row['mtime_ns'], row['sha256'], row['status'])
+            for row in self._fetchall(self.FILE_STATES)
+        }
+
+    def get_imported_files(self):
+        """Return {path: (size, mtime_ns)} for files the bulk importer finished"""
+        return {
+            row['path']: (row['size'], row['mtime_ns'])
+            for row in self._fetchall(self.IMPORTED_FILES)
+        }
+
+    # Writes
+    def add_teacher(self, name, subjects):
+        """Insert a teacher and return its id"""
+        with self.connections.transaction() as conn:
+            # The legacy subjects column is kept current for older stations
+            teacher_id = conn.execute(self.INSERT_TEACHER, (name, ','.join(subjects))).lastrowid
+            for position, subject in enumerate(subjects):
+                conn.execute(self.INSERT_SUBJECT, (subject,))
+                conn.execute(self.INSERT_TEACHER_SUBJECT, (teacher_id, position, subject))
+        self._publish(TeacherAdded(teacher_id, name, list(subjects)))
+        return teacher_id
+
+    def add_practice(self, teacher_id, subject, title, objective, introduction,
+                     summary, development, goals, num_pages, file_path, content_text='',
+                     blob_sha256=None):
+        """Insert a practice and return its id"""
+        with self.connections.transaction() as conn:
+            cursor = conn.execute(self.INSERT_PRACTICE, (
+                teacher_id, subject, title, objective,
+                introduction, summary, development, goals,
+                num_pages, file_path, content_text, blob_sha256
+            ))
+        self._publish(PracticeAdded(cursor.lastrowid, teacher_id, subject, title))
+        return cursor.lastrowid
+
+    def save_extraction(self, extraction):
+        """Cache the parse results for a file's content"""
+        with self.connections.transaction() as conn:
+            conn.execute(self.INSERT_EXTRACTION, (
+                extraction.sha256, extraction.extractor_version, extraction.num_pages
+            ))
+            conn.executemany(self.INSERT_EXTRACTION_PAGE, (
+                (extraction.sha256, extraction.extractor_version, page_no, text)
+                for page_no, text in enumerate(extraction.pages)
+            ))
+
+    def log_activity(self, kind, description):
+        """Record an activity the triggers do not capture, such as a report"""
+        with self.connections.transaction() as conn:
+            return conn.execute(self.INSERT_ACTIVITY, (kind, description)).lastrowid
+
+    def rebuild_counters(self):
+        """Recompute every materialized counter from the base tables"""
+        with self.connections.transaction() as conn:
+            conn.execute(self.REBUILD_STATS)
+            conn.execute(self.REBUILD_TEACHER_COUNTS)
+
+    def save_import_batch(self, blobs, practices, extractions, progress):
+        """Store one batch of the bulk importer in a single transaction
+
+        blobs are (sha256, size), practices are rows in INSERT_PRACTICE
+        column order and progress rows follow INSERT_IMPORT_PROGRESS.
+        """
+        with self.connections.transaction() as conn:
+            conn.executemany(self.INSERT_BLOB, blobs)
+            conn.executemany(self.INSERT_PRACTICE, practices)
+            conn.executemany(self.INSERT_EXTRACTION, (
+                (extraction.sha256, extraction.extractor_version, extraction.num_pages)
+                for extraction in extractions
+            ))
+            conn.executemany(self.INSERT_EXTRACTION_PAGE, (
+                (extraction.sha256, extraction.extractor_version, page_no, text)
+                for extraction in extractions
+                for page_no, text in enumerate(extraction.pages)
+            ))
+            conn.executemany(self.INSERT_IMPORT_PROGRESS, progress)
+        if practices:
+            teacher_ids = tuple(sorted({row[0] for row in practices}))
+            self._publish(PracticesImported(teacher_ids, len(practices)))
+
+    def apply_reconciliation(self, locations=(), blobs=(), contents=(), deletions=(), file_states=()):
+        """Write the fixes found by the reconciler in a single transaction
+
+        locations are (teacher_id, subject, file_path, id), blobs are
+        (sha256, size, id) for files now kept in the blob store, contents are
+        (sha256, size, num_pages, content_text, id) for files whose content
+        changed, deletions are practice ids and file_states follow
+        INSERT_IMPORT_PROGRESS.
+        """
+        teacher_ids = set()
+        with self.connections.transaction() as conn:
+            conn.executemany(self.INSERT_BLOB, (
+                (row[0], row[1]) for row in list(blobs) + list(contents)
+            ))
+            conn.executemany(self.UPDATE_PRACTICE_BLOB, ((row[0], row[-1]) for row in blobs))
+            conn.executemany(self.UPDATE_PRACTICE_CONTENT, (
+                (sha256, num_pages, content_text, practice_id)
+                for sha256, _, num_pages, content_text, practice_id in contents
+            ))
+            for practice_id in list(deletions) + [row[-1] for row in locations]:
+                row = conn.execute(self.PRACTICE_TEACHER, (practice_id,)).fetchone()
+                if row is not None:
+                    teacher_ids.add(row['teacher_id'])
+            conn.executemany(self.UPDATE_PRACTICE_LOCATION, locations)
+            conn.executemany(self.DELETE_PRACTICE, ((practice_id,) for practice_id in deletions))
+            conn.executemany(self.INSERT_IMPORT_PROGRESS, file_states)
+        teacher_ids.update(row[0] for row in locations)
+        if teacher_ids:
+            self._publish(PracticesUpdated(tuple(sorted(teacher_ids))))
+
+    def add_blob(self, sha256, size):
+        """Record a stored blob; known hashes are left untouched"""
+        with self.connections.transaction() as conn:
+            conn.execute(self.INSERT_BLOB, (sha256, size))
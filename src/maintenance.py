@@ -0,0 +1,51 @@
+# maintenance.py
+"""Database consistency checks
+
+Usage: python -m src.maintenance check-counters [--rebuild] [--db PATH]
+"""
+import argparse
+import sys
+
+from src.lab_repository import DATABASE_PATH, LabRepository
+
+
+def check_counters(repository, rebuild=False):
+    """Report drifted counters and optionally rebuild them
+
+    Returns True when the counters are (or have been made) consistent.
+    """
+    drift = repository.check_counters()
+    for item in drift:
+        print(f"{item.counter}: stored {item.stored}, actual {item.actual}")
+
+    if not drift:
+        print("Counters are consistent")
+        return True
+    if rebuild:
+        repository.rebuild_counters()
+        print(f"Rebuilt counters ({len(drift)} mismatched)")
+        return True
+    return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m src.maintenance")
+    parser.add_argument("--db", default=DATABASE_PATH, help="database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    counters = commands.add_parser("check-counters", help="verify the materialized counters")
+    counters.add_argument("--rebuild", action="store_true", help="recompute them if they drifted")
+
+    args = parser.parse_args(argv)
+
+    repository = LabRepository(args.db)
+    try:
+        repository.setup_schema()
+        if args.command == "check-counters":
+            return 0 if check_counters(repository, rebuild=args.rebuild) else 1
+    finally:
+        repository.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,396 @@
+# migrations.py
+import sqlite3
+from datetime import datetime
+
+
+def _create_base_tables(conn):
+    """Create the original teachers and practices tables"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS teachers (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            subjects TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS practices (
+            id INTEGER PRIMARY KEY,
+            teacher_id INTEGER,
+            subject TEXT,
+            title TEXT,
+            objective TEXT,
+            introduction TEXT,
+            summary TEXT,
+            development TEXT,
+            goals TEXT,
+            upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            num_pages INTEGER,
+            file_path TEXT,
+            FOREIGN KEY (teacher_id) REFERENCES teachers (id)
+        )
+    ''')
+
+
+def _add_lookup_indexes(conn):
+    """Index the columns used by teacher lookups and practice listings"""
+    # Teacher names identify their folder under folders/, so rows that share a
+    # name are merged into the oldest one before the name becomes unique.
+    duplicates = conn.execute("""
+        SELECT name, MIN(id) FROM teachers GROUP BY name HAVING COUNT(*) > 1
+    """).fetchall()
+    for name, keep_id in duplicates:
+        rows = conn.execute(
+            "SELECT id, subjects FROM teachers WHERE name = ? ORDER BY id", (name,)
+        ).fetchall()
+        subjects = []
+        for _, subjects_str in rows:
+            for subject in (subjects_str or '').split(','):
+                if subject.strip() and subject.strip() not in subjects:
+                    subjects.append(subject.strip())
+        conn.execute(
+            "UPDATE practices SET teacher_id = ? WHERE teacher_id IN "
+            "(SELECT id FROM teachers WHERE name = ? AND id != ?)",
+            (keep_id, name, keep_id)
+        )
+        conn.execute("DELETE FROM teachers WHERE name = ? AND id != ?", (name, keep_id))
+        conn.execute("UPDATE teachers SET subjects = ? WHERE id = ?", (','.join(subjects), keep_id))
+
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_teachers_name ON teachers (name)")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_practices_teacher_upload "
+        "ON practices (teacher_id, upload_date)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_practices_subject ON practices (subject)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_practices_upload_date ON practices (upload_date)")
+
+
+def _normalize_subjects(conn):
+    """Move the comma-joined teachers.subjects strings into join tables"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS subjects (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS teacher_subjects (
+            teacher_id INTEGER NOT NULL,
+            subject_id INTEGER NOT NULL,
+            position INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (teacher_id, subject_id),
+            FOREIGN KEY (teacher_id) REFERENCES teachers (id) ON DELETE CASCADE,
+            FOREIGN KEY (subject_id) REFERENCES subjects (id)
+        )
+    ''')
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_teacher_subjects_subject "
+        "ON teacher_subjects (subject_id, teacher_id)"
+    )
+
+    # teachers.subjects is left in place (and still written) so stations that
+    # have not been upgraded keep working, but nothing reads it anymore.
+    for teacher_id, subjects_str in conn.execute("SELECT id, subjects FROM teachers").fetchall():
+        subjects = [s.strip() for s in (subjects_str or '').split(',') if s.strip()]
+        for position, subject in enumerate(subjects):
+            conn.execute("INSERT OR IGNORE INTO subjects (name) VALUES (?)", (subject,))
+            conn.execute("""
+                INSERT OR IGNORE INTO teacher_subjects (teacher_id, subject_id, position)
+                SELECT ?, id, ? FROM subjects WHERE name = ?
+            """, (teacher_id, position, subject))
+
+
+def _add_practice_search(conn):
+    """Store extracted PDF text and index practices with FTS5"""
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(practices)")]
+    if 'content_text' not in columns:
+        conn.execute("ALTER TABLE practices ADD COLUMN content_text TEXT")
+
+    # The view supplies the teacher name so it is searchable without a join;
+    # the index itself is external-content and keeps no copy of the text.
+    conn.execute('''
+        CREATE VIEW IF NOT EXISTS practice_search_source AS
+        SELECT p.id, p.title, p.subject, t.name AS teacher_name,
+               p.objective, p.introduction, p.content_text
+        FROM practices p
+        LEFT JOIN teachers t ON t.id = p.teacher_id
+    ''')
+
+    try:
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS practices_fts USING fts5 (
+                title, subject, teacher_name, objective, introduction, content_text,
+                content='practice_search_source',
+                content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        ''')
+    except sqlite3.OperationalError:
+        # SQLite built without FTS5: search keeps using LIKE
+        return
+
+    new_values = '''
+        new.id, new.title, new.subject,
+        (SELECT name FROM teachers WHERE id = new.teacher_id),
+        new.objective, new.introduction, new.content_text
+    '''
+    old_values = '''
+        'delete', old.id, old.title, old.subject,
+        (SELECT name FROM teachers WHERE id = old.teacher_id),
+        old.objective, old.introduction, old.content_text
+    '''
+    fts_columns = "rowid, title, subject, teacher_name, objective, introduction, content_text"
+
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS practices_fts_insert AFTER INSERT ON practices BEGIN
+            INSERT INTO practices_fts ({fts_columns}) VALUES ({new_values});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS practices_fts_delete AFTER DELETE ON practices BEGIN
+            INSERT INTO practices_fts (practices_fts, {fts_columns}) VALUES ({old_values});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS practices_fts_update AFTER UPDATE ON practices BEGIN
+            INSERT INTO practices_fts (practices_fts, {fts_columns}) VALUES ({old_values});
+            INSERT INTO practices_fts ({fts_columns}) VALUES ({new_values});
+        END
+    ''')
+
+    conn.execute("INSERT INTO practices_fts (practices_fts) VALUES ('rebuild')")
+
+
+def _add_blob_store(conn):
+    """Track content-addressed blobs and link practices to them"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS blobs (
+            sha256 TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(practices)")]
+    if 'blob_sha256' not in columns:
+        # Practices uploaded before the blob store keep a NULL hash
+        conn.execute("ALTER TABLE practices ADD COLUMN blob_sha256 TEXT REFERENCES blobs (sha256)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_practices_blob ON practices (blob_sha256)")
+
+
+def _add_extraction_cache(conn):
+    """Cache PDF parse results by content hash"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS pdf_extractions (
+            sha256 TEXT NOT NULL,
+            extractor_version TEXT NOT NULL,
+            num_pages INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (sha256, extractor_version)
+        ) WITHOUT ROWID
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS pdf_pages (
+            sha256 TEXT NOT NULL,
+            extractor_version TEXT NOT NULL,
+            page_no INTEGER NOT NULL,
+            text TEXT,
+            PRIMARY KEY (sha256, extractor_version, page_no),
+            FOREIGN KEY (sha256, extractor_version)
+                REFERENCES pdf_extractions (sha256, extractor_version) ON DELETE CASCADE
+        ) WITHOUT ROWID
+    ''')
+
+
+def _materialize_counters(conn):
+    """Keep dashboard totals and per-teacher practice counts up to date with triggers"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS stats (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    ''')
+
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(teachers)")]
+    if 'practice_count' not in columns:
+        conn.execute("ALTER TABLE teachers ADD COLUMN practice_count INTEGER NOT NULL DEFAULT 0")
+    # Lets the teachers table page by practice count without sorting
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_teachers_practice_count ON teachers (practice_count)")
+
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS stats_practices_insert AFTER INSERT ON practices BEGIN
+            UPDATE stats SET value = value + 1 WHERE name = 'practices';
+            UPDATE teachers SET practice_count = practice_count + 1 WHERE id = new.teacher_id;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS stats_practices_delete AFTER DELETE ON practices BEGIN
+            UPDATE stats SET value = value - 1 WHERE name = 'practices';
+            UPDATE teachers SET practice_count = practice_count - 1 WHERE id = old.teacher_id;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS stats_practices_move AFTER UPDATE OF teacher_id ON practices
+        WHEN old.teacher_id IS NOT new.teacher_id BEGIN
+            UPDATE teachers SET practice_count = practice_count - 1 WHERE id = old.teacher_id;
+            UPDATE teachers SET practice_count = practice_count + 1 WHERE id = new.teacher_id;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS stats_teachers_insert AFTER INSERT ON teachers BEGIN
+            UPDATE stats SET value = value + 1 WHERE name = 'teachers';
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS stats_teachers_delete AFTER DELETE ON teachers BEGIN
+            UPDATE stats SET value = value - 1 WHERE name = 'teachers';
+        END
+    ''')
+
+    conn.execute('''
+        INSERT OR REPLACE INTO stats (name, value)
+        SELECT 'practices', COUNT(*) FROM practices
+        UNION ALL
+        SELECT 'teachers', COUNT(*) FROM teachers
+    ''')
+    conn.execute(
+        "UPDATE teachers SET practice_count = "
+        "(SELECT COUNT(*) FROM practices WHERE teacher_id = teachers.id)"
+    )
+
+
+def _add_activity_log(conn):
+    """Record activity in an append-only log instead of deriving it per query"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS activity_log (
+            id INTEGER PRIMARY KEY,
+            kind TEXT NOT NULL,
+            description TEXT NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_activity_log_created ON activity_log (created_at, id)"
+    )
+
+    # Existing rows are replayed oldest first so ids follow the timeline
+    conn.execute('''
+        INSERT INTO activity_log (kind, description, created_at)
+        SELECT kind, description, created_at FROM (
+            SELECT
+                'practice_added' AS kind,
+                'Practice uploaded: ' || p.title || ' by ' || t.name AS description,
+                p.upload_date AS created_at
+            FROM practices p
+            JOIN teachers t ON p.teacher_id = t.id
+
+            UNION ALL
+
+            SELECT 'teacher_added', 'Teacher added: ' || name, created_at
+            FROM teachers
+        )
+        WHERE description IS NOT NULL AND created_at IS NOT NULL
+        ORDER BY created_at
+    ''')
+
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS activity_practices_insert AFTER INSERT ON practices BEGIN
+            INSERT INTO activity_log (kind, description) VALUES (
+                'practice_added',
+                'Practice uploaded: ' || ifnull(new.title, '') || ' by ' ||
+                    ifnull((SELECT name FROM teachers WHERE id = new.teacher_id), 'unknown teacher')
+            );
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS activity_practices_delete AFTER DELETE ON practices BEGIN
+            INSERT INTO activity_log (kind, description)
+            VALUES ('practice_deleted', 'Practice deleted: ' || ifnull(old.title, ''));
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS activity_teachers_insert AFTER INSERT ON teachers BEGIN
+            INSERT INTO activity_log (kind, description)
+            VALUES ('teacher_added', 'Teacher added: ' || new.name);
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS activity_teachers_delete AFTER DELETE ON teachers BEGIN
+            INSERT INTO activity_log (kind, description)
+            VALUES ('teacher_deleted', 'Teacher removed: ' || old.name);
+        END
+    ''')
+
+
+def _add_import_progress(conn):
+    """Remember which files the bulk importer has already handled"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS import_progress (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            sha256 TEXT,
+            status TEXT NOT NULL,
+            error TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        ) WITHOUT ROWID
+    ''')
+
+
+# Ordered (version, description, step) tuples. Steps must only ever be
+# appended: a database records the highest version it has applied and runs
+# every later step, so existing lab_management.db files upgrade in place.
+MIGRATIONS = [
+    (1, "Create teachers and practices tables", _create_base_tables),
+    (2, "Index teacher names and practice lookup columns", _add_lookup_indexes),
+    (3, "Normalize teacher subjects into subjects and teacher_subjects", _normalize_subjects),
+    (4, "Add extracted text and FTS5 practice search", _add_practice_search),
+    (5, "Add content-addressed blobs", _add_blob_store),
+    (6, "Add PDF extraction cache", _add_extraction_cache),
+    (7, "Materialize dashboard and per-teacher counters", _materialize_counters),
+    (8, "Add the activity log", _add_activity_log),
+    (9, "Track bulk import progress", _add_import_progress),
+]
+
+
+def current_version(conn):
+    """Return the highest migration version applied to the database"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_at TIMESTAMP
+        )
+    ''')
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def migrate(conn):
+    """Apply every pending migration, each in its own transaction"""
+    version = current_version(conn)
+    applied = []
+
+    for step_version, description, step in MIGRATIONS:
+        if step_version <= version:
+            continue
+
+        # DDL does not open an implicit transaction in sqlite3, so begin one
+        # explicitly to keep a half-applied step from ever being committed.
+        conn.execute("BEGIN")
+        try:
+            step(conn)
+            conn.execute(
+                "INSERT INTO schema_version (version, description, applied_at) VALUES (?, ?, ?)",
+                (step_version, description, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(step_version)
+
+    return applied
@@ -0,0 +1,62 @@
+# operations.py
+"""Core teacher and practice operations shared by the GUI and the CLI"""
+import os
+from datetime import datetime
+
+FOLDERS_DIR = "folders"
+
+
+def sanitize_filename(filename):
+    """Sanitize filename to prevent issues"""
+    # Remove or replace problematic characters
+    invalid_chars = '<>:"/\\|?*'
+    for char in invalid_chars:
+        filename = filename.replace(char, '_')
+
+    # Replace spaces with underscores
+    filename = filename.replace(' ', '_')
+
+    # Limit length
+    if len(filename) > 200:
+        name, ext = os.path.splitext(filename)
+        filename = name[:196] + ext
+
+    return filename
+
+
+def create_teacher_directories(storage, teacher_name, subjects):
+    """Create the folder of a teacher and one subfolder per subject"""
+    teacher_dir = os.path.join(storage.root, teacher_name)
+    storage.make_dirs(teacher_dir)
+    for subject in subjects:
+        storage.make_dirs(os.path.join(teacher_dir, subject.strip()))
+
+
+def register_teacher(repository, storage, name, subjects):
+    """Create a teacher's folders and database row, returning its id
+
+    Raises ValueError for a missing name or subjects, or a name in use.
+    """
+    name = name.strip()
+    subjects = [subject.strip() for subject in subjects if subject.strip()]
+    if not name:
+        raise ValueError("Teacher name is required")
+    if not subjects:
+        raise ValueError("At least one subject is required")
+    if repository.get_teacher_id(name) is not None:
+        raise ValueError("A teacher with this name already exists")
+
+    create_teacher_directories(storage, name, subjects)
+    return repository.add_teacher(name, subjects)
+
+
+def practice_destination(storage, teacher_name, teacher_id, subject, title):
+    """Return where an uploaded practice should be stored
+
+    The file name follows practiceName_subject_teacherID_date.pdf. Batch
+    ingestion can store several files with one title in one second, so the
+    name is only claimed when the file is linked, see BlobStore.link_unique.
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    stem = sanitize_filename(f"{title}_{subject}_teacher{teacher_id}_{timestamp}")
+    return os.path.join(storage.root, teacher_name, subject, f"{stem}.pdf")
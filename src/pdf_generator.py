@@ -1,21 +1,163 @@
 # pdf_generator.py
 from fpdf import FPDF
-import json
-
-class PracticeReportGenerator:
-    def __init__(self):
-        self.pdf = FPDF()
-
-    def generate_practice_pdf(self, practice_data, output_file):
-        self.pdf.add_page()
-        self.pdf.set_font("Arial", size=12)
-        
-        # Add header
-        self.pdf.cell(200, 10, txt=practice_data["title"], ln=1, align='C')
-        self.pdf.cell(200, 10, txt=f"Subject: {practice_data['subject']}", ln=1, align='L')
-        
-        # Add content
-        self.pdf.multi_cell(0, 10, txt=f"Objective:\n{practice_data['objective']}")
-        self.pdf.multi_cell(0, 10, txt=f"Introduction:\n{practice_data['introduction']}")
-        
-        self.pdf.output(output_file)
\ No newline at end of file
+import os
+import shutil
+import tempfile
+
+from src.utils import remove_quietly
+
+
+# Practices rendered into one FPDF before it is written out and dropped
+DEFAULT_SHARD_SIZE = 250
+
+
+def _add_practice_page(pdf, practice):
+    pdf.add_page()
+
+    # Header
+    pdf.set_font('Arial', 'B', 16)
+    pdf.cell(0, 10, 'Practice Report', 0, 1, 'C')
+    pdf.ln(10)
+
+    # Practice details
+    pdf.set_font('Arial', 'B', 12)
+    details = [
+        f"Practice ID: {practice.id}",
+        f"Teacher: {practice.teacher_name}",
+        f"Subject: {practice.subject}",
+        f"Title: {practice.title}",
+        f"Date: {practice.upload_date}",
+        f"Number of Pages: {practice.num_pages}",
+        "",
+        "Objective:",
+        practice.objective,
+        "",
+        "Introduction:",
+        practice.introduction,
+        "",
+        "Summary:",
+        practice.summary,
+        "",
+        "Development:",
+        practice.development,
+        "",
+        "Goals:",
+        practice.goals
+    ]
+
+    pdf.set_font('Arial', '', 12)
+    for detail in details:
+        pdf.multi_cell(0, 10, detail)
+
+
+def shard_path(output_file, index):
+    """Return the name of the index-th shard, e.g. report_002.pdf"""
+    stem, ext = os.path.splitext(output_file)
+    return f"{stem}_{index:03d}{ext or '.pdf'}"
+
+
+def merge_pdfs(paths, output_file):
+    """Concatenate PDFs into output_file with PyMuPDF
+
+    The merged document is built in memory before it is saved, so this
+    needs memory for the whole report, not for one shard.
+    """
+    import fitz  # PyMuPDF
+
+    temp_path = output_file + ".part"
+    try:
+        with fitz.open() as merged:
+            for path in paths:
+                with fitz.open(path) as doc:
+                    merged.insert_pdf(doc)
+            merged.save(temp_path, garbage=3, deflate=True)
+        os.replace(temp_path, output_file)
+    except BaseException:
+        remove_quietly(temp_path)
+        raise
+
+
+def generate_report(repository, output_file, teacher_name=None, practice_ids=None, filters=None,
+                    shard_size=DEFAULT_SHARD_SIZE, merge=True, on_progress=None):
+    """Render a report of many practices without holding them all in memory
+
+    Practices are streamed from the repository and rendered shard_size at a
+    time; each shard is written to its own file as soon as it is full, so
+    rendering needs memory for one shard only. With merge the shards are
+    then combined into output_file, which holds the whole report in memory
+    (see merge_pdfs); otherwise they are kept as output_001.pdf,
+    output_002.pdf, ..., the choice for reports too large to merge. A report
+    that fits in one shard is always written straight to output_file.
+
+    on_progress(done, total) is called after every shard. Returns the list
+    of files written.
+    """
+    total = repository.count_report_practices(teacher_name, practice_ids, filters)
+    practices = repository.iter_practices(teacher_name, practice_ids, filters)
+
+    # Shards are written to a temporary directory next to the output and
+    # only moved into place (or merged) once the report is complete
+    shards = []
+    temp_dir = None
+    done = 0
+    try:
+        pdf = None
+        for practice in practices:
+            if pdf is None:
+                pdf = FPDF()
+            _add_practice_page(pdf, practice)
+            done += 1
+            if done % shard_size == 0:
+                if temp_dir is None:
+                    temp_dir = tempfile.mkdtemp(prefix=".report.", dir=os.path.dirname(output_file) or ".")
+                shards.append(_write_shard(pdf, output_file, len(shards) + 1, temp_dir))
+                pdf = None
+                if on_progress:
+                    on_progress(done, total)
+
+        if not shards:
+            # Everything fit in one shard (or there was nothing to report)
+            (pdf or _empty_report()).output(output_file)
+            if on_progress:
+                on_progress(done, total)
+            return [output_file]
+        if pdf is not None:
+            shards.append(_write_shard(pdf, output_file, len(shards) + 1, temp_dir))
+            if on_progress:
+                on_progress(done, total)
+
+        if len(shards) == 1:
+            os.replace(shards[0], output_file)
+            return [output_file]
+        if not merge:
+            return _publish_shards(shards, output_file)
+        merge_pdfs(shards, output_file)
+        return [output_file]
+    finally:
+        practices.close()
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def _write_shard(pdf, output_file, index, temp_dir):
+    path = os.path.join(temp_dir, os.path.basename(shard_path(output_file, index)))
+    pdf.output(path)
+    return path
+
+
+def _publish_shards(shards, output_file):
+    """Move finished shards from the temporary directory next to output_file"""
+    published = []
+    for index, path in enumerate(shards, start=1):
+        destination = shard_path(output_file, index)
+        os.replace(path, destination)
+        published.append(destination)
+    return published
+
+
+def _empty_report():
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font('Arial', '', 12)
+    pdf.cell(0, 10, 'No practices to report', 0, 1, 'C')
+    return pdf
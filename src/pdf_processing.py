@@ -0,0 +1,153 @@
+# pdf_processing.py
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from src.lab_repository import Extraction
+from src.utils import file_sha256
+
+# Bump when extraction output changes so cached results are re-created
+EXTRACTOR_VERSION = "pymupdf-1"
+
+# Documents with at least this many pages are split across processes
+PARALLEL_PAGE_THRESHOLD = 64
+PAGES_PER_TASK = 16
+
+
+def worker_context():
+    """Return the start method for PDF worker processes
+
+    Pools are started from threaded processes (the upload workers, the
+    API's thread pool), where forking can copy a lock held by another
+    thread and deadlock, so workers come from a fork server or are spawned.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def _failed_info(message):
+    return {
+        'num_pages': 0,
+        'content_text': "",
+        'objective': message,
+        'introduction': message,
+        'summary': message,
+        'development': message,
+        'goals': message
+    }
+
+
+def _page_text(page):
+    try:
+        return page.get_text("text") or ""
+    except Exception:
+        # If text extraction fails, keep the page count
+        return ""
+
+
+def _extract_page_range(file_path, start, stop):
+    """Worker: return (page_no, text) for pages start..stop-1"""
+    import fitz  # PyMuPDF
+    with fitz.open(file_path) as doc:
+        return [(page_no, _page_text(doc[page_no])) for page_no in range(start, stop)]
+
+
+def iter_pages(file_path, max_workers=None):
+    """Yield (page_no, text) for every page as soon as it is extracted
+
+    Small documents, and any document when only one worker is available,
+    are read in order in this process. Large ones are split into page
+    ranges handled by a process pool, and pages are yielded in the order
+    the ranges finish, not in page order.
+    """
+    import fitz  # PyMuPDF
+    with fitz.open(file_path) as doc:
+        yield from _iter_document(doc, file_path, max_workers)
+
+
+def _iter_document(doc, file_path, max_workers):
+    num_pages = doc.page_count
+    max_workers = max_workers or min(os.cpu_count() or 1, 8)
+    if num_pages < PARALLEL_PAGE_THRESHOLD or max_workers <= 1:
+        # Starting worker processes costs more than one process gains
+        for page_no in range(num_pages):
+            yield page_no, _page_text(doc[page_no])
+        return
+
+    ranges = [
+        (start, min(start + PAGES_PER_TASK, num_pages))
+        for start in range(0, num_pages, PAGES_PER_TASK)
+    ]
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=worker_context()) as executor:
+        futures = [
+            executor.submit(_extract_page_range, file_path, start, stop)
+            for start, stop in ranges
+        ]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def read_pages(file_path):
+    """Return the text of every page, read in order in this process
+
+    For callers that already run one file per worker process.
+    """
+    import fitz  # PyMuPDF
+    with fitz.open(file_path) as doc:
+        return [_page_text(page) for page in doc]
+
+
+def extract_pages(file_path, max_workers=None):
+    """Return the text of every page of a PDF, in page order"""
+    import fitz  # PyMuPDF
+    with fitz.open(file_path) as doc:
+        pages = [""] * doc.page_count
+        for page_no, text in _iter_document(doc, file_path, max_workers):
+            pages[page_no] = text
+    return pages
+
+
+def get_extraction(file_path, repository=None, sha256=None):
+    """Parse a PDF, reusing cached results for the same content"""
+    if repository is not None:
+        sha256 = sha256 or file_sha256(file_path)
+        cached = repository.get_extraction(sha256, EXTRACTOR_VERSION)
+        if cached is not None:
+            return cached
+
+    pages = extract_pages(file_path)
+    extraction = Extraction(sha256, EXTRACTOR_VERSION, len(pages), pages)
+
+    if repository is not None:
+        repository.save_extraction(extraction)
+    return extraction
+
+
+def process_pdf(file_path, repository=None, sha256=None):
+    """Extract information from PDF file with better error handling"""
+    try:
+        extraction = get_extraction(file_path, repository, sha256)
+    except ImportError:
+        return _failed_info("File processing failed")
+    except OSError:
+        # Return default values if the file cannot be read at all
+        return _failed_info("File processing failed")
+    except Exception:
+        # If PDF processing fails, return basic info
+        return _failed_info("Unable to extract")
+
+    return describe_extraction(extraction)
+
+
+def describe_extraction(extraction):
+    """Return the practice fields process_pdf derives from an extraction"""
+    return {
+        'num_pages': extraction.num_pages,
+        'content_text': extraction.text,
+        'objective': "To be extracted by LLM",
+        'introduction': "To be extracted by LLM",
+        'summary': "To be generated by LLM",
+        'development': "To be extracted by LLM",
+        'goals': "To be extracted by LLM"
+    }
@@ -0,0 +1,83 @@
+# practice_query.py
+"""Filters for consulting practices
+
+A PracticeFilter turns the filled-in fields into a WHERE clause. The SQL
+text only depends on which fields are set, not on their values, so every
+combination is compiled once and then served from the connection's
+statement cache.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Optional
+
+DATE_FORMAT = '%Y-%m-%d'
+
+
+@dataclass(frozen=True)
+class PracticeFilter:
+    practice_id: Optional[int] = None
+    teacher_name: Optional[str] = None
+    subject: Optional[str] = None
+    date_from: Optional[str] = None     # YYYY-MM-DD, inclusive
+    date_to: Optional[str] = None       # YYYY-MM-DD, inclusive
+    min_pages: Optional[int] = None
+    max_pages: Optional[int] = None
+
+    def __post_init__(self):
+        for name in ('date_from', 'date_to'):
+            value = getattr(self, name)
+            if value is not None:
+                try:
+                    parsed = datetime.strptime(value, DATE_FORMAT)
+                except ValueError:
+                    raise ValueError(f"Dates must look like 2025-04-07, got {value!r}") from None
+                # strptime accepts 2025-4-7, but upload_date is compared as text
+                object.__setattr__(self, name, parsed.strftime(DATE_FORMAT))
+        if (self.min_pages is not None and self.max_pages is not None
+                and self.min_pages > self.max_pages):
+            raise ValueError("Minimum pages is larger than maximum pages")
+
+    def where(self):
+        """Return (conditions, params) over practices p joined to teachers t"""
+        conditions, params = [], []
+        if self.practice_id is not None:
+            conditions.append("p.id = ?")
+            params.append(self.practice_id)
+        if self.teacher_name is not None:
+            conditions.append("t.name = ?")
+            params.append(self.teacher_name)
+        if self.subject is not None:
+            conditions.append("p.subject = ?")
+            params.append(self.subject)
+        if self.date_from is not None:
+            conditions.append("p.upload_date >= ?")
+            params.append(self.date_from)
+        if self.date_to is not None:
+            # upload_date carries a time, so compare against the next day
+            conditions.append("p.upload_date < date(?, '+1 day')")
+            params.append(self.date_to)
+        if self.min_pages is not None:
+            conditions.append("p.num_pages >= ?")
+            params.append(self.min_pages)
+        if self.max_pages is not None:
+            conditions.append("p.num_pages <= ?")
+            params.append(self.max_pages)
+        return conditions, params
+
+
+@dataclass(frozen=True)
+class PracticeRow:
+    """The columns a result list needs, without the large text fields"""
+    id: int
+    title: str
+    subject: str
+    teacher_name: str
+    upload_date: str
+    num_pages: int
+
+
+@dataclass(frozen=True)
+class PracticeFacets:
+    total: int = 0
+    teachers: Dict[str, int] = field(default_factory=dict)
+    subjects: Dict[str, int] = field(default_factory=dict)
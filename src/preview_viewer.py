@@ -0,0 +1,245 @@
+# preview_viewer.py
+import queue
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import customtkinter as ctk
+from PIL import ImageTk
+
+from src.pdf_processing import EXTRACTOR_VERSION
+from src.utils import stat_sha256
+
+
+class PagedPreview(ctk.CTkFrame):
+    """Page-by-page PDF preview that renders pages on demand
+
+    Pages are rendered (through the thumbnail cache) on a background thread,
+    the next `prefetch` pages are rendered ahead of time, and only the
+    `max_cached` most recently shown pages are kept as PhotoImages.
+
+    The page count comes from the repository's extraction cache when the
+    content was parsed before, so a known practice is shown from cached
+    thumbnails without decoding the PDF. Otherwise the document is opened
+    once per preview, on the render thread, and kept open for its pages.
+    """
+
+    POLL_MS = 50
+
+    def __init__(self, master, thumbnail_cache, repository=None, max_width=380, max_height=480,
+                 prefetch=3, max_cached=8, **kwargs):
+        super().__init__(master, **kwargs)
+        self.thumbnail_cache = thumbnail_cache
+        self.repository = repository
+        self.max_width = max_width
+        self.max_height = max_height
+        self.prefetch = prefetch
+        self.max_cached = max_cached
+
+        # A single render thread, which alone touches self.document
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preview")
+        self.document = None  # (generation, fitz.Document)
+        self.results = queue.Queue()
+        self.photos = OrderedDict()
+        self.pending = set()
+        self.generation = 0
+        self.in_flight = 0
+
+        self.pdf_path = None
+        self.sha256 = None
+        self.num_pages = 0
+        self.current_page = 0
+
+        self.grid_columnconfigure(1, weight=1)
+
+        self.image_label = ctk.CTkLabel(self, text="No file selected", font=ctk.CTkFont(size=14))
+        self.image_label.grid(row=0, column=0, columnspan=3, padx=10, pady=10)
+
+        self.prev_button = ctk.CTkButton(self, text="<", width=40, command=self.previous_page, state="disabled")
+        self.prev_button.grid(row=1, column=0, padx=10, pady=(0,10))
+
+        self.page_label = ctk.CTkLabel(self, text="", font=ctk.CTkFont(size=14))
+        self.page_label.grid(row=1, column=1, pady=(0,10))
+
+        self.next_button = ctk.CTkButton(self, text=">", width=40, command=self.next_page, state="disabled")
+        self.next_button.grid(row=1, column=2, padx=10, pady=(0,10))
+
+        for widget in (self, self.image_label):
+            widget.bind("<MouseWheel>", self._on_mouse_wheel)
+            widget.bind("<Button-4>", lambda event: self.previous_page())
+            widget.bind("<Button-5>", lambda event: self.next_page())
+
+    def load(self, pdf_path):
+        """Start previewing a PDF from its first page"""
+        self._reset()
+        self.pdf_path = pdf_path
+        self.image_label.configure(image="", text="Loading preview...")
+        generation = self.generation
+        self._submit(generation, "open", lambda: self._open(pdf_path, generation))
+
+    def show_message(self, text):
+        """Clear the preview and show a message instead"""
+        self._reset()
+        self.image_label.configure(image="", text=text)
+
+    def clear(self):
+        self.show_message("")
+
+    def next_page(self):
+        if self.current_page + 1 < self.num_pages:
+            self.show_page(self.current_page + 1)
+
+    def previous_page(self):
+        if self.current_page > 0:
+            self.show_page(self.current_page - 1)
+
+    def show_page(self, page_no):
+        """Display a page, rendering it if needed, and prefetch the next ones"""
+        self.current_page = page_no
+        self.page_label.configure(text=f"Page {page_no + 1} / {self.num_pages}")
+        self.prev_button.configure(state="normal" if page_no > 0 else "disabled")
+        self.next_button.configure(state="normal" if page_no + 1 < self.num_pages else "disabled")
+
+        photo = self.photos.get(page_no)
+        if photo is not None:
+            self.photos.move_to_end(page_no)
+            self.image_label.configure(image=photo, text="")
+        else:
+            self.image_label.configure(image="", text="Rendering...")
+            self._request_page(page_no)
+
+        for ahead in range(page_no + 1, min(page_no + 1 + self.prefetch, self.num_pages)):
+            if ahead not in self.photos:
+                self._request_page(ahead)
+
+    def destroy(self):
+        # Queued renders see the new generation and return at once
+        self.generation += 1
+        self.executor.submit(self._close_document)
+        self.executor.shutdown(wait=False)
+        super().destroy()
+
+    def _reset(self):
+        # Results still in flight for the previous document are ignored
+        self.generation += 1
+        self.executor.submit(self._close_document)
+        self.photos.clear()
+        self.pending.clear()
+        self.pdf_path = None
+        self.sha256 = None
+        self.num_pages = 0
+        self.current_page = 0
+        self.page_label.configure(text="")
+        self.prev_button.configure(state="disabled")
+        self.next_button.configure(state="disabled")
+
+    def _request_page(self, page_no):
+        if page_no in self.pending:
+            return
+        self.pending.add(page_no)
+        pdf_path, sha256, generation = self.pdf_path, self.sha256, self.generation
+
+        def render():
+            # Skip pages the reader has already scrolled away from
+            if generation != self.generation or not (
+                    self.current_page <= page_no <= self.current_page + self.prefetch):
+                return None
+            return self.thumbnail_cache.render(
+                pdf_path, sha256, page_no, self.max_width, self.max_height,
+                open_document=lambda: self._document(pdf_path, generation)
+            )
+
+        self._submit(generation, page_no, render)
+
+    def _open(self, pdf_path, generation):
+        # Render thread: return (sha256, page count) for a new preview
+        sha256 = stat_sha256(pdf_path)
+        num_pages = None
+        if self.repository is not None:
+            num_pages = self.repository.get_extraction_page_count(sha256, EXTRACTOR_VERSION)
+        if num_pages is None:
+            num_pages = self._document(pdf_path, generation).page_count
+        return sha256, num_pages
+
+    def _document(self, pdf_path, generation):
+        # Render thread: the open document of this preview, opened on first use
+        if self.document is not None and self.document[0] == generation:
+            return self.document[1]
+        self._close_document()
+        import fitz  # PyMuPDF
+        self.document = (generation, fitz.open(pdf_path))
+        return self.document[1]
+
+    def _close_document(self):
+        # Render thread: close the document unless it belongs to the current preview
+        if self.document is not None and self.document[0] != self.generation:
+            self.document[1].close()
+            self.document = None
+
+    def _submit(self, generation, key, work):
+        def run():
+            try:
+                self.results.put((generation, key, work(), None))
+            except Exception as e:
+                self.results.put((generation, key, None, e))
+
+        self.executor.submit(run)
+        self.in_flight += 1
+        if self.in_flight == 1:
+            self.after(self.POLL_MS, self._poll)
+
+    def _poll(self):
+        # PhotoImages must be created on the Tk thread, so workers only
+        # produce PIL images and the conversion happens here.
+        while True:
+            try:
+                generation, key, value, error = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.in_flight -= 1
+            if generation != self.generation:
+                continue
+            if key == "open":
+                self._on_opened(value, error)
+            else:
+                self._on_rendered(key, value, error)
+
+        if self.in_flight:
+            self.after(self.POLL_MS, self._poll)
+
+    def _on_opened(self, value, error):
+        if error is not None or not value[1]:
+            self.image_label.configure(image="", text="Preview not available")
+            print(f"Preview error: {error}")
+            return
+        self.sha256, self.num_pages = value
+        self.show_page(0)
+
+    def _on_rendered(self, page_no, img, error):
+        self.pending.discard(page_no)
+        if error is not None:
+            if page_no == self.current_page:
+                self.image_label.configure(image="", text="Preview not available")
+            print(f"Preview error: {error}")
+            return
+        if img is None:
+            if page_no == self.current_page:
+                self._request_page(page_no)
+            return
+
+        self.photos[page_no] = ImageTk.PhotoImage(img)
+        self.photos.move_to_end(page_no)
+        while len(self.photos) > self.max_cached:
+            oldest = next(iter(self.photos))
+            if oldest == self.current_page:
+                self.photos.move_to_end(oldest)
+                continue
+            del self.photos[oldest]
+
+        if page_no == self.current_page:
+            self.image_label.configure(image=self.photos[page_no], text="")
+
+    def _on_mouse_wheel(self, event):
+        if event.delta > 0:
+            self.previous_page()
+        else:
+            self.next_page()
@@ -0,0 +1,199 @@
+# reconcile.py
+"""Bring the practices table back in line with the files under folders/
+
+A pass compares the tree with the table:
+
+- a practice whose file is gone is matched to an untracked file with the
+  same content (or, for practices stored before the blob store, the same
+  file name) and follows it; otherwise it is restored from the blob store
+  when possible, and reported (or deleted with prune) when not;
+- a tracked file whose content changed is re-parsed;
+- untracked files are registered by the bulk importer.
+
+Files are only hashed when their size or mtime differs from the state
+recorded in import_progress, so repeated passes mostly cost a directory walk.
+"""
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from src.bulk_import import BulkImporter, ImportSummary, scan_tree
+from src.pdf_processing import process_pdf
+from src.utils import file_sha256, normalize_path
+
+DEFAULT_WATCH_INTERVAL = 5.0
+
+
+@dataclass
+class ReconcileReport:
+    moved: List[tuple] = field(default_factory=list)      # (practice id, old path, new path)
+    restored: List[tuple] = field(default_factory=list)   # (practice id, path)
+    changed: List[tuple] = field(default_factory=list)    # (practice id, path)
+    missing: List[tuple] = field(default_factory=list)    # (practice id, path)
+    pruned: int = 0
+    imported: Optional[ImportSummary] = None
+
+    @property
+    def clean(self):
+        return not (self.moved or self.restored or self.changed or self.missing
+                    or (self.imported and self.imported.imported))
+
+
+class Reconciler:
+    """Compare a folders/ tree with the practices table and repair drift"""
+
+    def __init__(self, repository, blob_store, root, jobs=None, prune=False, import_new=True):
+        self.repository = repository
+        self.blob_store = blob_store
+        self.root = root
+        self.jobs = jobs
+        self.prune = prune
+        self.import_new = import_new
+
+    def run(self):
+        """Run one reconciliation pass and return what it found"""
+        report = ReconcileReport()
+        files = {normalize_path(found.path): found for found in scan_tree(self.root)}
+        states = self.repository.get_file_states()
+        new_states = {}
+
+        def sha256_of(found):
+            state = states.get(found.path)
+            if state is not None and state[:2] == (found.size, found.mtime_ns):
+                return state[2]
+            sha256 = file_sha256(found.path)
+            new_states[found.path] = (found.path, found.size, found.mtime_ns, sha256, 'done', None)
+            return sha256
+
+        locations, blobs, contents, deletions = [], [], [], []
+        tracked, missing = set(), []
+        for practice in self.repository.get_practice_locations():
+            key = normalize_path(practice.file_path)
+            found = files.get(key)
+            if found is None:
+                missing.append(practice)
+                continue
+            tracked.add(key)
+
+            sha256 = sha256_of(found)
+            if practice.blob_sha256 is None:
+                # Uploaded before the blob store: start tracking its content
+                self.blob_store.adopt(found.path, sha256)
+                blobs.append((sha256, found.size, practice.id))
+            elif sha256 != practice.blob_sha256:
+                self.blob_store.adopt(found.path, sha256)
+                info = process_pdf(found.path, self.repository, sha256)
+                contents.append((sha256, found.size, info['num_pages'], info['content_text'], practice.id))
+                report.changed.append((practice.id, found.path))
+
+        if missing:
+            untracked = [found for key, found in files.items() if key not in tracked]
+            by_sha256, by_name = {}, {}
+            match_content = any(practice.blob_sha256 for practice in missing)
+            for found in untracked:
+                by_name.setdefault(os.path.basename(found.path), []).append(found)
+                if match_content:
+                    by_sha256.setdefault(sha256_of(found), []).append(found)
+
+            def candidate_order(found):
+                # Copies the importer recorded as duplicates go last, so a
+                # practice follows its own moved file rather than a copy
+                state = states.get(found.path)
+                return (state is not None and state[3] == 'duplicate', normalize_path(found.path))
+
+            teacher_ids = {}
+            for practice in missing:
+                if practice.blob_sha256:
+                    candidates = by_sha256.get(practice.blob_sha256)
+                else:
+                    name = os.path.basename(practice.file_path.replace('\\', '/'))
+                    candidates = by_name.get(name)
+                candidates = sorted(
+                    (found for found in candidates or [] if normalize_path(found.path) not in tracked),
+                    key=candidate_order
+                )
+
+                if candidates:
+                    found = candidates[0]
+                    tracked.add(normalize_path(found.path))
+                    if found.teacher not in teacher_ids:
+                        teacher_ids[found.teacher] = self.repository.get_teacher_id(found.teacher)
+                    teacher_id = teacher_ids[found.teacher]
+                    if teacher_id is None:
+                        # Moved into a folder that is not a known teacher
+                        teacher_id, subject = practice.teacher_id, practice.subject
+                    else:
+                        subject = found.subject
+                    locations.append((teacher_id, subject, found.path, practice.id))
+                    if found.path not in new_states and practice.blob_sha256:
+                        new_states[found.path] = (found.path, found.size, found.mtime_ns,
+                                                  practice.blob_sha256, 'done', None)
+                    report.moved.append((practice.id, practice.file_path, found.path))
+                elif practice.blob_sha256 and self.blob_store.has_blob(practice.blob_sha256):
+                    path = os.path.normpath(practice.file_path.replace('\\', '/'))
+                    self.blob_store.link(practice.blob_sha256, path)
+                    report.restored.append((practice.id, path))
+                elif self.prune:
+                    deletions.append(practice.id)
+                    report.pruned += 1
+                else:
+                    report.missing.append((practice.id, practice.file_path))
+
+        # Only files that belong to a practice are recorded; untracked ones
+        # are left for the importer, which records them itself.
+        tracked_states = [state for path, state in new_states.items() if normalize_path(path) in tracked]
+        if locations or blobs or contents or deletions or tracked_states:
+            self.repository.apply_reconciliation(locations, blobs, contents, deletions, tracked_states)
+
+        if self.import_new:
+            report.imported = BulkImporter(self.repository, self.blob_store, jobs=self.jobs).run(self.root)
+        return report
+
+    def watch(self, interval=DEFAULT_WATCH_INTERVAL, stop=None, on_report=None):
+        """Reconcile whenever the tree changes until stop is set
+
+        Uses watchdog (inotify and friends) when it is installed and checks
+        for changes at most once per interval; without it every interval
+        triggers a pass, which is cheap because unchanged files are not read.
+        """
+        stop = stop or threading.Event()
+        dirty = threading.Event()
+        dirty.set()
+
+        observer = self._start_observer(dirty)
+        try:
+            while not stop.is_set():
+                if observer is None or dirty.is_set():
+                    dirty.clear()
+                    report = self.run()
+                    if on_report:
+                        on_report(report)
+                stop.wait(interval)
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+
+    def _start_observer(self, dirty):
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return None
+
+        root = os.path.abspath(self.root)
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                # Ignore the blob store, the thumbnail cache and partial copies
+                for path in (event.src_path, getattr(event, 'dest_path', '')):
+                    relative = os.path.relpath(os.path.abspath(path), root) if path else ''
+                    if relative and not relative.startswith('.') and not relative.endswith('.part'):
+                        dirty.set()
+                        return
+
+        observer = Observer()
+        observer.schedule(Handler(), root, recursive=True)
+        observer.start()
+        return observer
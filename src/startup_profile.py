@@ -0,0 +1,53 @@
+# startup_profile.py
+"""Time the phases between launch and a usable home screen
+
+Enabled with `python main.py --profile-startup`. The phases up to the
+first idle moment of the Tk loop are printed as one table; frames that
+are built later, on their first visit, are printed as they happen.
+"""
+import sys
+import time
+from contextlib import contextmanager
+
+# Modules that should not be loaded before the home screen is up
+HEAVY_MODULES = ('fitz', 'fpdf', 'pandas', 'src.preview_viewer', 'src.virtual_table')
+
+
+class StartupProfiler:
+    def __init__(self, enabled=False, started=None):
+        self.enabled = enabled
+        self.started = time.perf_counter() if started is None else started
+        self.phases = []
+        self.reported = False
+
+    @contextmanager
+    def phase(self, name):
+        """Time the block as phase name"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter())
+
+    def record(self, name, start, end):
+        if not self.enabled:
+            return
+        self.phases.append((name, end - start))
+        if self.reported:
+            self._print(f"{name} took {(end - start) * 1000:.1f} ms")
+
+    def report(self):
+        """Print the startup phases and the total time since launch"""
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        total = time.perf_counter() - self.started
+        self._print("Startup profile")
+        for name, seconds in self.phases:
+            self._print(f"  {name:<22}{seconds * 1000:>9.1f} ms")
+        self._print(f"  {'home screen ready':<22}{total * 1000:>9.1f} ms")
+        loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+        self._print(f"  heavy modules loaded: {', '.join(loaded) or 'none'}")
+
+    def _print(self, line):
+        print(line, file=sys.stderr, flush=True)
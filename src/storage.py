@@ -0,0 +1,360 @@
+# storage.py
+"""Backends that hold the practice files
+
+Files are addressed by the paths stored in the database, which start with
+the storage root (folders/Ana/Physics/lab1.pdf, folders/.objects/ab/cdef...).
+LocalStorage keeps them in that directory tree. S3Storage keeps them in an
+S3-compatible bucket (AWS, MinIO, ...) under the same relative keys and
+fetches them on demand into a local read-through cache, so lab stations
+share one archive without each holding a copy of every file. In a bucket
+only the blobs are stored: a practice's own path is just a name, and its
+content is found through the practice's blob_sha256.
+
+The backend is chosen by open_storage() from a URL or $LAB_STORAGE:
+no URL means the local root, s3://bucket/prefix means a bucket, with
+$LAB_S3_ENDPOINT pointing at a MinIO server if it is not AWS. Credentials
+come from the usual AWS environment variables and config files.
+"""
+import hashlib
+import os
+import tempfile
+from abc import ABC, abstractmethod
+
+from src.utils import LruDirectory, copy_file_atomic, copy_to_temp, file_sha256, remove_quietly
+
+STORAGE_ENV = "LAB_STORAGE"
+ENDPOINT_ENV = "LAB_S3_ENDPOINT"
+CACHE_DIR_ENV = "LAB_CACHE_DIR"
+CACHE_SIZE_ENV = "LAB_CACHE_MB"
+
+DEFAULT_CACHE_BYTES = 2 * 1024 * 1024 * 1024  # 2 GB
+PART_SIZE = 8 * 1024 * 1024  # S3 parts must be at least 5 MB, except the last
+
+
+class Storage(ABC):
+    """Operations every backend provides; paths start with root"""
+
+    def __init__(self, root):
+        self.root = root
+
+    @abstractmethod
+    def local_path(self, path):
+        """Return a local file with the content of path, fetching it if needed"""
+
+    @abstractmethod
+    def exists(self, path):
+        """Return whether a file is stored at path"""
+
+    @abstractmethod
+    def size(self, path):
+        """Return the size of path in bytes; FileNotFoundError if it is missing"""
+
+    @abstractmethod
+    def read_range(self, path, start, length):
+        """Return up to length bytes of path starting at offset start"""
+
+    @abstractmethod
+    def make_dirs(self, path):
+        """Create a directory; a no-op where there are no directories"""
+
+    @abstractmethod
+    def put_content(self, source, path_for):
+        """Store a local file at path_for(sha256), returning (sha256, size, is_new)
+
+        Nothing is written if that path already exists.
+        """
+
+    @abstractmethod
+    def add_file(self, source, path):
+        """Store a local file at path; FileExistsError if path is taken"""
+
+    @abstractmethod
+    def link(self, source_path, path):
+        """Make path give the content of a stored file; FileExistsError if path is taken"""
+
+    @abstractmethod
+    def delete(self, path):
+        """Remove the file stored at path"""
+
+
+class LocalStorage(Storage):
+    """A directory tree; copies within it are hard links where possible"""
+
+    def __init__(self, root="folders"):
+        super().__init__(root)
+        self.temp_dir = os.path.join(root, ".objects", "tmp")
+
+    def local_path(self, path):
+        return path
+
+    def exists(self, path):
+        return os.path.exists(path)
+
+    def size(self, path):
+        return os.path.getsize(path)
+
+    def read_range(self, path, start, length):
+        with open(path, 'rb') as file:
+            file.seek(start)
+            return file.read(length)
+
+    def make_dirs(self, path):
+        os.makedirs(path, exist_ok=True)
+
+    def put_content(self, source, path_for):
+        # Hashed while copied, so the source is read only once
+        temp_path, sha256, size = copy_to_temp(source, self.temp_dir)
+        path = path_for(sha256)
+
+        if os.path.exists(path):
+            remove_quietly(temp_path)
+            return sha256, size, False
+
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(temp_path, path)
+        except BaseException:
+            remove_quietly(temp_path)
+            raise
+        return sha256, size, True
+
+    def add_file(self, source, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            os.link(source, path)
+        except FileExistsError:
+            raise
+        except OSError:
+            # Filesystems without hard links (or across devices) get a copy;
+            # the name is claimed first, so a taken path still raises
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            try:
+                copy_file_atomic(source, path)
+            except BaseException:
+                remove_quietly(path)
+                raise
+
+    def link(self, source_path, path):
+        self.add_file(source_path, path)
+
+    def delete(self, path):
+        os.remove(path)
+
+
+class ReadThroughCache:
+    """Local copies of remote files, least-recently-used evicted first
+
+    Stored files are never changed in place (uploads get fresh names and
+    blobs are addressed by content), so copies are not revalidated; a hit
+    refreshes the file's modification time.
+    """
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.lru = LruDirectory(cache_dir, max_bytes)
+
+    def path(self, key):
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], digest[2:] + os.path.splitext(key)[1])
+
+    def lookup(self, key):
+        """Return the cached copy of key, or None"""
+        path = self.path(key)
+        try:
+            os.utime(path)
+            return path
+        except OSError:
+            return None
+
+    def get(self, key, fetch):
+        """Return the cached copy of key, calling fetch(temp_path) on a miss"""
+        path = self.lookup(key)
+        if path is not None:
+            return path
+
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        os.close(fd)
+        try:
+            fetch(temp_path)
+            os.replace(temp_path, path)
+        except BaseException:
+            remove_quietly(temp_path)
+            raise
+        self.lru.added(path)
+        return path
+
+    def put(self, key, source):
+        """Cache a local file as the content of key"""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        copy_file_atomic(source, path)
+        self.lru.added(path)
+
+    def discard(self, key):
+        path = self.path(key)
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        remove_quietly(path)
+        self.lru.removed(size)
+
+
+class S3Storage(Storage):
+    """An S3-compatible bucket, read through a local cache
+
+    Uploads larger than part_size are streamed as multipart uploads, one
+    part in memory at a time, and also go into the cache, since the station
+    that uploads a file is the one that parses it next. Errors from the
+    bucket are raised as OSError, like those of the local backend.
+    """
+
+    def __init__(self, bucket, prefix="", root="folders", endpoint_url=None, cache=None,
+                 part_size=PART_SIZE, client=None):
+        super().__init__(root)
+        if client is None:
+            try:
+                import boto3
+            except ImportError:
+                raise ImportError("S3 storage needs boto3 (pip install boto3)") from None
+            client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.part_size = part_size
+        self.cache = cache or ReadThroughCache(os.path.join(root, ".cache"))
+
+    def key(self, path):
+        """Return the object key of a stored path"""
+        relative = os.path.relpath(os.path.normpath(path.replace('\\', '/')), self.root)
+        if relative == os.curdir or relative.split(os.sep)[0] == os.pardir:
+            raise ValueError(f"{path} is not under the storage root {self.root}")
+        return self.prefix + relative.replace(os.sep, '/')
+
+    def local_path(self, path):
+        key = self.key(path)
+        return self.cache.get(key, lambda temp_path: self._call(
+            self.client.download_file, self.bucket, key, temp_path, path=path
+        ))
+
+    def exists(self, path):
+        return self._head(self.key(path)) is not None
+
+    def size(self, path):
+        head = self._head(self.key(path))
+        if head is None:
+            raise FileNotFoundError(path)
+        return head["ContentLength"]
+
+    def read_range(self, path, start, length):
+        key = self.key(path)
+        cached = self.cache.lookup(key)
+        if cached is not None:
+            with open(cached, 'rb') as file:
+                file.seek(start)
+                return file.read(length)
+        if length <= 0:
+            return b""
+        response = self._call(self.client.get_object, Bucket=self.bucket, Key=key,
+                              Range=f"bytes={start}-{start + length - 1}", path=path)
+        return response["Body"].read()
+
+    def make_dirs(self, path):
+        pass
+
+    def put_content(self, source, path_for):
+        # Hashed first so a duplicate is never sent over the network
+        sha256 = file_sha256(source)
+        size = os.path.getsize(source)
+        path = path_for(sha256)
+        if self.exists(path):
+            return sha256, size, False
+        self._upload(source, self.key(path))
+        return sha256, size, True
+
+    def add_file(self, source, path):
+        if self.exists(path):
+            raise FileExistsError(path)
+        self._upload(source, self.key(path))
+
+    def link(self, source_path, path):
+        # Practice paths stay virtual; a copy would store every upload twice
+        pass
+
+    def delete(self, path):
+        key = self.key(path)
+        self._call(self.client.delete_object, Bucket=self.bucket, Key=key, path=path)
+        self.cache.discard(key)
+
+    def _upload(self, source, key):
+        if os.path.getsize(source) <= self.part_size:
+            with open(source, 'rb') as file:
+                self._call(self.client.put_object, Bucket=self.bucket, Key=key, Body=file, path=source)
+        else:
+            self._upload_parts(source, key)
+        self.cache.put(key, source)
+
+    def _upload_parts(self, source, key):
+        upload_id = self._call(self.client.create_multipart_upload,
+                               Bucket=self.bucket, Key=key, path=source)["UploadId"]
+        try:
+            parts = []
+            with open(source, 'rb') as file:
+                while True:
+                    chunk = file.read(self.part_size)
+                    if not chunk:
+                        break
+                    number = len(parts) + 1
+                    response = self._call(self.client.upload_part, Bucket=self.bucket, Key=key,
+                                          PartNumber=number, UploadId=upload_id, Body=chunk, path=source)
+                    parts.append({"ETag": response["ETag"], "PartNumber": number})
+            self._call(self.client.complete_multipart_upload, Bucket=self.bucket, Key=key,
+                       UploadId=upload_id, MultipartUpload={"Parts": parts}, path=source)
+        except BaseException:
+            # Otherwise the uploaded parts are kept (and billed) until aborted
+            try:
+                self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            except Exception:
+                pass
+            raise
+
+    def _head(self, key):
+        try:
+            return self._call(self.client.head_object, Bucket=self.bucket, Key=key, path=key)
+        except FileNotFoundError:
+            return None
+
+    def _call(self, method, *args, path=None, **kwargs):
+        from botocore.exceptions import BotoCoreError, ClientError
+
+        try:
+            return method(*args, **kwargs)
+        except ClientError as e:
+            error = e.response.get("Error", {})
+            if error.get("Code") in ("404", "NoSuchKey", "NotFound"):
+                raise FileNotFoundError(f"{path}: not found in bucket {self.bucket}") from e
+            raise OSError(f"{path}: {error.get('Message') or e}") from e
+        except BotoCoreError as e:
+            raise OSError(f"{path}: {e}") from e
+
+
+def open_storage(url=None, root="folders"):
+    """Return the storage backend for url, $LAB_STORAGE, or the local root"""
+    url = url or os.environ.get(STORAGE_ENV)
+    if not url:
+        return LocalStorage(root)
+    if not url.startswith("s3://"):
+        raise ValueError(f"Unsupported storage URL {url!r}, expected s3://bucket/prefix")
+
+    bucket, _, prefix = url[len("s3://"):].partition("/")
+    if not bucket:
+        raise ValueError(f"No bucket in storage URL {url!r}")
+    if prefix and not prefix.endswith("/"):
+        prefix += "/"
+    cache = ReadThroughCache(
+        os.environ.get(CACHE_DIR_ENV) or os.path.join(root, ".cache"),
+        int(os.environ.get(CACHE_SIZE_ENV, DEFAULT_CACHE_BYTES // (1024 * 1024))) * 1024 * 1024
+    )
+    return S3Storage(bucket, prefix, root=root, endpoint_url=os.environ.get(ENDPOINT_ENV), cache=cache)
@@ -0,0 +1,81 @@
+# thumbnail_cache.py
+import os
+import threading
+
+from src.utils import LruDirectory, remove_quietly
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024  # 64 MB
+
+
+def render_page(pdf_path, page_no, max_width, max_height, document=None):
+    """Render one page straight at the size that fits max_width x max_height
+
+    The zoom is applied by MuPDF while rasterizing, so no full-size pixmap is
+    ever created and no resampling is needed afterwards. An already open
+    document is used instead of opening pdf_path.
+    """
+    import fitz  # PyMuPDF
+    from PIL import Image
+
+    if document is None:
+        with fitz.open(pdf_path) as doc:
+            return render_page(pdf_path, page_no, max_width, max_height, doc)
+
+    page = document[page_no]
+    zoom = min(max_width / page.rect.width, max_height / page.rect.height)
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    return Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+
+
+class ThumbnailCache:
+    """Disk cache of rendered pages keyed by content hash, page and size
+
+    Files are evicted least-recently-used first once the cache grows past
+    max_bytes; a hit refreshes the file's modification time.
+    """
+
+    def __init__(self, cache_dir=os.path.join("folders", ".thumbnails"), max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.lru = LruDirectory(cache_dir, max_bytes)
+
+    def path(self, sha256, page_no, max_width, max_height):
+        return os.path.join(self.cache_dir, sha256[:2], f"{sha256}_p{page_no}_{max_width}x{max_height}.png")
+
+    def get(self, sha256, page_no, max_width, max_height):
+        """Return the cached PIL image, or None"""
+        from PIL import Image
+
+        path = self.path(sha256, page_no, max_width, max_height)
+        try:
+            os.utime(path)
+            with Image.open(path) as img:
+                img.load()
+                return img
+        except OSError:
+            return None
+
+    def put(self, sha256, page_no, max_width, max_height, img):
+        """Store a rendered image and trim the cache to its size cap"""
+        path = self.path(sha256, page_no, max_width, max_height)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{threading.get_ident()}.part"
+        try:
+            img.save(temp_path, format="PNG")
+            os.replace(temp_path, path)
+        except BaseException:
+            remove_quietly(temp_path)
+            raise
+        self.lru.added(path)
+
+    def render(self, pdf_path, sha256, page_no, max_width, max_height, open_document=None):
+        """Return a page thumbnail, rendering and caching it on a miss
+
+        open_document, if given, returns an open document to render from, so
+        callers showing many pages can keep one open.
+        """
+        img = self.get(sha256, page_no, max_width, max_height)
+        if img is None:
+            document = open_document() if open_document is not None else None
+            img = render_page(pdf_path, page_no, max_width, max_height, document)
+            self.put(sha256, page_no, max_width, max_height, img)
+        return img
@@ -0,0 +1,174 @@
+# tk_async.py
+"""Run slow work off the Tk thread and hand the results back to it
+
+Tk may only be touched from the thread running mainloop(), so database
+queries and file I/O run in a thread pool (or, for coroutines, on an
+asyncio loop in a background thread) and their results are queued. The
+Tk loop polls the queue with after() and calls on_done or on_error there.
+
+Tasks submitted under a key supersede each other: starting a new search
+cancels the previous one, and a result that arrives for a superseded
+task is dropped, so a slow query can never overwrite a newer one.
+"""
+import asyncio
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Task:
+    """Handle for work submitted to a TkScheduler"""
+
+    def __init__(self, key, future, on_done, on_error, loading):
+        self.key = key
+        self.future = future
+        self.on_done = on_done
+        self.on_error = on_error
+        self.loading = loading
+        self.cancelled = False
+        self.finished = False
+
+    def cancel(self):
+        """Drop the result; the work itself stops if it has not started yet
+
+        Coroutines are cancelled at their next await. A function already
+        running in the pool runs to completion but its result is ignored.
+        """
+        if self.cancelled or self.finished:
+            return
+        self.cancelled = True
+        self.future.cancel()
+        self._set_loading(False)
+
+    def _set_loading(self, busy):
+        if self.loading is not None:
+            self.loading(busy)
+
+
+class TkScheduler:
+    """Run functions and coroutines in the background for a Tk widget"""
+
+    POLL_MS = 30
+
+    def __init__(self, widget, max_workers=4):
+        self.widget = widget
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tk-task")
+        self.results = queue.Queue()
+        self.tasks = {}
+        self.loop = None
+        self.loop_lock = threading.Lock()
+        self.closed = False
+        self.widget.after(self.POLL_MS, self._poll)
+
+    def submit(self, func, *args, key=None, on_done=None, on_error=None, loading=None):
+        """Run func(*args) in the thread pool and return its Task
+
+        on_done(result) or on_error(exception) is called on the Tk thread.
+        loading(busy) is called with True now and with False once the task
+        finishes or is cancelled.
+        """
+        return self._track(self.executor.submit(func, *args), key, on_done, on_error, loading)
+
+    def submit_coroutine(self, coro, key=None, on_done=None, on_error=None, loading=None):
+        """Run a coroutine on the background event loop and return its Task"""
+        future = asyncio.run_coroutine_threadsafe(coro, self._event_loop())
+        return self._track(future, key, on_done, on_error, loading)
+
+    def post(self, callback, *args):
+        """Call callback(*args) on the Tk thread; safe from any thread"""
+        self.results.put((callback, args))
+
+    def cancel(self, key):
+        """Cancel the running task submitted under key, if any"""
+        task = self.tasks.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+    def shutdown(self):
+        """Cancel everything and stop the workers without waiting for them"""
+        self.closed = True
+        for task in list(self.tasks.values()):
+            task.cancel()
+        self.tasks.clear()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def _track(self, future, key, on_done, on_error, loading):
+        task = Task(key, future, on_done, on_error, loading)
+        if key is not None:
+            self.cancel(key)
+            self.tasks[key] = task
+        task._set_loading(True)
+        # Runs in the worker thread, or right here if the future is done already
+        future.add_done_callback(lambda _: self.results.put((task, None)))
+        return task
+
+    def _event_loop(self):
+        with self.loop_lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                threading.Thread(target=self.loop.run_forever, name="tk-asyncio", daemon=True).start()
+            return self.loop
+
+    def _poll(self):
+        if self.closed:
+            return
+        try:
+            while True:
+                item, args = self.results.get_nowait()
+                try:
+                    if isinstance(item, Task):
+                        self._finish(item)
+                    else:
+                        item(*args)
+                except Exception as e:
+                    print(f"Error in background task callback: {e}")
+        except queue.Empty:
+            pass
+
+        self.widget.after(self.POLL_MS, self._poll)
+
+    def _finish(self, task):
+        if task.cancelled:
+            return
+        task.finished = True
+        if task.key is not None and self.tasks.get(task.key) is task:
+            del self.tasks[task.key]
+        task._set_loading(False)
+        if task.future.cancelled():
+            # A coroutine that cancelled itself
+            return
+
+        error = task.future.exception()
+        if error is None:
+            if task.on_done is not None:
+                task.on_done(task.future.result())
+        elif task.on_error is not None:
+            task.on_error(error)
+        else:
+            print(f"Background task failed: {error}")
+
+
+def show_busy(widget, text=None, disable=False):
+    """Return a loading callback that relabels and/or disables widget
+
+    The widget's text and state are restored when the task finishes.
+    """
+    saved = {}
+
+    def loading(busy):
+        if busy:
+            if text is not None:
+                saved['text'] = widget.cget("text")
+                widget.configure(text=text)
+            if disable:
+                saved['state'] = widget.cget("state")
+                widget.configure(state="disabled")
+        else:
+            if 'text' in saved:
+                widget.configure(text=saved.pop('text'))
+            if 'state' in saved:
+                widget.configure(state=saved.pop('state'))
+
+    return loading
@@ -0,0 +1,160 @@
+# utils.py
+import functools
+import hashlib
+import os
+import tempfile
+import threading
+
+COPY_BUFFER_SIZE = 1024 * 1024  # 1 MB
+
+
+def copy_to_temp(source, directory, prefix=".upload.", buffer_size=COPY_BUFFER_SIZE):
+    """Stream source into a new temporary file in directory
+
+    Returns (temp_path, sha256, size). The data goes through one reusable
+    buffer, so memory stays flat for any file size, and the file is flushed
+    to disk before returning. On failure the temporary file is removed.
+    (os.sendfile/copy_file_range would skip user space, but the bytes have to
+    pass through Python anyway to be hashed.)
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    digest = hashlib.sha256()
+    size = 0
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=prefix, suffix=".part")
+    try:
+        with open(source, 'rb') as src_file, os.fdopen(fd, 'wb') as dst_file:
+            while True:
+                read = src_file.readinto(buffer)
+                if not read:
+                    break
+                chunk = view[:read]
+                digest.update(chunk)
+                dst_file.write(chunk)
+                size += read
+            dst_file.flush()
+            os.fsync(dst_file.fileno())
+    except BaseException:
+        remove_quietly(temp_path)
+        raise
+
+    return temp_path, digest.hexdigest(), size
+
+
+def copy_file_atomic(source, destination, buffer_size=COPY_BUFFER_SIZE):
+    """Stream source to destination, returning its SHA-256 and size
+
+    The copy is written to a temporary file next to the destination and
+    renamed into place only once complete, so a crash never leaves a partial
+    file under the destination name.
+    """
+    directory = os.path.dirname(destination) or "."
+    temp_path, sha256, size = copy_to_temp(
+        source,
+        directory,
+        prefix=f".{os.path.basename(destination)}.",
+        buffer_size=buffer_size
+    )
+    try:
+        os.replace(temp_path, destination)
+    except BaseException:
+        remove_quietly(temp_path)
+        raise
+    return sha256, size
+
+
+def remove_quietly(path):
+    """Delete a file, ignoring errors"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class LruDirectory:
+    """Keeps a cache directory under max_bytes, least-recently-used first
+
+    Recency is the file's modification time, so caches refresh it on a hit.
+    Files ending in .part are writes in progress and are left alone. The
+    total is counted once, on the first addition, and then kept up to date.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes = None
+
+    def added(self, path):
+        """Count a file written to the directory and evict if over the cap"""
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += os.path.getsize(path)
+        self.evict()
+
+    def removed(self, size):
+        """Uncount a file of size bytes deleted from the directory"""
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes -= size
+
+    def evict(self):
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._entries())
+            if self._total_bytes <= self.max_bytes:
+                return
+
+            for _, size, path in sorted(self._entries()):
+                if self._total_bytes <= self.max_bytes:
+                    break
+                remove_quietly(path)
+                self._total_bytes -= size
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".part"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield stat.st_mtime, stat.st_size, path
+
+
+def file_sha256(path, buffer_size=COPY_BUFFER_SIZE):
+    """Return the SHA-256 of a file, reading it in chunks"""
+    digest = hashlib.sha256()
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    with open(path, 'rb') as file:
+        while True:
+            read = file.readinto(buffer)
+            if not read:
+                break
+            digest.update(view[:read])
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=1024)
+def _sha256_for_stat(path, size, mtime_ns):
+    return file_sha256(path)
+
+
+def stat_sha256(path):
+    """Return a file's SHA-256, remembered while its size and mtime are unchanged"""
+    stat = os.stat(path)
+    return _sha256_for_stat(os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+
+def normalize_path(path):
+    """Return a comparable form of a stored file path
+
+    Practices uploaded on Windows stations are stored with backslashes.
+    """
+    return os.path.normcase(os.path.normpath(path.replace('\\', '/')))
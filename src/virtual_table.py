@@ -0,0 +1,253 @@
+# virtual_table.py
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+import customtkinter as ctk
+
+
+@dataclass(frozen=True)
+class Column:
+    key: str
+    title: str
+    width: int
+    anchor: str = "w"
+    sortable: bool = True
+    format: Optional[Callable] = None
+
+    def text(self, row):
+        value = getattr(row, self.key)
+        return self.format(value) if self.format else str(value)
+
+
+class VirtualTable(ctk.CTkFrame):
+    """Table that only creates widgets for the rows on screen
+
+    A fixed set of row frames is reused while scrolling. Rows are pulled from
+    fetch_page(sort, descending, after=key, before=key, limit=n) with keyset
+    pagination, and only a bounded window of them is kept in memory. Pages
+    are fetched through a TkScheduler, off the Tk thread; one fetch runs at
+    a time and a reload supersedes it.
+    """
+
+    def __init__(self, master, columns, fetch_page, scheduler, visible_rows=10, page_size=50,
+                 label_style=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.columns = columns
+        self.fetch_page = fetch_page
+        self.scheduler = scheduler
+        self.task_key = f"virtual-table-{id(self)}"
+        self.fetching = False
+        self.visible_rows = visible_rows
+        self.page_size = page_size
+        self.max_buffer = page_size * 4
+        self.label_style = label_style or {}
+
+        self.sort = columns[0].key
+        self.descending = False
+
+        self.rows = []          # Loaded window of rows
+        self.base_index = 0     # Absolute position of rows[0]
+        self.offset = 0         # Index in rows of the first visible row
+        self.at_start = True
+        self.at_end = False
+
+        self.grid_columnconfigure(0, weight=1)
+        self._build_header()
+        self._build_rows()
+        self._build_footer()
+
+    def _build_header(self):
+        header = ctk.CTkFrame(self, fg_color="gray25")
+        header.grid(row=0, column=0, sticky="ew", padx=20, pady=10)
+        self.header_buttons = {}
+        for i, column in enumerate(self.columns):
+            header.grid_columnconfigure(i, weight=1, minsize=column.width)
+            button = ctk.CTkButton(
+                header,
+                text=column.title,
+                font=ctk.CTkFont(size=16, weight="bold"),
+                text_color="white",
+                fg_color="transparent",
+                hover_color="gray30",
+                command=(lambda key=column.key: self.sort_by(key)) if column.sortable else None,
+                state="normal" if column.sortable else "disabled",
+                text_color_disabled="white"
+            )
+            button.grid(row=0, column=i, padx=5, pady=5, sticky="ew")
+            self.header_buttons[column.key] = button
+
+    def _build_rows(self):
+        body = ctk.CTkFrame(self, fg_color="transparent")
+        body.grid(row=1, column=0, sticky="nsew", padx=20)
+        body.grid_columnconfigure(0, weight=1)
+
+        self.row_frames = []
+        self.row_labels = []
+        for r in range(self.visible_rows):
+            row_frame = ctk.CTkFrame(body, height=50)
+            row_frame.grid(row=r, column=0, sticky="ew", pady=1)
+            labels = []
+            for i, column in enumerate(self.columns):
+                row_frame.grid_columnconfigure(i, weight=1, minsize=column.width)
+                label = ctk.CTkLabel(
+                    row_frame,
+                    text="",
+                    width=column.width,
+                    anchor=column.anchor,
+                    **self.label_style
+                )
+                label.grid(row=0, column=i, padx=5, pady=10, sticky="ew")
+                labels.append(label)
+                self._bind_scroll(label)
+            self._bind_scroll(row_frame)
+            self.row_frames.append(row_frame)
+            self.row_labels.append(labels)
+        self._bind_scroll(body)
+
+    def _build_footer(self):
+        footer = ctk.CTkFrame(self, fg_color="transparent")
+        footer.grid(row=2, column=0, sticky="ew", padx=20, pady=(5,20))
+        footer.grid_columnconfigure(1, weight=1)
+
+        self.up_button = ctk.CTkButton(footer, text="▲", width=40, command=lambda: self.scroll(-self.visible_rows))
+        self.up_button.grid(row=0, column=0)
+        self.position_label = ctk.CTkLabel(footer, text="", **self.label_style)
+        self.position_label.grid(row=0, column=1)
+        self.down_button = ctk.CTkButton(footer, text="▼", width=40, command=lambda: self.scroll(self.visible_rows))
+        self.down_button.grid(row=0, column=2)
+
+    def _bind_scroll(self, widget):
+        widget.bind("<MouseWheel>", lambda event: self.scroll(-1 if event.delta > 0 else 1))
+        widget.bind("<Button-4>", lambda event: self.scroll(-1))
+        widget.bind("<Button-5>", lambda event: self.scroll(1))
+
+    def _key(self, row):
+        return (getattr(row, self.sort), row.id)
+
+    def refresh(self):
+        """Reload from the first row with the current sort order"""
+        self._fetch(self._replace)
+
+    def _replace(self, rows):
+        self.rows = rows
+        self.base_index = 0
+        self.offset = 0
+        self.at_start = True
+        self.at_end = len(rows) < self.page_size
+
+    def sort_by(self, key):
+        """Sort by a column, toggling the direction on repeated clicks"""
+        if key == self.sort:
+            self.descending = not self.descending
+        else:
+            self.sort, self.descending = key, False
+        for column in self.columns:
+            arrow = (" ▼" if self.descending else " ▲") if column.key == self.sort else ""
+            self.header_buttons[column.key].configure(text=column.title + arrow)
+        self.refresh()
+
+    def scroll(self, rows):
+        """Move the visible window by a number of rows
+
+        Past the loaded rows the next page is fetched, and the rest of the
+        move is made once it arrives.
+        """
+        self.offset += rows
+
+        fetch = None
+        if self.rows and not self.fetching:
+            if self.offset + self.visible_rows > len(self.rows) and not self.at_end:
+                fetch = (self._append, {"after": self._key(self.rows[-1])})
+            elif self.offset < 0 and not self.at_start:
+                fetch = (self._prepend, {"before": self._key(self.rows[0])})
+
+        wanted = self.offset
+        self.offset = max(0, min(self.offset, len(self.rows) - self.visible_rows))
+        self._render()
+        if fetch is not None:
+            apply, keys = fetch
+            remaining = wanted - self.offset
+
+            def add_page(page):
+                apply(page)
+                self.scroll(remaining)
+
+            self._fetch(add_page, **keys)
+
+    def _append(self, more):
+        self.at_end = len(more) < self.page_size
+        self.rows.extend(more)
+        # Drop rows far above the window
+        excess = len(self.rows) - self.max_buffer
+        if excess > 0 and excess <= self.offset:
+            del self.rows[:excess]
+            self.base_index += excess
+            self.offset -= excess
+            self.at_start = False
+
+    def _prepend(self, earlier):
+        self.at_start = len(earlier) < self.page_size
+        self.rows[:0] = earlier
+        self.base_index -= len(earlier)
+        self.offset += len(earlier)
+        # Drop rows far below the window
+        excess = len(self.rows) - self.max_buffer
+        if excess > 0 and len(self.rows) - excess >= self.offset + self.visible_rows:
+            del self.rows[-excess:]
+            self.at_end = False
+
+    def _fetch(self, apply, **keys):
+        sort, descending, limit = self.sort, self.descending, self.page_size
+
+        def done(page):
+            self.fetching = False
+            apply(page)
+            self._render()
+
+        def failed(error):
+            self.fetching = False
+            print(f"Error loading rows: {error}")
+
+        self.fetching = True
+        self.scheduler.submit(
+            lambda: self.fetch_page(sort, descending, limit=limit, **keys),
+            key=self.task_key,
+            on_done=done,
+            on_error=failed
+        )
+
+    def _render(self):
+        for r, (row_frame, labels) in enumerate(zip(self.row_frames, self.row_labels)):
+            index = self.offset + r
+            if index >= len(self.rows):
+                row_frame.grid_remove()
+                continue
+            row = self.rows[index]
+            position = self.base_index + index
+            row_frame.configure(fg_color="gray20" if position % 2 == 0 else "gray25")
+            for label, column in zip(labels, self.columns):
+                label.configure(text=column.text(row))
+            row_frame.grid()
+
+        if self.rows:
+            first = self.base_index + self.offset + 1
+            last = first + min(self.visible_rows, len(self.rows) - self.offset) - 1
+            self.position_label.configure(text=f"Rows {first}–{last}")
+        else:
+            self.position_label.configure(text="No rows")
+
+        at_top = self.offset == 0 and self.at_start
+        at_bottom = self.offset + self.visible_rows >= len(self.rows) and self.at_end
+        self.up_button.configure(state="disabled" if at_top else "normal")
+        self.down_button.configure(state="disabled" if at_bottom else "normal")
+
+    def update_rows(self, rows):
+        """Replace loaded rows that share an id with the given ones"""
+        updated = {row.id: row for row in rows}
+        changed = False
+        for index, row in enumerate(self.rows):
+            if row.id in updated:
+                self.rows[index] = updated[row.id]
+                changed = True
+        if changed:
+            self._render()
@@ -0,0 +1,28 @@
+# conftest.py
+import pytest
+
+from src.lab_repository import LabRepository
+
+
+@pytest.fixture
+def repository(tmp_path):
+    repository = LabRepository(str(tmp_path / "lab.db"))
+    repository.setup_schema()
+    yield repository
+    repository.close()
+
+
+@pytest.fixture
+def make_pdf(tmp_path):
+    """Return a function that writes a PDF with one page per text"""
+    fitz = pytest.importorskip("fitz")
+
+    def make(name, *pages):
+        path = tmp_path / name
+        with fitz.open() as doc:
+            for text in pages or ("page",):
+                doc.new_page().insert_text((72, 72), text)
+            doc.save(str(path))
+        return str(path)
+
+    return make
@@ -0,0 +1,80 @@
+# test_api.py
+import os
+
+import pytest
+
+pytest.importorskip("starlette")
+pytest.importorskip("httpx")
+from starlette.testclient import TestClient  # noqa: E402
+
+from src.api import create_app  # noqa: E402
+from src.blob_store import BlobStore  # noqa: E402
+
+CONTENT = b"%PDF-1.4\n" + bytes(range(256)) * 8
+
+
+@pytest.fixture
+def practice(repository, tmp_path):
+    """A stored practice titled with markup; returns (id, sha256)"""
+    folders = str(tmp_path / "folders")
+    source = tmp_path / "upload.pdf"
+    source.write_bytes(CONTENT)
+    blob_store = BlobStore(folders)
+    sha256, size, _ = blob_store.put_file(str(source))
+    repository.add_blob(sha256, size)
+    destination = blob_store.link(sha256, os.path.join(folders, "Ana", "Physics", "lab1.pdf"))
+
+    teacher_id = repository.add_teacher("Ana", ["Physics"])
+    practice_id = repository.add_practice(
+        teacher_id, "Physics", "Pendulum <script>alert(1)</script>", "", "", "", "", "",
+        1, destination, "Measuring the period of a pendulum", sha256
+    )
+    return practice_id, sha256
+
+
+@pytest.fixture
+def client(repository, practice, tmp_path):
+    with TestClient(create_app(repository.db_path, folders=str(tmp_path / "folders"))) as client:
+        yield client
+
+
+def test_search_snippets_escape_stored_text(client):
+    response = client.get("/search", params={"q": "pendulum"})
+    assert response.status_code == 200
+    snippets = [item["snippet"] for item in response.json()["items"]]
+    assert snippets
+    for snippet in snippets:
+        assert "<script>" not in snippet
+        assert "<mark>" in snippet
+    assert any("&lt;script&gt;" in snippet for snippet in snippets)
+
+
+def test_range_request(client, practice):
+    practice_id, _ = practice
+    response = client.get(f"/practices/{practice_id}/file", headers={"Range": "bytes=9-24"})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 9-24/{len(CONTENT)}"
+    assert response.content == CONTENT[9:25]
+
+
+def test_range_past_end_of_file(client, practice):
+    practice_id, _ = practice
+    response = client.get(f"/practices/{practice_id}/file",
+                          headers={"Range": f"bytes={len(CONTENT)}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+
+def test_if_none_match(client, practice):
+    practice_id, sha256 = practice
+    response = client.get(f"/practices/{practice_id}/file")
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["etag"] == f'"{sha256}"'
+
+    response = client.get(f"/practices/{practice_id}/file", headers={"If-None-Match": f'"{sha256}"'})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    response = client.get(f"/practices/{practice_id}/file", headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
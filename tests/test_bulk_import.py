@@ -0,0 +1,53 @@
+# test_bulk_import.py
+import os
+
+import pytest
+
+from src.blob_store import BlobStore
+from src.bulk_import import BulkImporter
+
+
+@pytest.fixture
+def folders(tmp_path):
+    for subject in ("Ana/Physics", "Luis/Chemistry"):
+        os.makedirs(tmp_path / "folders" / subject)
+    return str(tmp_path / "folders")
+
+
+@pytest.fixture
+def blob_store(folders):
+    return BlobStore(folders)
+
+
+@pytest.fixture
+def tree(folders, make_pdf):
+    """Three distinct practices under folders/"""
+    return [
+        make_pdf(os.path.join("folders", "Ana", "Physics", f"lab{number}.pdf"), f"Practice {number}")
+        for number in (1, 2, 3)
+    ]
+
+
+def import_tree(repository, blob_store, folders, **kwargs):
+    return BulkImporter(repository, blob_store, jobs=1, **kwargs).run(folders)
+
+
+def practice_files(repository):
+    return sorted(os.path.normpath(path) for path in repository.get_practice_files())
+
+
+def test_interrupted_import_resumes(repository, blob_store, folders, tree):
+    def interrupt(summary, total):
+        if summary.imported:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        import_tree(repository, blob_store, folders, batch_size=1, on_progress=interrupt)
+    assert len(repository.get_practice_files()) == 1
+
+    summary = import_tree(repository, blob_store, folders)
+    assert (summary.found, summary.skipped, summary.imported) == (3, 1, 2)
+    assert practice_files(repository) == sorted(tree)
+
+    summary = import_tree(repository, blob_store, folders)
+    assert (summary.found, summary.skipped, summary.imported) == (3, 3, 0)
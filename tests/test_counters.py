@@ -0,0 +1,64 @@
+# test_counters.py
+import sqlite3
+
+import pytest
+
+from src import maintenance
+from src.lab_repository import CounterDrift
+
+
+@pytest.fixture
+def teachers(repository):
+    return {name: repository.add_teacher(name, ["Physics"]) for name in ("Ana", "Luis")}
+
+
+def add_practice(repository, teacher_id, title):
+    return repository.add_practice(
+        teacher_id, "Physics", title, "", "", "", "", "", 1, f"folders/{teacher_id}/{title}.pdf"
+    )
+
+
+def practice_counts(repository):
+    return {summary.name: summary.practice_count for summary in repository.get_teacher_page()}
+
+
+def test_counters_follow_practice_changes(repository, teachers):
+    assert (repository.count_teachers(), repository.count_practices()) == (2, 0)
+
+    first = add_practice(repository, teachers["Ana"], "lab1")
+    second = add_practice(repository, teachers["Ana"], "lab2")
+    add_practice(repository, teachers["Luis"], "lab3")
+    assert repository.count_practices() == 3
+    assert practice_counts(repository) == {"Ana": 2, "Luis": 1}
+
+    # Moving a practice to another teacher only shifts the per-teacher counts
+    repository.apply_reconciliation(locations=[(teachers["Luis"], "Physics", "folders/moved.pdf", first)])
+    assert repository.count_practices() == 3
+    assert practice_counts(repository) == {"Ana": 1, "Luis": 2}
+
+    repository.apply_reconciliation(deletions=[second])
+    assert repository.count_practices() == 2
+    assert practice_counts(repository) == {"Ana": 0, "Luis": 2}
+    assert repository.count_report_practices(teacher_name="Luis") == 2
+    assert repository.check_counters() == []
+
+
+def test_drift_is_detected_and_rebuilt(repository, teachers, capsys):
+    add_practice(repository, teachers["Ana"], "lab1")
+    add_practice(repository, teachers["Luis"], "lab2")
+    with sqlite3.connect(repository.db_path) as conn:
+        conn.execute("UPDATE stats SET value = 7 WHERE name = 'practices'")
+        conn.execute("UPDATE teachers SET practice_count = 5 WHERE name = 'Ana'")
+
+    assert repository.check_counters() == [
+        CounterDrift("practices", 7, 2),
+        CounterDrift("practices of Ana", 5, 1),
+    ]
+    assert not maintenance.check_counters(repository)
+    assert repository.count_practices() == 7
+
+    assert maintenance.check_counters(repository, rebuild=True)
+    assert "Rebuilt counters (2 mismatched)" in capsys.readouterr().out
+    assert repository.check_counters() == []
+    assert repository.count_practices() == 2
+    assert practice_counts(repository) == {"Ana": 1, "Luis": 1}
@@ -0,0 +1,58 @@
+# test_ingestion.py
+import os
+import sqlite3
+
+import pytest
+
+from src.blob_store import BlobStore
+from src.ingestion import DONE, FAILED, IngestionPool
+
+
+@pytest.fixture
+def folders(tmp_path):
+    return str(tmp_path / "folders")
+
+
+@pytest.fixture
+def pool(repository, folders):
+    pool = IngestionPool(repository, BlobStore(folders))
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def teacher_id(repository):
+    return repository.add_teacher("Ana", ["Physics"])
+
+
+def test_jobs_with_one_destination_get_distinct_files(repository, pool, folders, teacher_id, make_pdf):
+    destination = os.path.join(folders, "Ana", "Physics", "lab_Physics_teacher1_20250407_120000.pdf")
+    jobs = [
+        pool.submit(teacher_id, "Ana", "Physics", "lab", "", make_pdf(f"lab{i}.pdf", f"content {i}"), destination)
+        for i in range(2)
+    ]
+    pool.shutdown(wait=True)
+
+    assert [job.status for job in jobs] == [DONE, DONE]
+    paths = sorted(job.destination for job in jobs)
+    assert paths == [destination, destination[:-len(".pdf")] + "_2.pdf"]
+    assert all(os.path.exists(path) for path in paths)
+    assert sorted(repository.get_practice_files()) == paths
+
+
+def test_unparseable_file_fails_without_leftovers(repository, pool, folders, teacher_id, tmp_path):
+    source = tmp_path / "bad.pdf"
+    source.write_bytes(b"not a pdf")
+    destination = os.path.join(folders, "Ana", "Physics", "bad.pdf")
+
+    job = pool.submit(teacher_id, "Ana", "Physics", "bad", "", str(source), destination)
+    pool.shutdown(wait=True)
+
+    assert job.status == FAILED
+    assert job.error.startswith("Failed to parse PDF")
+    assert job.practice_id is None
+    assert repository.count_practices() == 0
+    assert not os.path.exists(destination)
+    assert not os.path.exists(pool.blob_store.blob_path(job.sha256))
+    with sqlite3.connect(repository.db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM blobs").fetchone()[0] == 0
@@ -0,0 +1,86 @@
+# test_migrations.py
+import sqlite3
+
+from src.lab_repository import LabRepository
+from src.migrations import MIGRATIONS, migrate
+
+# The schema lab_management.db files were created with before schema_version
+BASELINE_SCHEMA = """
+    CREATE TABLE teachers (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        subjects TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE practices (
+        id INTEGER PRIMARY KEY,
+        teacher_id INTEGER,
+        subject TEXT,
+        title TEXT,
+        objective TEXT,
+        introduction TEXT,
+        summary TEXT,
+        development TEXT,
+        goals TEXT,
+        upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        num_pages INTEGER,
+        file_path TEXT,
+        FOREIGN KEY (teacher_id) REFERENCES teachers (id)
+    );
+"""
+
+
+def test_baseline_database_is_upgraded_in_place(tmp_path):
+    db_path = str(tmp_path / "lab_management.db")
+    with sqlite3.connect(db_path) as conn:
+        conn.executescript(BASELINE_SCHEMA)
+        conn.executemany("INSERT INTO teachers (id, name, subjects) VALUES (?, ?, ?)", [
+            (1, "Ana", "Physics, Algorithms"),
+            (2, "Luis", "Chemistry"),
+            (3, "Ana", "Algorithms,Robotics"),
+        ])
+        conn.executemany("""
+            INSERT INTO practices (id, teacher_id, subject, title, objective, upload_date, num_pages, file_path)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (1, 1, "Physics", "Pendulum", "Measure g", "2025-04-07 11:48:20", 3, "folders/Ana/Physics/a.pdf"),
+            (2, 2, "Chemistry", "Titration", "Find a molarity", "2025-04-07 11:52:26", 5,
+             "folders/Luis/Chemistry/b.pdf"),
+            (3, 3, "Robotics", "Line follower", "Tune a PID loop", "2025-04-08 09:00:00", 2,
+             "folders/Ana/Robotics/c.pdf"),
+        ])
+
+    conn = sqlite3.connect(db_path)
+    try:
+        assert migrate(conn) == [version for version, _, _ in MIGRATIONS]
+        assert migrate(conn) == []
+        versions = [row[0] for row in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+        assert versions == list(range(1, len(MIGRATIONS) + 1))
+
+        # The duplicate teacher is merged into the oldest row, practices included
+        practices = conn.execute("""
+            SELECT id, teacher_id, subject, title, objective, upload_date, num_pages, file_path
+            FROM practices ORDER BY id
+        """).fetchall()
+        assert practices == [
+            (1, 1, "Physics", "Pendulum", "Measure g", "2025-04-07 11:48:20", 3, "folders/Ana/Physics/a.pdf"),
+            (2, 2, "Chemistry", "Titration", "Find a molarity", "2025-04-07 11:52:26", 5,
+             "folders/Luis/Chemistry/b.pdf"),
+            (3, 1, "Robotics", "Line follower", "Tune a PID loop", "2025-04-08 09:00:00", 2,
+             "folders/Ana/Robotics/c.pdf"),
+        ]
+    finally:
+        conn.close()
+
+    repository = LabRepository(db_path)
+    try:
+        repository.setup_schema()
+        assert repository.check_counters() == []
+        assert (repository.count_teachers(), repository.count_practices()) == (2, 3)
+        assert [(t.id, t.name, t.subjects, t.practice_count) for t in repository.get_teacher_page()] == [
+            (1, "Ana", ["Physics", "Algorithms", "Robotics"], 2),
+            (2, "Luis", ["Chemistry"], 1),
+        ]
+        assert [row.id for row in repository.search_practices("titration")] == [2]
+    finally:
+        repository.close()
@@ -0,0 +1,94 @@
+# test_practice_query.py
+import sqlite3
+
+import pytest
+
+from src.practice_query import PracticeFilter
+
+
+@pytest.fixture
+def add_practice(repository):
+    """Return a function that inserts a practice with a given upload date"""
+    teacher_ids = {}
+
+    def add(teacher, subject, upload_date, num_pages=1):
+        if teacher not in teacher_ids:
+            teacher_ids[teacher] = repository.add_teacher(teacher, [subject])
+        practice_id = repository.add_practice(
+            teacher_ids[teacher], subject, f"{teacher} {upload_date}", "", "", "", "", "",
+            num_pages, f"folders/{teacher}/{subject}/{upload_date}.pdf"
+        )
+        with sqlite3.connect(repository.db_path) as conn:
+            conn.execute("UPDATE practices SET upload_date = ? WHERE id = ?", (upload_date, practice_id))
+        return practice_id
+
+    return add
+
+
+def test_dates_are_normalized():
+    filters = PracticeFilter(date_from="2025-4-7", date_to="2025-04-9")
+    assert (filters.date_from, filters.date_to) == ("2025-04-07", "2025-04-09")
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"date_from": "07/04/2025"},
+    {"date_to": "2025-13-01"},
+    {"min_pages": 5, "max_pages": 2},
+])
+def test_invalid_filters_are_rejected(kwargs):
+    with pytest.raises(ValueError):
+        PracticeFilter(**kwargs)
+
+
+def test_date_bounds_are_inclusive_days(repository, add_practice):
+    add_practice("Ana", "Physics", "2025-04-06 23:59:59")
+    first = add_practice("Ana", "Physics", "2025-04-07 00:00:00")
+    last = add_practice("Ana", "Physics", "2025-04-07 23:59:59")
+    add_practice("Ana", "Physics", "2025-04-08 00:00:00")
+
+    rows = repository.find_practices(PracticeFilter(date_from="2025-4-7", date_to="2025-4-7"))
+    assert [row.id for row in rows] == [last, first]
+
+
+def test_page_bounds(repository, add_practice):
+    short = add_practice("Ana", "Physics", "2025-04-07 10:00:00", num_pages=2)
+    add_practice("Ana", "Physics", "2025-04-07 11:00:00", num_pages=40)
+
+    rows = repository.find_practices(PracticeFilter(min_pages=2, max_pages=10))
+    assert [row.id for row in rows] == [short]
+
+
+def test_facets_count_matching_practices(repository, add_practice):
+    add_practice("Ana", "Physics", "2025-04-07 10:00:00")
+    add_practice("Ana", "Physics", "2025-04-07 11:00:00")
+    add_practice("Ana", "Physics", "2025-05-01 10:00:00")
+    add_practice("Luis", "Physics", "2025-04-07 12:00:00")
+    add_practice("Marta", "Chemistry", "2025-04-07 13:00:00")
+
+    facets = repository.get_practice_facets(PracticeFilter(date_to="2025-04-30"))
+    assert facets.total == 4
+    assert facets.teachers == {"Ana": 2, "Luis": 1, "Marta": 1}
+    assert facets.subjects == {"Physics": 3, "Chemistry": 1}
+
+    facets = repository.get_practice_facets(PracticeFilter(subject="Physics", teacher_name="Ana"))
+    assert (facets.total, facets.teachers, facets.subjects) == (3, {"Ana": 3}, {"Physics": 3})
+
+
+def test_cursor_pages_cover_every_match_once(repository, add_practice):
+    # Practices sharing an upload_date are ordered by id
+    ids = [add_practice("Ana", "Physics", date) for date in (
+        "2025-04-07 10:00:00", "2025-04-07 10:00:00", "2025-04-07 10:00:00",
+        "2025-04-08 09:00:00", "2025-04-08 09:00:00", "2025-04-09 08:00:00", "2025-04-10 08:00:00"
+    )]
+    add_practice("Luis", "Physics", "2025-04-08 09:00:00")
+
+    filters = PracticeFilter(teacher_name="Ana")
+    seen = []
+    page = repository.find_practices(filters, limit=3)
+    while page:
+        assert len(page) <= 3
+        seen.extend(row.id for row in page)
+        page = repository.find_practices(filters, after=page[-1], limit=3)
+
+    assert seen == [ids[6], ids[5], ids[4], ids[3], ids[2], ids[1], ids[0]]
+    assert repository.count_report_practices(filters=filters) == len(ids)
@@ -0,0 +1,11 @@
+# test_query_plans.py
+from src.lab_repository import LabRepository
+
+
+def test_lookups_use_indexes(tmp_path):
+    repository = LabRepository(str(tmp_path / "lab.db"))
+    try:
+        repository.setup_schema()
+        assert repository.find_full_scans() == []
+    finally:
+        repository.close()
@@ -0,0 +1,92 @@
+# test_reconcile.py
+import os
+import shutil
+
+import pytest
+
+from src.blob_store import BlobStore
+from src.bulk_import import BulkImporter
+from src.reconcile import Reconciler
+
+
+@pytest.fixture
+def folders(tmp_path):
+    for subject in ("Ana/Physics", "Luis/Chemistry"):
+        os.makedirs(tmp_path / "folders" / subject)
+    return str(tmp_path / "folders")
+
+
+@pytest.fixture
+def blob_store(folders):
+    return BlobStore(folders)
+
+
+@pytest.fixture
+def tree(folders, make_pdf):
+    """Three distinct practices under folders/"""
+    return [
+        make_pdf(os.path.join("folders", "Ana", "Physics", f"lab{number}.pdf"), f"Practice {number}")
+        for number in (1, 2, 3)
+    ]
+
+
+def import_tree(repository, blob_store, folders, **kwargs):
+    return BulkImporter(repository, blob_store, jobs=1, **kwargs).run(folders)
+
+
+def practice_files(repository):
+    return sorted(os.path.normpath(path) for path in repository.get_practice_files())
+
+
+def test_moved_file_is_followed(repository, blob_store, folders, tree):
+    import_tree(repository, blob_store, folders)
+    moved = os.path.join(folders, "Luis", "Chemistry", "renamed.pdf")
+    os.rename(tree[0], moved)
+
+    report = Reconciler(repository, blob_store, folders, jobs=1).run()
+    assert [(old, new) for _, old, new in report.moved] == [(tree[0], moved)]
+    assert report.imported.imported == 0
+
+    location = repository.get_practice_location(report.moved[0][0])
+    assert (location.teacher_id, location.subject) == (repository.get_teacher_id("Luis"), "Chemistry")
+    assert Reconciler(repository, blob_store, folders, jobs=1).run().clean
+
+
+def test_deleted_file_is_restored_or_pruned(repository, blob_store, folders, tree):
+    import_tree(repository, blob_store, folders)
+    os.remove(tree[0])
+
+    report = Reconciler(repository, blob_store, folders, jobs=1).run()
+    assert [path for _, path in report.restored] == [tree[0]]
+    assert os.path.exists(tree[0])
+
+    # Without the blob there is nothing to restore from
+    location = next(location for location in repository.get_practice_locations()
+                    if os.path.normpath(location.file_path) == tree[0])
+    os.remove(tree[0])
+    blob_store.discard(location.blob_sha256)
+
+    report = Reconciler(repository, blob_store, folders, jobs=1).run()
+    assert report.missing == [(location.id, location.file_path)]
+    assert location.id in {row.id for row in repository.get_practice_locations()}
+
+    report = Reconciler(repository, blob_store, folders, jobs=1, prune=True).run()
+    assert report.pruned == 1
+    assert practice_files(repository) == sorted(tree[1:])
+
+
+def test_moved_file_is_preferred_over_a_duplicate(repository, blob_store, folders, tree):
+    for name in ("copy_a.pdf", "copy_b.pdf"):
+        shutil.copy(tree[0], os.path.join(folders, "Ana", "Physics", name))
+    summary = import_tree(repository, blob_store, folders)
+    assert (summary.imported, summary.duplicates) == (3, 2)
+
+    # Whichever copy was imported, move it to a folder scanned after the duplicates
+    original = next(path for path in practice_files(repository) if path not in tree[1:])
+    moved = os.path.join(folders, "Luis", "Chemistry", "moved.pdf")
+    os.rename(original, moved)
+
+    report = Reconciler(repository, blob_store, folders, jobs=1).run()
+    assert [(old, new) for _, old, new in report.moved] == [(original, moved)]
+    assert report.imported.imported == 0
+    assert moved in practice_files(repository)
@@ -0,0 +1,149 @@
+# test_storage.py
+"""S3Storage against an in-memory stand-in for a MinIO/S3 client"""
+import io
+
+import pytest
+
+from src.blob_store import BlobStore
+from src.storage import LocalStorage, ReadThroughCache, S3Storage, Storage
+
+exceptions = pytest.importorskip("botocore.exceptions")
+
+CONTENT = b"%PDF-1.4 " + bytes(range(256)) * 4
+
+
+class FakeS3Client:
+    """The subset of the boto3 S3 client that S3Storage calls"""
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+        self.calls = []
+
+    def _object(self, key):
+        if key not in self.objects:
+            raise exceptions.ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject")
+        return self.objects[key]
+
+    def head_object(self, Bucket, Key):
+        self.calls.append("head_object")
+        return {"ContentLength": len(self._object(Key))}
+
+    def put_object(self, Bucket, Key, Body):
+        self.calls.append("put_object")
+        self.objects[Key] = Body.read()
+
+    def get_object(self, Bucket, Key, Range):
+        self.calls.append("get_object")
+        start, end = map(int, Range[len("bytes="):].split("-"))
+        return {"Body": io.BytesIO(self._object(Key)[start:end + 1])}
+
+    def download_file(self, Bucket, Key, Filename):
+        self.calls.append("download_file")
+        with open(Filename, "wb") as file:
+            file.write(self._object(Key))
+
+    def create_multipart_upload(self, Bucket, Key):
+        upload_id = f"upload-{len(self.uploads) + 1}"
+        self.uploads[upload_id] = []
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, PartNumber, UploadId, Body):
+        self.calls.append("upload_part")
+        self.uploads[UploadId].append(Body)
+        return {"ETag": f'"{PartNumber}"'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        self.objects[Key] = b"".join(self.uploads.pop(UploadId))
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.calls.append("abort_multipart_upload")
+        self.uploads.pop(UploadId, None)
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+
+@pytest.fixture
+def client():
+    return FakeS3Client()
+
+
+@pytest.fixture
+def storage(tmp_path, client):
+    cache = ReadThroughCache(str(tmp_path / "cache"))
+    return S3Storage("lab", "archive/", root=str(tmp_path / "folders"), cache=cache,
+                     part_size=256, client=client)
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "practice.pdf"
+    path.write_bytes(CONTENT)
+    return str(path)
+
+
+def test_backends_implement_storage(tmp_path, storage):
+    assert isinstance(storage, Storage)
+    assert isinstance(LocalStorage(str(tmp_path)), Storage)
+    with pytest.raises(TypeError):
+        Storage(str(tmp_path))
+
+
+def test_blobs_are_stored_once(storage, client, source):
+    blob_store = BlobStore(storage=storage)
+    sha256, size, is_new = blob_store.put_file(source)
+    assert (size, is_new) == (len(CONTENT), True)
+    assert blob_store.put_file(source) == (sha256, size, False)
+
+    # The practice path is virtual, so the bucket only holds the blob
+    blob_store.link(sha256, f"{storage.root}/Ana/Physics/lab1.pdf")
+    assert list(client.objects) == [f"archive/.objects/{sha256[:2]}/{sha256[2:]}"]
+
+
+def test_large_files_are_uploaded_in_parts(storage, client, source):
+    path = f"{storage.root}/.objects/ab/cdef"
+    storage.add_file(source, path)
+    assert client.calls.count("upload_part") == -(-len(CONTENT) // 256)
+    assert client.objects["archive/.objects/ab/cdef"] == CONTENT
+    with pytest.raises(FileExistsError):
+        storage.add_file(source, path)
+
+
+def test_failed_multipart_upload_is_aborted(storage, client, source):
+    def fail(**kwargs):
+        raise exceptions.ClientError({"Error": {"Code": "500", "Message": "Internal"}}, "UploadPart")
+
+    client.upload_part = fail
+    with pytest.raises(OSError):
+        storage.add_file(source, f"{storage.root}/.objects/ab/cdef")
+    assert "abort_multipart_upload" in client.calls
+    assert not client.uploads
+
+
+def test_reads_go_through_the_cache(storage, client, source):
+    path = f"{storage.root}/.objects/ab/cdef"
+    storage.add_file(source, path)
+    storage.cache.discard(storage.key(path))
+
+    assert storage.read_range(path, 9, 4) == CONTENT[9:13]
+    assert client.calls[-1] == "get_object"
+
+    local = storage.local_path(path)
+    with open(local, "rb") as file:
+        assert file.read() == CONTENT
+    assert storage.local_path(path) == local
+    assert client.calls.count("download_file") == 1
+
+    calls = len(client.calls)
+    assert storage.read_range(path, 9, 4) == CONTENT[9:13]
+    assert len(client.calls) == calls
+
+
+def test_missing_objects(storage):
+    path = f"{storage.root}/.objects/00/missing"
+    assert not storage.exists(path)
+    with pytest.raises(FileNotFoundError):
+        storage.size(path)
+    with pytest.raises(ValueError):
+        storage.key("/elsewhere/lab1.pdf")